@@ -0,0 +1,62 @@
+"""Benchmark script for measuring import and CLI startup time."""
+
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+PROJECT_DIR = Path(__file__).parent
+
+# Each scenario is run in a fresh interpreter so that import caches do not
+# hide the cost a short-lived scheduler job would pay.
+SCENARIOS = {
+    "python baseline": "pass",
+    "import utils": "import utils",
+    "config only": "from utils import ScraperConfig",
+    "youtube extractor": "from utils import YouTubeExtractor",
+    "prezi scraper": "from utils import PreziScraper",
+    "selenium (reference)": "import selenium.webdriver",
+}
+
+
+def time_command(command: list, runs: int) -> list:
+    """
+    Time a command over several runs.
+    
+    Args:
+        command: Command line to execute
+        runs: Number of runs
+        
+    Returns:
+        List of wall-clock durations in milliseconds
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=PROJECT_DIR, stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def main():
+    """Run all startup benchmarks and print a summary table."""
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    
+    print(f"Startup benchmark ({runs} runs each)")
+    print("=" * 50)
+    
+    commands = {name: [sys.executable, "-c", code] for name, code in SCENARIOS.items()}
+    commands["cli.py --help"] = [sys.executable, "cli.py", "--help"]
+    
+    for name, command in commands.items():
+        durations = time_command(command, runs)
+        print(f"{name:<22} median {statistics.median(durations):8.1f} ms"
+              f"   min {min(durations):8.1f} ms")
+    
+    print("\nFor a per-module breakdown run: python -X importtime cli.py --help")
+
+
+if __name__ == "__main__":
+    main()
@@ -2,9 +2,9 @@
 
 import argparse
 import sys
+import time
 from pathlib import Path
 
-from utils.prezi_scraper import PreziScraper
 from utils.config import ScraperConfig
 
 
@@ -18,12 +18,22 @@ Examples:
   python cli.py https://prezi.com/p/example-presentation/
   python cli.py https://prezi.com/p/example/ --output my_output --headless false
   python cli.py https://prezi.com/p/example/ --max-slides 20 --delay 3
+  python cli.py https://prezi.com/p/example/ --max-slides 200 --shards 4
+  python cli.py --queue jobs.db --enqueue-file urls.txt
+  python cli.py --queue jobs.db --worker
+  python cli.py --queue jobs.db --worker --progress --status-file status/worker1.json
+  python cli.py --probe --enqueue-file urls.txt
+  python cli.py --serve --port 8765 --service-workers 2
+  python cli.py https://prezi.com/p/example/ --text-index slide_text.db
+  python cli.py search "climate policy" --index slide_text.db
+  python cli.py https://prezi.com/p/example/ --youtube-metadata --metadata-cache videos.db
         """
     )
     
     parser.add_argument(
         'url',
-        help='Prezi presentation URL'
+        nargs='?',
+        help='Prezi presentation URL (with --queue, it is added to the queue)'
     )
     
     parser.add_argument(
@@ -51,7 +61,7 @@ Examples:
         '--delay',
         type=float,
         default=2.0,
-        help='Delay between screenshots in seconds (default: 2.0)'
+        help='Maximum wait for a slide transition in seconds (default: 2.0)'
     )
     
     parser.add_argument(
@@ -61,12 +71,279 @@ Examples:
         help='Page load timeout in seconds (default: 30)'
     )
     
+    parser.add_argument(
+        '--element-timeout',
+        type=int,
+        default=10,
+        help='Seconds to wait for the page to accept navigation (default: 10)'
+    )
+    
+    parser.add_argument(
+        '--phase-attempts',
+        type=int,
+        default=2,
+        help='Attempts at starting the browser, loading a deck or capturing a slide '
+             'before the deck fails (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--circuit-threshold',
+        type=int,
+        default=3,
+        help='Refuse a deck for a while after this many consecutive failures (default: 3, 0 disables)'
+    )
+    
+    parser.add_argument(
+        '--tune-profile',
+        metavar='FILE',
+        help='Learn per-deck and per-host waits and keep them in FILE (JSON)'
+    )
+    
     parser.add_argument(
         '--window-size',
         default='1920x1080',
         help='Browser window size (default: 1920x1080)'
     )
     
+    parser.add_argument(
+        '--capture-mode',
+        choices=['full', 'tiled'],
+        default='full',
+        help='Capture tall pages as one bitmap or in bounded-memory bands (default: full)'
+    )
+    
+    parser.add_argument(
+        '--flat-output',
+        action='store_true',
+        help='Save every deck into one screenshots folder with timestamped names '
+             '(the layout before per-deck folders)'
+    )
+    
+    parser.add_argument(
+        '--incremental',
+        action='store_true',
+        help='Only write slides that changed since the last run of the deck and report the diff'
+    )
+    
+    parser.add_argument(
+        '--crop',
+        action='store_true',
+        help='Crop viewer chrome and blank borders from slides (requires numpy)'
+    )
+    
+    parser.add_argument(
+        '--normalize-size',
+        metavar='WIDTHxHEIGHT',
+        help='With --crop, fit every slide into this size'
+    )
+    
+    parser.add_argument(
+        '--device-scale-factor',
+        type=float,
+        default=1.0,
+        help='Render at this device pixel ratio, e.g. 2 for slides twice the window size (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--rendition',
+        action='append',
+        metavar='NAME:WIDTH',
+        help='Also write each slide scaled down to WIDTH pixels into a NAME subfolder '
+             '(repeatable, e.g. --rendition web:1280 --rendition thumb:320)'
+    )
+    
+    parser.add_argument(
+        '--rendition-format',
+        choices=['jpeg', 'png', 'webp'],
+        default='jpeg',
+        help='Image format of renditions (default: jpeg)'
+    )
+    
+    parser.add_argument(
+        '--page-source-links',
+        action='store_true',
+        help='Search the full page source for YouTube links instead of matching in the browser'
+    )
+    
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=1,
+        help='Capture one deck with this many browsers in parallel (default: 1)'
+    )
+    
+    parser.add_argument(
+        '--remote',
+        action='append',
+        metavar='URL[@N]',
+        help='Remote WebDriver/Grid endpoint running up to N browsers (repeatable)'
+    )
+    
+    parser.add_argument(
+        '--record',
+        metavar='DIR',
+        help='Record HTTP responses and navigation steps into an archive directory'
+    )
+    
+    parser.add_argument(
+        '--replay',
+        metavar='DIR',
+        help='Serve a recorded archive locally and scrape it without network access'
+    )
+    
+    parser.add_argument(
+        '--replay-latency',
+        action='store_true',
+        help='When replaying, delay responses by their recorded time to first byte'
+    )
+    
+    parser.add_argument(
+        '--profile',
+        choices=['sample', 'cprofile'],
+        help='Profile the run by deck and slide; writes to OUTPUT/profiles (sample: '
+             'collapsed stacks for flamegraphs, cprofile: one .prof per deck)'
+    )
+    
+    parser.add_argument(
+        '--profile-interval',
+        type=float,
+        default=0.005,
+        help='Seconds between stack samples with --profile sample (default: 0.005)'
+    )
+    
+    parser.add_argument(
+        '--chrome-trace',
+        action='store_true',
+        help='Also record a Chrome DevTools performance trace of the run, labelled by deck and slide'
+    )
+    
+    parser.add_argument(
+        '--queue',
+        metavar='DB',
+        help='SQLite work queue file shared by worker processes'
+    )
+    
+    parser.add_argument(
+        '--enqueue-file',
+        metavar='FILE',
+        help='Read Prezi URLs from FILE (one per line) to add to the queue or probe'
+    )
+    
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='Process jobs from the queue until it is empty'
+    )
+    
+    parser.add_argument(
+        '--retries',
+        type=int,
+        default=3,
+        help='Attempts per queued job before it is dead-lettered (default: 3)'
+    )
+    
+    parser.add_argument(
+        '--link-index',
+        metavar='DB',
+        help='SQLite link index shared by workers to report only globally new YouTube links'
+    )
+    
+    parser.add_argument(
+        '--text-index',
+        metavar='DB',
+        help='Add the visible text of every captured slide to this SQLite full-text index '
+             '(query it with: cli.py search QUERY --index DB)'
+    )
+    
+    parser.add_argument(
+        '--youtube-metadata',
+        action='store_true',
+        help='Look up the title and availability of each YouTube link through oEmbed'
+    )
+    
+    parser.add_argument(
+        '--metadata-cache',
+        metavar='DB',
+        help='SQLite cache of YouTube metadata shared between runs '
+             '(default: OUTPUT/youtube_metadata.db)'
+    )
+    
+    parser.add_argument(
+        '--probe',
+        action='store_true',
+        help='Fetch title, frame estimate and YouTube links over HTTP without a browser'
+    )
+    
+    parser.add_argument(
+        '--probe-workers',
+        type=int,
+        default=16,
+        help='Concurrent HTTP requests in probe mode (default: 16)'
+    )
+    
+    parser.add_argument(
+        '--no-browser-fallback',
+        action='store_true',
+        help='In probe mode, do not open a browser for decks the HTTP probe cannot read'
+    )
+    
+    parser.add_argument(
+        '--serve',
+        action='store_true',
+        help='Run a local scrape service that keeps browsers warm between requests'
+    )
+    
+    parser.add_argument(
+        '--port',
+        type=int,
+        default=8765,
+        help='TCP port for --serve on 127.0.0.1 (default: 8765)'
+    )
+    
+    parser.add_argument(
+        '--socket',
+        metavar='PATH',
+        help='Listen on a Unix domain socket instead of TCP with --serve'
+    )
+    
+    parser.add_argument(
+        '--service-workers',
+        type=int,
+        default=2,
+        help='Number of warm browsers for --serve (default: 2)'
+    )
+    
+    parser.add_argument(
+        '--cache-ttl',
+        type=float,
+        default=3600.0,
+        help='Seconds --serve reuses a finished result for the same URL (default: 3600)'
+    )
+    
+    parser.add_argument(
+        '--rate',
+        type=float,
+        help='Limit page loads per second per host (default: no limit)'
+    )
+    
+    parser.add_argument(
+        '--rate-state',
+        metavar='FILE',
+        help='SQLite file for sharing the rate limit between worker processes'
+    )
+    
+    parser.add_argument(
+        '--progress',
+        action='store_true',
+        help='Show a live progress line with throughput and ETA (on a terminal)'
+    )
+    
+    parser.add_argument(
+        '--status-file',
+        metavar='FILE',
+        help='Keep a JSON file with progress, throughput, ETA and stalled decks up to date'
+    )
+    
     parser.add_argument(
         '--verbose', '-v',
         action='store_true',
@@ -95,13 +372,352 @@ def parse_window_size(size_str: str) -> tuple[int, int]:
         return 1920, 1080
 
 
+def create_rate_limiter(args, config: ScraperConfig):
+    """Create the per-host rate limiter requested on the command line, if any."""
+    if not (args.rate or args.rate_state):
+        return None
+    
+    from utils.rate_limiter import HostRateLimiter
+    return HostRateLimiter.from_config(config, state_path=args.rate_state)
+
+
+def create_link_index(args):
+    """Open the shared link index, if requested, and start this run in it."""
+    if not args.link_index:
+        return None
+    
+    from utils.link_index import LinkIndex
+    link_index = LinkIndex(args.link_index)
+    link_index.start_run()
+    return link_index
+
+
+def create_scraper(args, config: ScraperConfig, supervised: bool = False, rate_limiter=None,
+                   progress=None, policy=None, link_index=None):
+    """Create a PreziScraper, with a rate limiter and browser supervisor if requested."""
+    from utils.prezi_scraper import PreziScraper
+    
+    rate_limiter = rate_limiter or create_rate_limiter(args, config)
+    
+    supervisor = None
+    if supervised:
+        from utils.driver_supervisor import DriverSupervisor
+        supervisor = DriverSupervisor.from_config(config)
+    
+    link_index = link_index or create_link_index(args)
+    
+    text_index = None
+    if args.text_index:
+        from utils.text_index import SlideTextIndex
+        text_index = SlideTextIndex(args.text_index)
+    
+    replay_server = getattr(args, 'replay_server', None)
+    
+    return PreziScraper(
+        config=config,
+        rate_limiter=rate_limiter,
+        supervisor=supervisor,
+        link_index=link_index,
+        url_resolver=replay_server.resolve if replay_server else None,
+        text_index=text_index,
+        progress=progress,
+        policy=policy
+    )
+
+
+def print_rate_limit_metrics(scraper):
+    """Print time spent waiting on the rate limiter, if one was used."""
+    if scraper.rate_limiter is None:
+        return
+    
+    for host, metrics in scraper.rate_limiter.metrics().items():
+        print(f"Rate limit {host}: {int(metrics['requests'])} request(s), "
+              f"{metrics['wait_seconds']:.1f}s waiting, {int(metrics['throttled'])} throttled")
+
+
+def print_policy_summary(scraper):
+    """Print failed phases by reason, retries and refused decks, if there were any."""
+    summary = scraper.policy.summary()
+    retries = summary.pop('retries')
+    refused = summary.pop('refused', 0)
+    if not (summary or retries or refused):
+        return
+    
+    failures = ", ".join(f"{key} ({count})" for key, count in sorted(summary.items()))
+    print(f"Phase failures: {failures or 'none'}; {retries} retried, "
+          f"{refused} refused by the circuit breaker")
+
+
+def collect_urls(args) -> list:
+    """Get the valid URLs given as the positional argument and in --enqueue-file."""
+    urls = [args.url] if args.url else []
+    if args.enqueue_file:
+        with open(args.enqueue_file, 'r', encoding='utf-8') as f:
+            urls.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    
+    invalid = [url for url in urls if not validate_url(url)]
+    for url in invalid:
+        print(f"Skipping invalid Prezi URL: {url}")
+    
+    return [url for url in urls if url not in invalid]
+
+
+def run_queue(args, config: ScraperConfig):
+    """Enqueue URLs and/or run a worker loop against the SQLite work queue."""
+    from utils.work_queue import WorkQueue, default_worker_id
+    
+    queue = WorkQueue.from_config(args.queue, config)
+    
+    urls = collect_urls(args)
+    if urls:
+        added = queue.enqueue(urls)
+        print(f"Queued {added} new job(s) in {args.queue}")
+    
+    if not args.worker:
+        print(f"Queue status: {queue.stats()}")
+        return
+    
+    worker_id = default_worker_id()
+    # Workers keep one browser warm across jobs and recycle it as it ages
+    scraper = create_scraper(args, config, supervised=True)
+    print(f"Worker {worker_id} started")
+    
+    try:
+        processed = run_worker_loop(queue, scraper, worker_id)
+    finally:
+        scraper.close()
+    
+    print(f"\nWorker {worker_id} finished: {processed} job(s) completed")
+    print(f"Queue status: {queue.stats()}")
+    print_rate_limit_metrics(scraper)
+    print_policy_summary(scraper)
+    if scraper.link_index:
+        print(f"Link index: {len(scraper.link_index.new_since_last_run())} video(s) "
+              f"new since the previous run")
+    if scraper.supervisor:
+        print(f"Browser recycled {scraper.supervisor.recycle_count} time(s), "
+              f"{scraper.supervisor.hang_count} hung command(s) killed")
+    
+    dead = queue.dead_letters()
+    if dead and args.verbose:
+        print("Dead-lettered jobs:")
+        for item in dead:
+            print(f"  - {item['url']} ({item['attempts']} attempts): {item['last_error']}")
+
+
+def run_worker_loop(queue, scraper, worker_id: str) -> int:
+    """Lease and process jobs until the queue has no unfinished work left."""
+    from utils.policy import PhaseFailure
+    from utils.work_queue import LeaseHeartbeat, STATUS_DONE, STATUS_DEAD
+    
+    processed = 0
+    while True:
+        if scraper.progress:
+            # Every worker's jobs count towards the batch, so its ETA reflects them all
+            counts = queue.stats()
+            scraper.progress.update_batch(sum(counts.values()),
+                                          counts[STATUS_DONE] + counts[STATUS_DEAD])
+        
+        job = queue.lease(worker_id)
+        if job is None:
+            # Wait for jobs in retry backoff or held by other workers
+            wait = queue.seconds_until_ready()
+            if wait is None:
+                break
+            time.sleep(min(wait + 0.1, 30.0))
+            continue
+        
+        print(f"\n[{worker_id}] Job {job.id} attempt {job.attempts}: {job.url}")
+        try:
+            with LeaseHeartbeat(queue, job):
+                results = scraper.scrape_prezi(job.url)
+            
+            if results['youtube_links'] and 'deck_dir' not in results:
+                scraper.youtube_extractor.save_links_to_file()
+            
+            summary = {
+                'title': results['title'],
+                'screenshots': len(results['screenshots']),
+                'youtube_links': results['youtube_links'],
+            }
+            if 'deck_dir' in results:
+                summary['deck_dir'] = results['deck_dir']
+            if 'diff' in results:
+                summary['diff'] = {key: results['diff'][key]
+                                   for key in ('added', 'changed', 'removed')}
+            if 'new_youtube_links' in results:
+                summary['new_youtube_links'] = results['new_youtube_links']
+            queue.complete(job, summary)
+            processed += 1
+            
+        except KeyboardInterrupt:
+            queue.fail(job, "interrupted by user")
+            raise
+        except ValueError as e:
+            # Invalid URLs will never succeed, so do not retry them
+            print(f"Job {job.id} failed permanently: {e}")
+            queue.fail(job, str(e), retryable=False)
+        except PhaseFailure as e:
+            # Permanent failures (HTTP 404, a refused deck) are dead-lettered at once
+            status = queue.fail(job, str(e), retryable=e.retryable)
+            print(f"Job {job.id} failed ({status}): {e}")
+        except Exception as e:
+            status = queue.fail(job, f"{type(e).__name__}: {e}")
+            print(f"Job {job.id} failed ({status}): {e}")
+    
+    return processed
+
+
+def run_probe(args, config: ScraperConfig):
+    """Probe decks over HTTP, opening a browser only for decks that need one."""
+    import json
+    from utils.prezi_probe import PreziProbe, ProbeResult
+    
+    urls = collect_urls(args)
+    rate_limiter = create_rate_limiter(args, config)
+    probe = PreziProbe.from_config(config, rate_limiter=rate_limiter, pool_size=args.probe_workers)
+    
+    start = time.time()
+    try:
+        results = probe.probe_many(urls, workers=args.probe_workers)
+    finally:
+        probe.close()
+    elapsed = time.time() - start
+    print(f"Probed {len(results)} deck(s) over HTTP in {elapsed:.1f}s")
+    
+    fallback = [i for i, result in enumerate(results) if result.needs_browser]
+    if fallback and not args.no_browser_fallback:
+        print(f"Opening a browser for {len(fallback)} deck(s) the HTTP probe could not read")
+        scraper = create_scraper(args, config, supervised=True, rate_limiter=rate_limiter)
+        try:
+            for i in fallback:
+                try:
+                    browser_result = scraper.probe(results[i].url)
+                    # The HTTP frame estimate is still the best one available
+                    browser_result.estimated_frames = results[i].estimated_frames
+                    results[i] = browser_result
+                except Exception as e:
+                    results[i] = ProbeResult(url=results[i].url, method="browser",
+                                             needs_browser=True, error=f"{type(e).__name__}: {e}")
+        finally:
+            scraper.close()
+    
+    output_file = config.get_output_path() / "probe_results.jsonl"
+    output_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_file, 'w', encoding='utf-8') as f:
+        for result in results:
+            f.write(json.dumps(result.to_dict()) + "\n")
+    
+    for result in results:
+        if result.error:
+            print(f"  ✗ {result.url}: {result.error}")
+        else:
+            frames = result.estimated_frames if result.estimated_frames is not None else "?"
+            print(f"  {result.url}: {result.title or 'untitled'} "
+                  f"({frames} frames, {len(result.youtube_links)} YouTube link(s), {result.method})")
+    print(f"Probe results saved to: {output_file}")
+
+
+def run_service(args, config: ScraperConfig):
+    """Run the long-lived scrape service with one warm browser per worker."""
+    from dataclasses import replace
+    from utils.policy import PolicyEngine
+    from utils.scrape_service import ScrapeService, serve
+    
+    config.get_output_path().mkdir(parents=True, exist_ok=True)
+    
+    # One tracker for all workers, so the status file covers every deck in flight
+    progress = None
+    if config.progress_file or config.live_progress:
+        from utils.progress import ProgressTracker
+        progress = ProgressTracker.from_config(config)
+    
+    # Likewise one circuit breaker, so a deck that keeps failing is refused by every worker,
+    # and one link index run for every deck the service scrapes
+    policy = PolicyEngine.from_config(config)
+    link_index = create_link_index(args)
+    
+    def scraper_factory(index: int):
+        # Workers write to separate folders so concurrent decks never collide
+        worker_config = replace(config, output_dir=str(Path(config.output_dir) / f"worker_{index + 1}"))
+        return create_scraper(args, worker_config, supervised=True, progress=progress, policy=policy,
+                              link_index=link_index)
+    
+    service = ScrapeService(
+        scraper_factory,
+        workers=args.service_workers,
+        cache_ttl=args.cache_ttl
+    )
+    serve(service, port=args.port, socket_path=args.socket, validate_url=validate_url)
+
+
+def run_search(argv: list):
+    """Query the slide text index: cli.py search QUERY [--index DB] [--limit N] [--json]."""
+    parser = argparse.ArgumentParser(
+        prog="cli.py search",
+        description="Search the visible text of slides indexed with --text-index"
+    )
+    parser.add_argument('query', help='Words to find; FTS5 syntax such as "sea level" or AND/OR/NOT works too')
+    parser.add_argument('--index', default='slide_text.db', metavar='DB',
+                        help='SQLite text index (default: slide_text.db)')
+    parser.add_argument('--limit', type=int, default=20, help='Maximum slides to show (default: 20)')
+    parser.add_argument('--json', action='store_true', help='Print matches as JSON lines')
+    args = parser.parse_args(argv)
+    
+    if not Path(args.index).exists():
+        print(f"Error: text index not found: {args.index}")
+        sys.exit(1)
+    
+    from utils.text_index import SlideTextIndex
+    index = SlideTextIndex(args.index)
+    matches = index.search(args.query, limit=args.limit)
+    
+    if args.json:
+        import json
+        for match in matches:
+            print(json.dumps(match))
+        return
+    
+    stats = index.stats()
+    print(f"{len(matches)} matching slide(s) in {stats['decks']} indexed deck(s)")
+    for match in matches:
+        print(f"\n{match['title'] or match['deck_id']} - slide {match['frame_index']}")
+        print(f"  {' '.join(match['snippet'].split())}")
+        if match['url']:
+            print(f"  Deck: {match['url']}")
+        if match['screenshot_path']:
+            print(f"  Screenshot: {match['screenshot_path']}")
+        for link in match['youtube_links']:
+            print(f"  Video: {link}")
+
+
 def main():
     """Main CLI function."""
+    if len(sys.argv) > 1 and sys.argv[1] == 'search':
+        run_search(sys.argv[2:])
+        return
+    
     parser = create_parser()
     args = parser.parse_args()
     
+    if not args.url and not (args.queue or args.serve or (args.probe and args.enqueue_file)):
+        parser.error("a Prezi URL is required unless --queue, --serve or --probe --enqueue-file is used")
+    
+    if args.worker and not args.queue:
+        parser.error("--worker requires --queue")
+    
+    if args.enqueue_file and not (args.queue or args.probe):
+        parser.error("--enqueue-file requires --queue or --probe")
+    
+    from utils.renditions import parse_rendition
+    for spec in args.rendition or ():
+        try:
+            parse_rendition(spec)
+        except ValueError as e:
+            parser.error(str(e))
+    
     # Validate URL
-    if not validate_url(args.url):
+    if args.url and not validate_url(args.url):
         print(f"Error: Invalid Prezi URL: {args.url}")
         print("Prezi URLs should look like: https://prezi.com/p/presentation-name/")
         sys.exit(1)
@@ -116,9 +732,35 @@ def main():
                 window_width=width,
         window_height=height,
         page_load_timeout=args.timeout,
+        element_wait_timeout=args.element_timeout,
+        phase_attempts=args.phase_attempts,
+        circuit_threshold=args.circuit_threshold,
         screenshot_delay=args.delay,
         max_slides=args.max_slides,
+        retry_attempts=args.retries,
+        capture_shards=args.shards,
+        capture_mode=args.capture_mode,
+        incremental=args.incremental,
+        per_deck_output=not args.flat_output,
+        crop_slides=args.crop,
+        normalize_size=parse_window_size(args.normalize_size) if args.normalize_size else None,
+        device_scale_factor=args.device_scale_factor,
+        renditions=tuple(args.rendition or ()),
+        rendition_format=args.rendition_format,
+        in_browser_extraction=not args.page_source_links,
+        timing_profile=args.tune_profile,
+        remote_endpoints=tuple(args.remote or ()),
+        record_archive=args.record,
+        profile_mode=args.profile,
+        profile_interval=args.profile_interval,
+        chrome_trace=args.chrome_trace,
+        youtube_metadata=args.youtube_metadata or bool(args.metadata_cache),
+        metadata_cache=args.metadata_cache,
+        progress_file=args.status_file,
+        live_progress=args.progress,
     )
+    if args.rate:
+        config.host_rate = args.rate
     
     if args.verbose:
         print("Configuration:")
@@ -127,18 +769,42 @@ def main():
         print(f"  Headless: {config.headless}")
         print(f"  Window: {config.window_width}x{config.window_height}")
         print(f"  Max slides: {config.max_slides}")
+        if config.remote_endpoints:
+            print(f"  Remote endpoints: {', '.join(config.remote_endpoints)}")
         print(f"  Screenshot delay: {config.screenshot_delay}s")
+        print(f"  Timeouts: load {config.page_load_timeout}s, navigation {config.element_wait_timeout}s, "
+              f"{config.phase_attempts} attempt(s) per phase")
         print()
     
-    # Initialize scraper
-    scraper = PreziScraper(
-        output_dir=config.output_dir,
-        headless=config.headless
-    )
+    if args.replay:
+        from utils.session_archive import ReplayServer
+        args.replay_server = ReplayServer(args.replay, simulate_latency=args.replay_latency).start()
+    
+    if args.serve:
+        run_service(args, config)
+        return
+    
+    if args.probe:
+        run_probe(args, config)
+        return
+    
+    if args.queue:
+        try:
+            run_queue(args, config)
+        except KeyboardInterrupt:
+            print("\nWorker interrupted by user.")
+            sys.exit(1)
+        return
+    
+    # Initialize scraper (Selenium is only imported at this point)
+    scraper = create_scraper(args, config)
     
     try:
         print(f"Starting Prezi scrape: {args.url}")
-        results = scraper.scrape_prezi(args.url)
+        if config.capture_shards > 1:
+            results = scraper.scrape_prezi_parallel(args.url, shards=config.capture_shards)
+        else:
+            results = scraper.scrape_prezi(args.url)
         
         # Print results
         print("\n" + "="*60)
@@ -147,20 +813,42 @@ def main():
         print(f"Presentation: {results['title']}")
         print(f"Screenshots captured: {len(results['screenshots'])}")
         print(f"YouTube links found: {len(results['youtube_links'])}")
+        if 'new_youtube_links' in results:
+            print(f"New to the link index: {len(results['new_youtube_links'])}")
+        if results.get('failed_frames'):
+            print(f"Frames not captured: {', '.join(results['failed_frames'])}")
+        if results.get('diff'):
+            diff = results['diff']
+            print(f"Changes since last run: {len(diff['added'])} added, {len(diff['changed'])} changed, "
+                  f"{len(diff['removed'])} removed, {len(diff['unchanged'])} unchanged")
         
         if results['screenshots']:
-            print(f"\nScreenshots saved to: {config.get_screenshots_path()}")
+            print(f"\nScreenshots saved to: {results.get('deck_dir') or config.get_screenshots_path()}")
             if args.verbose:
                 for screenshot in results['screenshots']:
                     print(f"  - {Path(screenshot).name}")
         
         if results['youtube_links']:
-            youtube_file = scraper.youtube_extractor.save_links_to_file()
+            if 'deck_dir' in results:
+                youtube_file = Path(results['deck_dir']) / config.youtube_filename
+            else:
+                youtube_file = scraper.youtube_extractor.save_links_to_file(metadata=scraper.link_metadata)
             print(f"YouTube links saved to: {youtube_file}")
             if args.verbose:
+                titles = {metadata['url']: metadata['title'] or metadata['status']
+                          for metadata in results.get('youtube_metadata') or ()}
                 for link in results['youtube_links']:
-                    print(f"  - {link}")
+                    print(f"  - {link}" + (f" ({titles[link]})" if link in titles else ""))
         
+        print_rate_limit_metrics(scraper)
+        print_policy_summary(scraper)
+        if args.record:
+            print(f"Session recorded to: {args.record}")
+        if args.replay and args.replay_server.misses:
+            print(f"Requests missing from the archive: {len(args.replay_server.misses)}")
+            if args.verbose:
+                for miss in args.replay_server.misses:
+                    print(f"  - {miss}")
         print(f"\nAll output saved to: {Path(config.output_dir).absolute()}")
         
     except KeyboardInterrupt:
@@ -172,6 +860,8 @@ def main():
             import traceback
             traceback.print_exc()
         sys.exit(1)
+    finally:
+        scraper.close()
 
 
 if __name__ == "__main__":
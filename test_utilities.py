@@ -1,12 +1,109 @@
 """Test script to verify that all utilities are working correctly."""
 
 import sys
+import os
 import shutil
 from pathlib import Path
 
 # Add current directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
+
+class FakeDeckElement:
+    """Stands in for a page element; key presses step the fake deck forward."""
+    
+    def __init__(self, driver):
+        self.driver = driver
+    
+    def get_attribute(self, name):
+        return "Fake Deck" if name == "textContent" else None
+    
+    def send_keys(self, *keys):
+        self.driver.advance()
+    
+    def click(self):
+        self.driver.advance()
+    
+    def is_displayed(self):
+        return True
+    
+    def is_enabled(self):
+        return True
+
+
+class FakeDeckDriver:
+    """
+    Stands in for a browser showing a deck, so scrapes can run without Chrome.
+    
+    Each screenshot holds the current frame number. ``frames`` is what the
+    page reports as its frame count (None when it does not expose one), and
+    ``on_advance`` is called before each step so tests can inject failures,
+    and ``links`` are the YouTube links found on the page.
+    """
+    
+    page_source = "<html></html>"
+    
+    def __init__(self, frames=None, on_advance=None, links=()):
+        self.frames = frames
+        self.on_advance = on_advance
+        self.links = list(links)
+        self.frame = 0
+        self.captures = 0
+        self.url = None
+        self.closed = False
+    
+    def advance(self):
+        if self.on_advance:
+            self.on_advance(self)
+        self.frame += 1
+    
+    def get(self, url):
+        self.url = url
+    
+    def find_element(self, by, value):
+        return FakeDeckElement(self)
+    
+    def find_elements(self, by, value):
+        return []
+    
+    def execute(self, command, params=None):
+        return {"value": None}
+    
+    def execute_script(self, script, *args):
+        if "responseStatus" in script:
+            return 200
+        if "document.scripts" in script:
+            return self.frames
+        if "scrollHeight" in script:
+            return 1080
+        if "outerHTML" in script:
+            return [[url, "iframe"] for url in self.links]
+        return None
+    
+    def set_window_size(self, width, height):
+        pass
+    
+    def get_screenshot_as_png(self):
+        self.captures += 1
+        return b"frame %d" % self.frame
+    
+    def save_screenshot(self, path):
+        Path(path).write_bytes(self.get_screenshot_as_png())
+        return True
+    
+    def quit(self):
+        self.closed = True
+
+
+def fake_deck_config(**overrides):
+    """Get a ScraperConfig that scrapes a FakeDeckDriver without waiting."""
+    from utils.config import ScraperConfig
+    settings = dict(output_dir="test_prezi_output", render_delay=0, screenshot_delay=0,
+                    navigation_delay=0)
+    settings.update(overrides)
+    return ScraperConfig(**settings)
+
+
 def test_imports():
     """Test that all modules can be imported correctly."""
     print("Testing imports...")
@@ -20,6 +117,33 @@ def test_imports():
         return False
 
 
+def test_lazy_scraper_import():
+    """Test that importing the scraper does not load optional feature modules."""
+    print("\nTesting lazy scraper import...")
+    
+    try:
+        import subprocess
+        
+        # A fresh interpreter, since other tests have already imported these
+        script = ("import sys; from utils import PreziScraper; "
+                  "print(sorted({'sqlite3', 'http.server', 'multiprocessing', 'cProfile', "
+                  "'concurrent.futures', 'selenium'} & set(sys.modules)))")
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True,
+                                cwd=str(Path(__file__).parent), check=True).stdout.strip()
+        
+        if output == "[]":
+            print("✅ Scraper import leaves optional modules unloaded")
+            return True
+        else:
+            print("❌ Lazy scraper import failed")
+            print(f"   Loaded: {output}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Lazy scraper import error: {e}")
+        return False
+
+
 def test_config():
     """Test configuration module."""
     print("\nTesting configuration...")
@@ -93,6 +217,1343 @@ def test_youtube_extractor():
         return False
 
 
+def test_youtube_extractor_deck_scoping():
+    """Test per-deck link scoping and spilling link records to disk."""
+    print("\nTesting YouTube extractor deck scoping...")
+    
+    try:
+        from utils.youtube_extractor import YouTubeExtractor
+        
+        extractor = YouTubeExtractor("test_output", spill_dir="test_output/spill", spill_threshold=2)
+        
+        extractor.start_deck("deck_a")
+        for video_id in ["dQw4w9WgXcQ", "9bZkp7q19f0", "kJQP7kiw5Fk"]:
+            extractor.extract_youtube_link(f"https://youtu.be/{video_id}")
+        
+        spilled_ids = [record.video_id for record in extractor.iter_link_details()]
+        
+        extractor.start_deck("deck_b")
+        extractor.extract_youtube_link("https://youtu.be/dQw4w9WgXcQ")
+        
+        # The link set is derived from the records, so adding to it must fail loudly
+        try:
+            extractor.youtube_links.add("https://www.youtube.com/watch?v=kJQP7kiw5Fk")
+            read_only = False
+        except AttributeError:
+            read_only = True
+        
+        if (spilled_ids == ["dQw4w9WgXcQ", "9bZkp7q19f0", "kJQP7kiw5Fk"] and read_only
+                and extractor.get_extracted_links() == ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]):
+            print("✅ YouTube extractor scopes links per deck")
+            return True
+        else:
+            print("❌ YouTube extractor deck scoping failed")
+            print(f"   Deck A records: {spilled_ids}")
+            print(f"   Deck B links: {extractor.get_extracted_links()}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ YouTube extractor scoping error: {e}")
+        return False
+
+
+def test_youtube_extractor_in_browser():
+    """Test extraction from candidates returned by the in-browser script."""
+    print("\nTesting in-browser YouTube extraction...")
+    
+    class ScriptOnlyDriver:
+        """Stand-in driver that answers the extraction script without a browser."""
+        
+        def execute_script(self, script):
+            return [
+                ["https://www.youtube.com/embed/dQw4w9WgXcQ?rel=0", "iframe"],
+                ["https://youtu.be/9bZkp7q19f0", "page_source"],
+                ["https://www.youtube.com/embed/dQw4w9WgXcQ", "page_source"],
+            ]
+    
+    try:
+        from utils.youtube_extractor import YouTubeExtractor
+        
+        extractor = YouTubeExtractor("test_output")
+        found = extractor.extract_from_driver(ScriptOnlyDriver())
+        sources = [record.source for record in extractor.iter_link_details()]
+        
+        if found == 2 and sources == ["iframe", "page_source"]:
+            print("✅ In-browser extraction normalizes and deduplicates candidates")
+            return True
+        else:
+            print("❌ In-browser extraction test failed")
+            print(f"   Found {found} links with sources {sources}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ In-browser extraction error: {e}")
+        return False
+
+
+def test_work_queue():
+    """Test work queue leasing, retries and dead-lettering."""
+    print("\nTesting work queue...")
+    
+    try:
+        from utils.work_queue import WorkQueue
+        
+        Path("test_output").mkdir(exist_ok=True)
+        for stale in Path("test_output").glob("queue.db*"):
+            stale.unlink()
+        
+        queue = WorkQueue("test_output/queue.db", max_attempts=2, retry_backoff=0)
+        queue.enqueue(["https://prezi.com/p/deck-one/", "https://prezi.com/p/deck-one/"])
+        
+        first = queue.lease("worker-a")
+        retry_status = queue.fail(first, "timeout")
+        second = queue.lease("worker-b")
+        dead_status = queue.fail(second, "timeout")
+        queue.close()
+        
+        if retry_status == "pending" and dead_status == "dead" and queue.stats()["dead"] == 1:
+            print("✅ Work queue retries and dead-letters jobs")
+            return True
+        else:
+            print("❌ Work queue test failed")
+            print(f"   Statuses: {retry_status}, {dead_status}; stats: {queue.stats()}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Work queue error: {e}")
+        return False
+
+
+def test_rate_limiter():
+    """Test token refill, AIMD rate adjustment and Retry-After parsing."""
+    print("\nTesting rate limiter...")
+    
+    try:
+        import time
+        from utils.rate_limiter import HostRateLimiter, parse_retry_after
+        
+        limiter = HostRateLimiter(rate=20.0, burst=2, slow_threshold=1.0, increase_step=5.0)
+        host = "https://prezi.com/p/deck-one/"
+        
+        # Burst tokens are free, then the bucket refills at ``rate``
+        waits = [limiter.acquire(host) for _ in range(3)]
+        refilled = waits[0] == 0 and waits[1] == 0 and 0.02 < waits[2] < 0.5
+        
+        try:
+            limiter.acquire(host, cost=3)
+            oversized_rejected = False
+        except ValueError:
+            oversized_rejected = True
+        
+        # Healthy responses raise the rate above the starting rate up to max_rate
+        for _ in range(30):
+            limiter.report(host, 200, 0.1)
+        increased = limiter.current_rate(host) == limiter.max_rate > limiter.initial_rate
+        
+        limiter.report(host, 200, 2.0)
+        slowed = abs(limiter.current_rate(host) - limiter.max_rate * 0.8) < 1e-9
+        
+        before = limiter.current_rate(host)
+        limiter.report(host, 429, 0.1, retry_after=0.1)
+        halved = abs(limiter.current_rate(host) - before * 0.5) < 1e-9
+        started = time.time()
+        limiter.acquire(host)
+        blocked = time.time() - started >= 0.05
+        
+        parsed = [parse_retry_after(value) for value in ("5", None, "abc", "-3")]
+        
+        if (refilled and oversized_rejected and increased and slowed and halved and blocked
+                and parsed == [5.0, None, None, 0.0]):
+            print("✅ Rate limiter refills, adapts its rate and honours Retry-After")
+            return True
+        else:
+            print("❌ Rate limiter test failed")
+            print(f"   Waits: {waits}; oversized rejected: {oversized_rejected}; "
+                  f"increase/slow/halve/block: {increased}, {slowed}, {halved}, {blocked}; "
+                  f"Retry-After: {parsed}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Rate limiter error: {e}")
+        return False
+
+
+def test_scrape_service():
+    """Test job deduplication, the result cache and recovering from a failed scraper factory."""
+    print("\nTesting scrape service...")
+    
+    try:
+        import time
+        from utils.scrape_service import ScrapeService
+        
+        scraped = []
+        cold = []
+        
+        class StubScraper:
+            warm = False
+            
+            def start_browser(self):
+                self.warm = True
+            
+            def scrape_prezi(self, url):
+                if not self.warm:
+                    cold.append(url)
+                time.sleep(0.1)
+                scraped.append(url)
+                return {'title': url, 'screenshots': [], 'youtube_links': []}
+            
+            def close(self):
+                pass
+        
+        def wait(service, job_id):
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                job = service.get_job(job_id)
+                if job['status'] in ('done', 'failed'):
+                    return job
+                time.sleep(0.02)
+            return job
+        
+        service = ScrapeService(lambda index: StubScraper(), workers=1)
+        service.start()
+        first = service.submit("https://prezi.com/p/deck-one/")
+        duplicate = service.submit("https://prezi.com/p/deck-one/")
+        done = wait(service, first['id'])
+        cached = service.submit("https://prezi.com/p/deck-one/")
+        service.stop()
+        
+        # The factory fails at start and again for the first job, which fails instead of
+        # hanging; the worker then starts a scraper for the next job
+        attempts = []
+        
+        def flaky_factory(index):
+            attempts.append(index)
+            if len(attempts) <= 2:
+                raise RuntimeError("chrome not found")
+            return StubScraper()
+        
+        flaky = ScrapeService(flaky_factory, workers=1)
+        flaky.start()
+        failed = wait(flaky, flaky.submit("https://prezi.com/p/deck-two/")['id'])
+        recovered = wait(flaky, flaky.submit("https://prezi.com/p/deck-three/")['id'])
+        flaky.stop()
+        
+        if (duplicate['id'] == first['id'] and done['status'] == 'done' and cached['cached']
+                and scraped == ["https://prezi.com/p/deck-one/", "https://prezi.com/p/deck-three/"]
+                and failed['status'] == 'failed' and "chrome not found" in failed['error']
+                and recovered['status'] == 'done' and not cold):
+            print("✅ Scrape service deduplicates, caches and survives a failed scraper factory")
+            return True
+        else:
+            print("❌ Scrape service test failed")
+            print(f"   Jobs: {first['id']}/{duplicate['id']} {done['status']}, cached: {cached['cached']}; "
+                  f"scraped: {scraped}; factory failure: {failed}; then: {recovered['status']}; "
+                  f"cold browsers: {cold}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Scrape service error: {e}")
+        return False
+
+
+def test_phase_policy():
+    """Test phase retries, structured failures, deadlines and the circuit breaker."""
+    print("\nTesting phase policy...")
+    
+    try:
+        import time
+        from utils.policy import (PolicyEngine, PhasePolicy, PhaseFailure, CircuitBreaker,
+                                  call_with_deadline, backoff_delay)
+        
+        engine = PolicyEngine({
+            'load': PhasePolicy(5.0, attempts=3, backoff=0),
+            'capture': PhasePolicy(5.0, attempts=3, backoff=0),
+        }, breaker=CircuitBreaker(threshold=2, cooldown=0.2))
+        
+        calls = []
+        
+        def flaky_load(timeout):
+            calls.append(timeout)
+            if len(calls) < 3:
+                raise TimeoutError("viewer missing")
+            return "loaded"
+        
+        loaded = engine.run('load', flaky_load, 'deck-a')
+        
+        def gone(timeout):
+            raise PhaseFailure('load', 'http_error', "HTTP 404")
+        
+        try:
+            engine.run('load', gone, 'deck-a')
+            not_found = None
+        except PhaseFailure as failure:
+            not_found = failure
+        
+        # Captures only retry the reasons their policy lists; other errors fail at once
+        attempts = []
+        try:
+            engine.run('capture', lambda timeout: attempts.append(1) or 1 / 0, 'deck-a')
+        except PhaseFailure as failure:
+            crashed = failure
+        
+        start = time.time()
+        try:
+            call_with_deadline(lambda: time.sleep(2) or "late", 0.1)
+            timed_out = False
+        except TimeoutError:
+            timed_out = time.time() - start < 1
+        
+        engine.record_failure('deck-b', not_found)
+        engine.record_failure('deck-b', not_found)
+        try:
+            engine.check_circuit('deck-b')
+            refused = None
+        except PhaseFailure as failure:
+            refused = failure
+        time.sleep(0.25)
+        engine.check_circuit('deck-b')  # Half-open after the cooldown
+        engine.record_success('deck-b')
+        
+        delays = [backoff_delay(3, 1.0, cap=3.0) for _ in range(20)]
+        
+        checks = [
+            loaded == "loaded" and calls == [5.0, 5.0, 5.0] and engine.retries == 2,
+            not_found is not None and not_found.attempts == 1 and not not_found.retryable,
+            not_found is not None and not_found.to_dict()['reason'] == 'http_error',
+            crashed.reason == 'error' and len(attempts) == 1 and crashed.retryable,
+            timed_out,
+            refused is not None and refused.reason == 'circuit_open' and not refused.retryable,
+            engine.breaker.state('deck-b') == "closed",
+            all(1.5 <= delay <= 3.0 for delay in delays) and len(set(delays)) > 1,
+        ]
+        
+        if all(checks):
+            print("✅ Phase policy retried, classified failures and opened the circuit")
+            return True
+        else:
+            print("❌ Phase policy test failed")
+            print(f"   Checks: {checks}; summary: {engine.summary()}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Phase policy error: {e}")
+        return False
+
+
+def test_timing_tuner():
+    """Test learned waits and that settling waits for animations and a minimum time."""
+    print("\nTesting timing tuner...")
+    
+    try:
+        from utils.prezi_scraper import PreziScraper
+        from utils.timing_tuner import TimingTuner
+        
+        Path("test_output").mkdir(exist_ok=True)
+        profile = "test_output/timings.json"
+        Path(profile).unlink(missing_ok=True)
+        
+        tuner = TimingTuner(profile, min_wait=0.5, margin=1.25, min_samples=2, max_samples=3,
+                            max_decks=2)
+        untuned = tuner.recommend('transition', 2.0, "prezi.com", "deck-a")
+        tuner.record('transition', 1.0, "prezi.com", "deck-a")
+        # One sample is not enough for the deck or its host
+        one_sample = tuner.recommend('transition', 2.0, "prezi.com", "deck-a")
+        tuner.record('transition', 1.0, "prezi.com", "deck-a")
+        deck_wait = tuner.recommend('transition', 2.0, "prezi.com", "deck-a")
+        tuner.record('transition', 0.1, "other.com", "deck-c")
+        tuner.record('transition', 0.1, "other.com", "deck-c")
+        floored = tuner.recommend('transition', 2.0, "other.com", "deck-c")
+        for _ in range(4):
+            tuner.record('transition', 0.2, "prezi.com", "deck-a")
+        # A third deck evicts the least recently updated one
+        tuner.record('transition', 0.3, "prezi.com", "deck-d")
+        kept = sorted(key for key in tuner._profiles if key.startswith('deck:'))
+        capped = list(tuner._profiles['deck:deck-a']['transition'])
+        tuner.save()
+        reloaded = TimingTuner(profile, min_samples=2).recommend('transition', 2.0, "other.com")
+        
+        # Workers sharing the file keep each other's profiles; writes are spaced out
+        first = TimingTuner(profile, min_samples=1)
+        second = TimingTuner(profile, min_samples=1)
+        first.record('load', 3.0, "one.example")
+        second.record('load', 4.0, "two.example")
+        first.save()
+        second.save()
+        first.record('load', 3.0, "one.example")
+        first.save()
+        throttled = len(TimingTuner(profile)._profiles['host:one.example']['load'])
+        first.save(force=True)
+        shared = TimingTuner(profile)._profiles
+        merged = (len(shared['host:one.example']['load']) == 2 and 'host:two.example' in shared
+                  and 'deck:deck-a' in shared)
+        
+        class AnimatingDriver:
+            # A CSS zoom: no new elements or images, but running animations
+            # for a few polls and a transform that changes while they run
+            def __init__(self, polls):
+                self.polls = polls
+            
+            def execute_script(self, script, *args):
+                self.polls -= 1
+                return [1, 0, self.polls] if self.polls > 0 else [0, 0, 0]
+        
+        scraper = PreziScraper(config=fake_deck_config(), tuner=TimingTuner(min_wait=0.1))
+        animated = scraper._wait_for_settle('transition', 3.0, AnimatingDriver(4))
+        minimum = scraper._wait_for_settle('transition', 3.0, AnimatingDriver(0), min_wait=0.8)
+        # A wait that runs out before the page settles is not a sample
+        scraper._wait_for_settle('transition', 0.6, AnimatingDriver(100))
+        samples = len(scraper.tuner._profiles['host:prezi.com']['transition'])
+        
+        if (untuned == 2.0 and one_sample == 2.0 and deck_wait == 1.25 and floored == 0.5
+                and kept == ["deck:deck-a", "deck:deck-d"] and capped == [0.2, 0.2, 0.2]
+                and reloaded == 0.5 and throttled == 1 and merged
+                and 1.0 <= animated < 2.0 and 0.8 <= minimum < 1.5 and samples == 2):
+            print("✅ Timing tuner learns waits and settling waits out animations")
+            return True
+        else:
+            print("❌ Timing tuner test failed")
+            print(f"   Recommended: {untuned}, {one_sample}, {deck_wait}, {floored}, {reloaded}; "
+                  f"decks: {kept}; samples: {capped}; throttled: {throttled}; merged: {merged}; "
+                  f"settled after {animated:.2f}s and {minimum:.2f}s; recorded: {samples}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Timing tuner error: {e}")
+        return False
+
+
+def test_link_index():
+    """Test the shared link index reports only globally new videos."""
+    print("\nTesting link index...")
+    
+    try:
+        from utils.link_index import LinkIndex
+        
+        Path("test_output").mkdir(exist_ok=True)
+        for stale in Path("test_output").glob("links.db*"):
+            stale.unlink()
+        
+        import threading
+        
+        LinkIndex("test_output/links.db").start_run()
+        index = LinkIndex("test_output/links.db")
+        index.start_run()
+        first = index.record(["dQw4w9WgXcQ", "jNQXAC9IVRw"], "deck-one")
+        # Workers of one process share the index and so record into the same run
+        recorded = []
+        worker = threading.Thread(
+            target=lambda: recorded.append(index.record(["dQw4w9WgXcQ", "9bZkp7q19f0"], "deck-two"))
+        )
+        worker.start()
+        worker.join()
+        second = recorded[0]
+        
+        # A worker that starts its run later must not hide what this run found
+        LinkIndex("test_output/links.db").start_run()
+        since_last = sorted(index.new_since_last_run())
+        
+        reopened = LinkIndex("test_output/links.db")
+        runs = {row[0] for row in reopened._connect().execute("SELECT run_id FROM sightings")}
+        
+        if (first == ["dQw4w9WgXcQ", "jNQXAC9IVRw"] and second == ["9bZkp7q19f0"]
+                and runs == {index.run_id}
+                and since_last == ["9bZkp7q19f0", "dQw4w9WgXcQ", "jNQXAC9IVRw"]
+                and reopened.decks_for("dQw4w9WgXcQ") == ["deck-one", "deck-two"]
+                and reopened.is_known("9bZkp7q19f0") and not reopened.is_known("aaaaaaaaaaa")):
+            print("✅ Link index deduplicates videos across decks")
+            return True
+        else:
+            print("❌ Link index test failed")
+            print(f"   New per deck: {first}, {second}; new since last run: {since_last}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Link index error: {e}")
+        return False
+
+
+def test_remote_driver_factory():
+    """Test capacity-aware scheduling and failover across remote endpoints."""
+    print("\nTesting remote driver factory...")
+    
+    try:
+        from utils.driver_factory import RemoteDriverFactory
+        
+        class FakeSession:
+            def quit(self):
+                pass
+        
+        class StubFactory(RemoteDriverFactory):
+            # Stands in for real nodes; set PREZI_TEST_REMOTE to a running
+            # chromedriver (e.g. http://localhost:9515) for an end-to-end check
+            def _start_session(self, endpoint):
+                if endpoint.url == "http://down:4444":
+                    raise ConnectionError("connection refused")
+                return FakeSession()
+        
+        factory = StubFactory(["http://down:4444@8", "http://a:4444@1", "http://b:4444@2"],
+                              acquire_timeout=0.1)
+        drivers = [factory() for _ in range(3)]
+        placed = sorted(driver.remote_endpoint for driver in drivers)
+        
+        try:
+            factory()
+            overflow = False
+        except RuntimeError:
+            overflow = True
+        
+        drivers[0].quit()
+        drivers[0].quit()
+        active = sum(endpoint["active"] for endpoint in factory.status())
+        
+        live_ok = True
+        live_url = os.getenv("PREZI_TEST_REMOTE")
+        if live_url:
+            live = RemoteDriverFactory([live_url])()
+            live_ok = live.execute_script("return 1") == 1
+            live.quit()
+        
+        if (placed == ["http://a:4444", "http://b:4444", "http://b:4444"]
+                and overflow and active == 2 and live_ok):
+            print("✅ Remote driver factory balances sessions and fails over")
+            return True
+        else:
+            print("❌ Remote driver factory test failed")
+            print(f"   Placed: {placed}; overflow: {overflow}; active: {active}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Remote driver factory error: {e}")
+        return False
+
+
+def test_remote_driver_deadline():
+    """Test that the driver deadline covers starting a session but not waiting for a slot."""
+    print("\nTesting remote driver deadline...")
+    
+    try:
+        import threading
+        import time
+        from utils.driver_factory import RemoteDriverFactory
+        from utils.policy import PhaseFailure
+        from utils.prezi_scraper import PreziScraper
+        
+        class FakeSession:
+            def quit(self):
+                pass
+        
+        class SlowStartFactory(RemoteDriverFactory):
+            start_delay = 0.0
+            
+            def _start_session(self, endpoint):
+                time.sleep(self.start_delay)
+                return FakeSession()
+        
+        factory = SlowStartFactory(["http://a:4444@1"], acquire_timeout=5)
+        scraper = PreziScraper(config=fake_deck_config(driver_start_timeout=0.3, phase_attempts=1),
+                               driver_factory=factory)
+        
+        # The only slot stays busy for longer than the driver deadline
+        busy = factory()
+        threading.Timer(1.0, busy.quit).start()
+        started = time.monotonic()
+        waited = scraper._setup_driver()
+        slot_wait = time.monotonic() - started
+        waited.quit()
+        
+        # A start that overruns the deadline fails, and its slot comes back once it ends
+        factory.start_delay = 0.6
+        try:
+            scraper._setup_driver()
+            failure = None
+        except PhaseFailure as e:
+            failure = e
+        held = factory.status()[0]["active"]
+        time.sleep(0.6)
+        released = factory.status()[0]["active"]
+        
+        if (slot_wait >= 0.9 and failure is not None and failure.reason == 'timeout'
+                and held == 1 and released == 0):
+            print("✅ Driver deadline excludes the slot wait and abandoned starts give their slot back")
+            return True
+        else:
+            print("❌ Remote driver deadline test failed")
+            print(f"   Slot wait: {slot_wait:.1f}s; failure: {failure!r}; active: {held} then {released}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Remote driver deadline error: {e}")
+        return False
+
+
+def test_driver_supervisor_hang():
+    """Test that the watchdog aborts a hung remote command while other threads keep working."""
+    print("\nTesting driver supervisor watchdog...")
+    
+    try:
+        import threading
+        import time
+        from utils.driver_supervisor import DriverSupervisor, DriverHangError
+        
+        class FakeExecutor:
+            def __init__(self, released):
+                self.released = released
+            
+            def execute(self, command, params):
+                self.released.set()
+        
+        class HangingRemoteDriver:
+            # No local service process, like a webdriver.Remote session
+            session_id = "remote-session"
+            
+            def __init__(self):
+                self.released = threading.Event()
+                self.command_executor = FakeExecutor(self.released)
+            
+            def execute(self, command, params=None):
+                if command == "hang" and self.released.wait(5):
+                    raise ConnectionError("session deleted")
+                return {"value": None}
+            
+            def quit(self):
+                pass
+        
+        supervisor = DriverSupervisor(factory=HangingRemoteDriver, max_pages=0, max_rss_mb=0,
+                                      command_timeout=0.3)
+        driver = supervisor.acquire()
+        
+        # A second thread finishing quick commands must not hide the hung one
+        stop = threading.Event()
+        
+        def ping():
+            while not stop.is_set():
+                driver.execute("ping")
+        
+        pinger = threading.Thread(target=ping, daemon=True)
+        pinger.start()
+        
+        started = time.monotonic()
+        try:
+            driver.execute("hang")
+            hang_error = None
+        except DriverHangError as e:
+            hang_error = e
+        elapsed = time.monotonic() - started
+        stop.set()
+        pinger.join(timeout=2)
+        
+        supervisor.release()
+        replaced = supervisor.acquire() is not driver
+        supervisor.close()
+        
+        if hang_error is not None and elapsed < 2 and supervisor.hang_count == 1 and replaced:
+            print("✅ Watchdog deletes hung remote sessions and the driver is replaced")
+            return True
+        else:
+            print("❌ Driver supervisor test failed")
+            print(f"   Error: {hang_error!r} after {elapsed:.1f}s; hangs: {supervisor.hang_count}; "
+                  f"replaced: {replaced}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Driver supervisor error: {e}")
+        return False
+
+
+def test_navigation_deadline():
+    """Test that a navigation click past its deadline is abandoned and its browser discarded."""
+    print("\nTesting navigation deadline...")
+    
+    try:
+        import threading
+        import time
+        from utils.prezi_scraper import PreziScraper
+        from utils.driver_supervisor import DriverSupervisor
+        from utils.policy import PhaseFailure
+        
+        unblock = threading.Event()
+        
+        class NavDeckDriver(FakeDeckDriver):
+            def find_elements(self, by, value):
+                return [FakeDeckElement(self)] if "nav" in value else []
+        
+        supervisor = DriverSupervisor(max_pages=0, max_rss_mb=0, command_timeout=0)
+        scraper = PreziScraper(config=fake_deck_config(element_wait_timeout=1, phase_attempts=1),
+                               driver_factory=lambda: NavDeckDriver(on_advance=lambda d: unblock.wait(5)),
+                               supervisor=supervisor)
+        scraper.screenshot_capture.settle_delay = 0
+        
+        started = time.monotonic()
+        try:
+            scraper.scrape_prezi("https://prezi.com/p/fake-deck/")
+            failure = None
+        except PhaseFailure as e:
+            failure = e
+        elapsed = time.monotonic() - started
+        unblock.set()
+        supervisor.close()
+        
+        if (failure is not None and failure.phase == 'navigation' and failure.reason == 'timeout'
+                and elapsed < 4 and supervisor.recycle_count == 1 and supervisor.driver is None):
+            print("✅ Hung navigation click is abandoned and the browser is not reused")
+            return True
+        else:
+            print("❌ Navigation deadline test failed")
+            print(f"   Failure: {failure!r} after {elapsed:.1f}s; recycled: {supervisor.recycle_count}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Navigation deadline error: {e}")
+        return False
+
+
+def test_prezi_probe_fixture():
+    """Test browser-free probing against a saved Prezi page."""
+    print("\nTesting Prezi probe...")
+    
+    try:
+        import threading
+        from utils.prezi_probe import PreziProbe
+        
+        html = (Path(__file__).parent / "fixtures" / "prezi_probe_page.html").read_text(encoding="utf-8")
+        probe = PreziProbe(output_dir="test_output")
+        result = probe.probe_html(html, "https://prezi.com/p/abc123xyz/climate-basics/")
+        empty = probe.probe_html("<html><body><div id='app'></div></body></html>",
+                                 "https://prezi.com/p/abc123xyz/")
+        blocked = probe.probe_html("", "https://prezi.com/p/abc123xyz/", status=403)
+        missing = probe.probe_html("", "https://prezi.com/p/abc123xyz/", status=404)
+        
+        # probe_many's workers all ask for the session at once; only one is created
+        sessions = []
+        start = threading.Barrier(8)
+        
+        def get_session():
+            start.wait()
+            sessions.append(probe.session)
+        
+        threads = [threading.Thread(target=get_session) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        shared = len({id(session) for session in sessions}) == 1
+        probe.close()
+        closed = probe._session is None
+        
+        expected_links = sorted([
+            "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+            "https://www.youtube.com/watch?v=jNQXAC9IVRw",
+            "https://www.youtube.com/watch?v=9bZkp7q19f0",
+        ])
+        if (result.title == "Climate Basics" and result.estimated_frames == 14
+                and result.youtube_links == expected_links and not result.needs_browser
+                and empty.needs_browser and empty.youtube_links == []
+                and blocked.needs_browser and not missing.needs_browser and shared and closed):
+            print("✅ Prezi probe reads title, frame count and links from HTML")
+            return True
+        else:
+            print("❌ Prezi probe test failed")
+            print(f"   Result: {result.to_dict()}; one session: {shared}; closed: {closed}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Prezi probe error: {e}")
+        return False
+
+
+def test_incremental_slide_store():
+    """Test that re-scraping a deck only writes changed slides."""
+    print("\nTesting incremental slide store...")
+    
+    try:
+        from utils.incremental import IncrementalSlideStore
+        
+        deck_dir = Path("test_output") / "incremental_deck"
+        shutil.rmtree(deck_dir, ignore_errors=True)
+        
+        first = IncrementalSlideStore(str(deck_dir), "deck")
+        for index, data in enumerate([b"one", b"two", b"three"], start=1):
+            first.store_bytes(index, data)
+        first.finish()
+        
+        second = IncrementalSlideStore(str(deck_dir), "deck")
+        second.store_bytes(1, b"one")
+        second.store_bytes(2, b"TWO")
+        diff = second.finish()
+        
+        files = sorted(path.name for path in deck_dir.glob("slide_*.png"))
+        if (diff["changed"] == [2] and diff["removed"] == [3] and diff["unchanged"] == [1]
+                and diff["bytes_written"] == 3 and files == ["slide_001.png", "slide_002.png"]):
+            print("✅ Incremental store writes only changed slides")
+            return True
+        else:
+            print("❌ Incremental slide store test failed")
+            print(f"   Diff: {diff}; files: {files}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Incremental slide store error: {e}")
+        return False
+
+
+def test_session_record_replay():
+    """Test recording responses from a performance log and replaying them locally."""
+    print("\nTesting session record and replay...")
+    
+    try:
+        import hashlib
+        import json
+        import urllib.request
+        from urllib.error import HTTPError
+        from utils.session_archive import SessionRecorder, ReplayServer
+        
+        bodies = {
+            "1": '<script src="https://static.prezi.com/app.js"></script>',
+            "2": 'var home = "https:\\/\\/prezi.com\\/p\\/abc\\/";',
+            "3": 'body { margin: 0; }',
+        }
+        responses = {
+            "1": ("https://prezi.com/p/abc/", "text/html"),
+            "2": ("https://static.prezi.com/app.js", "application/javascript"),
+            "3": ("https://prezi.com/static/site.css", "text/css"),
+        }
+        
+        class RecordingDriver:
+            def get_log(self, log_type):
+                entries = []
+                for request_id, (url, mime) in responses.items():
+                    for method, params in [
+                        ("Network.requestWillBeSent", {"request": {"url": url, "method": "GET"}}),
+                        ("Network.responseReceived", {"response": {
+                            "url": url, "status": 200, "mimeType": mime,
+                            "headers": {"Content-Type": mime}}}),
+                        ("Network.loadingFinished", {}),
+                    ]:
+                        params["requestId"] = request_id
+                        entries.append({"message": json.dumps({"message": {"method": method, "params": params}})})
+                return entries
+            
+            def execute_cdp_cmd(self, command, params):
+                return {"body": bodies[params["requestId"]], "base64Encoded": False}
+        
+        archive = Path("test_output") / "session_archive"
+        shutil.rmtree(archive, ignore_errors=True)
+        recorder = SessionRecorder(str(archive))
+        # A body cut short by a crash mid-write is written again, not reused
+        truncated = recorder.bodies_dir / hashlib.sha1(bodies["3"].encode()).hexdigest()
+        truncated.write_bytes(bodies["3"][:4].encode())
+        recorder.step("load", url="https://prezi.com/p/abc/")
+        recorded = recorder.collect(RecordingDriver())
+        recorder.save()
+        
+        with ReplayServer(str(archive)) as replay:
+            page = urllib.request.urlopen(replay.resolve("https://prezi.com/p/abc/")).read().decode()
+            script = urllib.request.urlopen(f"{replay.base_url}/static.prezi.com/app.js").read().decode()
+            # Requested by the page as "/static/site.css", so only its Referer names the host
+            relative = urllib.request.Request(f"{replay.base_url}/static/site.css",
+                                              headers={"Referer": replay.resolve("https://prezi.com/p/abc/")})
+            stylesheet = urllib.request.urlopen(relative).read().decode()
+            try:
+                urllib.request.urlopen(replay.resolve("https://prezi.com/missing"))
+                missing_status = 200
+            except HTTPError as e:
+                missing_status = e.code
+            escaped_base = replay.base_url.replace("/", "\\/")
+            
+            if (recorded == 3 and f"{replay.base_url}/static.prezi.com/app.js" in page
+                    and f"{escaped_base}\\/prezi.com\\/p" in script
+                    and stylesheet == bodies["3"] and missing_status == 404 and len(replay.misses) == 1):
+                print("✅ Recorded session replays with rewritten URLs")
+                return True
+            else:
+                print("❌ Session record and replay test failed")
+                print(f"   Page: {page}; script: {script}; misses: {replay.misses}")
+                return False
+            
+    except Exception as e:
+        print(f"❌ Session record and replay error: {e}")
+        return False
+
+
+def test_slide_text_index():
+    """Test full-text search over indexed slides and re-indexing a deck."""
+    print("\nTesting slide text index...")
+    
+    try:
+        import tempfile
+        from utils.text_index import SlideTextIndex
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            index = SlideTextIndex(os.path.join(tmp, "text.db"))
+            index.add_deck("deck_a", "Climate Basics", [
+                {'index': 1, 'path': "a/slide_001.png", 'text': "Sea levels are rising"},
+                {'index': 2, 'path': "a/slide_002.png", 'text': "Carbon pricing after COVID-19",
+                 'youtube_links': ["https://www.youtube.com/watch?v=dQw4w9WgXcQ"]},
+            ], url="https://prezi.com/p/deck_a/")
+            index.add_deck("deck_b", "Cooking", [{'index': 1, 'path': "b/slide_001.png", 'text': "Rising dough"}])
+            
+            rising = sorted((m['deck_id'], m['frame_index']) for m in index.search("rise"))
+            covid = [m['frame_index'] for m in index.search("covid-19")]
+            video = [m['frame_index'] for m in index.search("dQw4w9WgXcQ")]
+            
+            # Re-indexing replaces the deck's slides
+            index.add_deck("deck_b", "Cooking", [{'index': 1, 'path': "b/slide_001.png", 'text': "Bread"}])
+            stats = index.stats()
+            after = [m['deck_id'] for m in index.search("rising")]
+        
+        if (rising == [("deck_a", 1), ("deck_b", 1)] and covid == [2] and video == [2]
+                and stats == {'decks': 2, 'slides': 3} and after == ["deck_a"]):
+            print("✅ Slide text search found stemmed words, punctuation and video IDs")
+            return True
+        else:
+            print("❌ Slide text index test failed")
+            print(f"   rise: {rising}; covid: {covid}; video: {video}; stats: {stats}; after: {after}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Slide text index error: {e}")
+        return False
+
+
+def test_youtube_metadata():
+    """Test oEmbed metadata lookups against a local stub server, and the TTL cache."""
+    print("\nTesting YouTube metadata resolver...")
+    
+    try:
+        import json
+        import tempfile
+        import threading
+        import time
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        from urllib.parse import urlparse, parse_qs
+        from utils.youtube_metadata import YouTubeMetadataResolver
+        
+        requested = []
+        
+        class OEmbedStub(BaseHTTPRequestHandler):
+            def do_GET(self):
+                video_url = parse_qs(urlparse(self.path).query)['url'][0]
+                video_id = video_url.rsplit('=', 1)[-1]
+                requested.append(video_id)
+                status = {'privatevideo': 401, 'removedvid0': 404}.get(video_id, 200)
+                body = json.dumps({'title': f"Video {video_id}", 'author_name': "Channel"}).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            
+            def log_message(self, format, *args):
+                pass
+        
+        server = ThreadingHTTPServer(('127.0.0.1', 0), OEmbedStub)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        endpoint = f"http://127.0.0.1:{server.server_address[1]}/oembed"
+        
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                cache = os.path.join(tmp, "metadata.db")
+                ids = ["dQw4w9WgXcQ", "privatevideo", "removedvid0", "dQw4w9WgXcQ"]
+                
+                first = YouTubeMetadataResolver(cache, endpoint=endpoint, workers=4).resolve_many(ids)
+                first_requests = len(requested)
+                # A new resolver, as in the next run, answers from the cache
+                second = YouTubeMetadataResolver(cache, endpoint=endpoint).resolve_many(ids)
+                second_requests = len(requested) - first_requests
+                # Removed videos expire after a day, the others after a week
+                resolver = YouTubeMetadataResolver(cache, endpoint=endpoint)
+                after_two_days = sorted(resolver.cache.get_many(ids, now=time.time() + 2 * 86400))
+                after_eight_days = resolver.cache.get_many(ids, now=time.time() + 8 * 86400)
+        finally:
+            server.shutdown()
+            server.server_close()
+        
+        statuses = {video_id: metadata.status for video_id, metadata in first.items()}
+        if (statuses == {"dQw4w9WgXcQ": "available", "privatevideo": "restricted",
+                         "removedvid0": "unavailable"}
+                and first["dQw4w9WgXcQ"].title == "Video dQw4w9WgXcQ"
+                and first_requests == 3 and second_requests == 0
+                and second["dQw4w9WgXcQ"].title == "Video dQw4w9WgXcQ"
+                and after_two_days == ["dQw4w9WgXcQ", "privatevideo"] and not after_eight_days):
+            print("✅ YouTube metadata resolved once per video and served from the cache")
+            return True
+        else:
+            print("❌ YouTube metadata test failed")
+            print(f"   statuses: {statuses}; requests: {first_requests}, {second_requests}; "
+                  f"cached after two days: {after_two_days}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ YouTube metadata error: {e}")
+        return False
+
+
+def test_crop_bounds():
+    """Test detection of viewer chrome and blank borders across a batch of slides."""
+    print("\nTesting crop bounds detection...")
+    
+    try:
+        import numpy as np
+    except ImportError:
+        print("⚠️  NumPy not installed, skipping crop bounds test")
+        return True
+    
+    try:
+        from utils.post_process import detect_batch_bounds
+        
+        rng = np.random.default_rng(0)
+        frames = []
+        for _ in range(4):
+            frame = np.full((200, 300, 3), 255, np.uint8)
+            frame[180:, :] = (40, 40, 40)  # toolbar, identical on every slide
+            frame[20:150, 50:250] = rng.integers(0, 255, (130, 200, 3), dtype=np.uint8)
+            frames.append(frame)
+        
+        bounds = detect_batch_bounds(frames)
+        single = detect_batch_bounds(frames[:1])
+        
+        # A footer repeated on every slide is slide content, not viewer chrome
+        for frame in frames:
+            frame[165:175, 20:90] = (90, 90, 90)
+        footer = detect_batch_bounds(frames)
+        
+        if bounds == (50, 20, 250, 150) and single == (0, 20, 300, 200) and footer == (20, 20, 250, 175):
+            print("✅ Crop bounds exclude letterboxing and static toolbar, keeping a repeated footer")
+            return True
+        else:
+            print("❌ Crop bounds test failed")
+            print(f"   Bounds: {bounds}; single frame: {single}; with footer: {footer}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Crop bounds error: {e}")
+        return False
+
+
+def test_renditions():
+    """Test that renditions are written from PNG data held in memory."""
+    print("\nTesting slide renditions...")
+    
+    try:
+        import io
+        import tempfile
+        from PIL import Image
+        from utils.renditions import RenditionPool, parse_rendition
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            buffer = io.BytesIO()
+            Image.new('RGB', (1600, 900), (30, 90, 160)).save(buffer, format='PNG')
+            slide_path = os.path.join(tmp, "slide_001.png")  # never written to disk
+            
+            pool = RenditionPool([parse_rendition("web:800"), parse_rendition("thumb:160")], workers=2)
+            pool.add(slide_path, buffer.getvalue())
+            results = pool.flush()
+            pool.close()
+            
+            sizes = {result['name']: result['size'] for result in results}
+            exists = all(os.path.exists(result['path']) for result in results)
+        
+        if sizes == {'web': (800, 450), 'thumb': (160, 90)} and exists:
+            print("✅ Renditions written at 800x450 and 160x90")
+            return True
+        else:
+            print("❌ Renditions test failed")
+            print(f"   Sizes: {sizes}; files exist: {exists}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Renditions error: {e}")
+        return False
+
+
+def test_scrape_profiler():
+    """Test that sampled stacks and the summary are labelled by deck and slide."""
+    print("\nTesting scrape profiler...")
+    
+    try:
+        import tempfile
+        import time
+        from utils.policy import call_with_deadline
+        from utils.profiling import ScrapeProfiler
+        
+        # Stands in for a WebDriver command run within a phase deadline
+        scope = {'__name__': "selenium.webdriver.remote.fake", 'time': time}
+        exec("def command():\n    time.sleep(0.2)", scope)
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            profiler = ScrapeProfiler(tmp, mode='sample', interval=0.002).start()
+            profiler.label("deck_a", slide=2)
+            deadline = time.perf_counter() + 0.2
+            while time.perf_counter() < deadline:
+                sum(range(1000))
+            profiler.label("deck_b", slide=1)
+            call_with_deadline(scope['command'], 5)
+            profiler.clear_label()
+            written = profiler.stop()
+            
+            with open(written['collapsed'], 'r', encoding='utf-8') as f:
+                stacks = f.read().splitlines()
+            summary = profiler.summary()
+        
+        slides = summary['decks'].get('deck_a', {}).get('slides', {})
+        waited = summary['decks'].get('deck_b', {})
+        own = [line for line in stacks if not line.startswith("deck deck_b;slide 1;")]
+        if (stacks and all(line.startswith("deck deck_a;slide 2;") for line in own) and '2' in slides
+                and waited.get('webdriver_seconds', 0) > 0.1
+                and any("selenium.webdriver.remote.fake.command" in line for line in stacks)):
+            print(f"✅ Profiler sampled {summary['samples']} stack(s) for deck_a slide 2")
+            return True
+        else:
+            print("❌ Scrape profiler test failed")
+            print(f"   Stacks: {stacks[:2]}; summary: {summary}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Scrape profiler error: {e}")
+        return False
+
+
+def test_progress_tracker():
+    """Test rolling throughput, ETA, stall detection and the status file."""
+    print("\nTesting progress tracker...")
+    
+    try:
+        import io
+        import json
+        import tempfile
+        import time
+        from utils.progress import ProgressTracker, RollingRate, _LiveConsole
+        
+        rate = RollingRate(window=3)
+        for now, count in [(0, 0), (10, 1), (20, 2), (30, 6), (40, 10)]:
+            rate.add(count, now)
+        # Only the last three intervals count: 9 slides in 30 seconds
+        per_second = rate.per_second()
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            status_path = os.path.join(tmp, "status.json")
+            tracker = ProgressTracker(status_path, stall_after=60, min_interval=0)
+            tracker.start_batch(3)
+            tracker.start_deck("deck_a", "https://prezi.com/p/deck_a/", total_frames=10)
+            for _ in range(4):
+                time.sleep(0.01)
+                tracker.slide_done("deck_a")
+            running = tracker.snapshot()
+            stalled = tracker.snapshot(now=time.time() + 61)
+            tracker.finish_deck("deck_a")
+            tracker.close()
+            with open(status_path, encoding='utf-8') as f:
+                status = json.load(f)
+        
+        buffer = io.StringIO()
+        console = _LiveConsole(buffer)
+        console.set_line("1/10")
+        console.write("Screenshot saved")
+        console.write("\n")
+        console.set_line("2/10")
+        console.release()
+        
+        deck = running['decks']['deck_a']
+        if (abs(per_second - 0.3) < 1e-9 and deck['captured'] == 4 and deck['eta_seconds'] is not None
+                and not deck['stalled'] and stalled['state'] == 'stalled'
+                and status['decks'] == {} and status['batch']['completed'] == 1
+                and status['slides_captured'] == 4
+                and buffer.getvalue() == "1/10\r\x1b[KScreenshot saved\n1/10\r\x1b[K2/10\n"):
+            print("✅ Progress tracker reported throughput, ETA and stalls")
+            return True
+        else:
+            print("❌ Progress tracker test failed")
+            print(f"   rate: {per_second}; deck: {deck}; state when idle: {stalled['state']}; "
+                  f"status: {status}; console: {buffer.getvalue()!r}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Progress tracker error: {e}")
+        return False
+
+
+def test_async_scraper():
+    """Test that the async scraper bounds concurrency and cancels decks."""
+    print("\nTesting async scraper...")
+    
+    try:
+        import asyncio
+        import threading
+        import time
+        from utils.async_scraper import AsyncPreziScraper
+        from utils.events import SlideEvent, CompletedEvent
+        
+        lock = threading.Lock()
+        state = {'active': 0, 'peak': 0, 'cancelled': []}
+        
+        class StubScraper:
+            def __init__(self, index):
+                self.index = index
+            
+            def iter_scrape(self, url):
+                with lock:
+                    state['active'] += 1
+                    state['peak'] = max(state['peak'], state['active'])
+                try:
+                    for index in range(1, 4):
+                        time.sleep(0.05)
+                        yield SlideEvent(index=index, path=f"{url}/{index}")
+                    yield CompletedEvent(title=url, screenshots=["1", "2", "3"])
+                except GeneratorExit:
+                    state['cancelled'].append(url)
+                    raise
+                finally:
+                    with lock:
+                        state['active'] -= 1
+            
+            def close(self):
+                pass
+        
+        async def run():
+            async with AsyncPreziScraper(max_concurrency=2, scraper_factory=StubScraper) as scraper:
+                results = await scraper.scrape_many(["a", "b", "c"])
+                task = asyncio.create_task(scraper.scrape("slow"))
+                await asyncio.sleep(0.08)
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+                return results
+        
+        results = asyncio.run(run())
+        titles = [result['title'] for result in results]
+        
+        if titles == ["a", "b", "c"] and state['peak'] == 2 and state['cancelled'] == ["slow"]:
+            print("✅ Async scraper ran 2 decks at a time and cancelled the slow one")
+            return True
+        else:
+            print("❌ Async scraper test failed")
+            print(f"   Titles: {titles}; state: {state}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Async scraper error: {e}")
+        return False
+
+
+def test_scrape_events():
+    """Test the order of scrape events and that scrape_prezi releases the browser."""
+    print("\nTesting scrape events...")
+    
+    try:
+        from utils.prezi_scraper import PreziScraper
+        from utils.events import SlideEvent, LinkEvent, CompletedEvent
+        
+        drivers = []
+        
+        def factory():
+            drivers.append(FakeDeckDriver(links=["https://www.youtube.com/embed/dQw4w9WgXcQ"]))
+            return drivers[-1]
+        
+        scraper = PreziScraper(config=fake_deck_config(), driver_factory=factory)
+        scraper.screenshot_capture.settle_delay = 0
+        events = list(scraper.iter_scrape("https://prezi.com/p/fake-deck/"))
+        kinds = [type(event).__name__ for event in events]
+        
+        result = scraper.scrape_prezi("https://prezi.com/p/fake-deck/")
+        released = scraper.driver is None and all(driver.closed for driver in drivers)
+        
+        if (kinds == [SlideEvent.__name__, LinkEvent.__name__, CompletedEvent.__name__]
+                and events[1].video_id == "dQw4w9WgXcQ" and events[-1].screenshots == [events[0].path]
+                and len(result['screenshots']) == 1 and len(drivers) == 2 and released):
+            print("✅ Scrape events arrive as slide, link, completed and the browser is released")
+            return True
+        else:
+            print("❌ Scrape events test failed")
+            print(f"   Events: {kinds}; drivers: {len(drivers)}; released: {released}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Scrape events error: {e}")
+        return False
+
+
+def test_parallel_capture():
+    """Test that sharded capture uses the page's frame count and counts retried frames once."""
+    print("\nTesting parallel capture...")
+    
+    try:
+        import threading
+        from utils.prezi_scraper import PreziScraper
+        from utils.progress import ProgressTracker
+        
+        lock = threading.Lock()
+        state = {'failed': False}
+        
+        def fail_once(driver):
+            # The first shard fails after capturing its first frame and is retried
+            with lock:
+                if driver.captures and not state['failed']:
+                    state['failed'] = True
+                    raise RuntimeError("browser crashed")
+        
+        drivers = []
+        
+        def factory():
+            drivers.append(FakeDeckDriver(5, fail_once))
+            return drivers[-1]
+        
+        class RecordingPostProcessor:
+            # Notes how many captures had been made when each slide was queued
+            def __init__(self):
+                self.added = []
+                self.flushes = 0
+            
+            def add(self, path):
+                self.added.append((path, sum(driver.captures for driver in drivers)))
+            
+            def flush(self):
+                self.flushes += 1
+                return []
+            
+            def close(self):
+                pass
+        
+        # Start without an archive from an earlier run, so every slide is new
+        shutil.rmtree("test_prezi_output", ignore_errors=True)
+        progress = ProgressTracker()
+        post_processor = RecordingPostProcessor()
+        scraper = PreziScraper(config=fake_deck_config(incremental=True, max_slides=50),
+                               driver_factory=factory, progress=progress,
+                               post_processor=post_processor)
+        scraper.screenshot_capture.settle_delay = 0
+        results = scraper.scrape_prezi_parallel("https://prezi.com/p/fake-deck/", shards=2)
+        captured = progress.snapshot()['slides_captured']
+        scraper.close()
+        contents = [Path(path).read_bytes() for path in results['screenshots']]
+        total_captures = sum(driver.captures for driver in drivers)
+        # Cropping started while shards were still capturing
+        overlapped = (post_processor.flushes == 1
+                      and {path for path, _ in post_processor.added} == set(results['screenshots'])
+                      and min(count for _, count in post_processor.added) < total_captures)
+        
+        sequential = PreziScraper(config=fake_deck_config(), driver_factory=FakeDeckDriver)
+        sequential.screenshot_capture.settle_delay = 0
+        fallback = sequential.scrape_prezi_parallel("https://prezi.com/p/no-count/", shards=2)
+        
+        if (contents == [b"frame %d" % i for i in range(5)] and state['failed'] and captured == 5
+                and overlapped
+                and results['diff']['added'] == [1, 2, 3, 4, 5] and not results['failed_frames']
+                and len(fallback['screenshots']) == 1 and 'failed_frames' not in fallback):
+            print("✅ Parallel capture sharded the page's 5 frames and fell back without a count")
+            return True
+        else:
+            print("❌ Parallel capture test failed")
+            print(f"   Contents: {contents}; progress: {captured}; diff: {results.get('diff')}; "
+                  f"fallback: {fallback}; queued for cropping: {post_processor.added}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Parallel capture error: {e}")
+        return False
+
+
 def test_screenshot_capture():
     """Test screenshot capture utility."""
     print("\nTesting screenshot capture...")
@@ -117,6 +1578,113 @@ def test_screenshot_capture():
         return False
 
 
+def test_streaming_png_writer():
+    """Test that band-by-band PNG output decodes to the original pixels."""
+    print("\nTesting streaming PNG writer...")
+    
+    try:
+        from PIL import Image
+        from utils.screenshot_capture import StreamingPNGWriter
+        
+        Path("test_screenshots").mkdir(exist_ok=True)
+        source = Image.new("RGB", (40, 30), (200, 10, 10))
+        source.paste((10, 200, 10), (0, 15, 40, 30))
+        
+        output_path = Path("test_screenshots") / "stitched.png"
+        with open(output_path, "wb") as f:
+            writer = StreamingPNGWriter(f, 40, 30)
+            writer.write_rows(source.crop((0, 0, 40, 15)).tobytes())
+            writer.write_rows(source.crop((0, 15, 40, 30)).tobytes())
+            writer.close()
+        
+        with Image.open(output_path) as stitched:
+            matches = stitched.size == source.size and stitched.tobytes() == source.tobytes()
+        
+        if matches:
+            print("✅ Streaming PNG writer produces a valid image")
+            return True
+        else:
+            print("❌ Streaming PNG output does not match the source image")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Streaming PNG writer error: {e}")
+        return False
+
+
+def test_atomic_deck_output():
+    """Test atomic writes, per-deck screenshot names and the completion manifest."""
+    print("\nTesting atomic deck output...")
+    
+    try:
+        import tempfile
+        from pathlib import Path
+        from utils.deck import read_completion, COMPLETION_FILENAME
+        from utils.fileio import atomic_path, atomic_write_json
+        from utils.screenshot_capture import ScreenshotCapture
+        
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "slide.png"
+            target.write_bytes(b"old")
+            try:
+                with atomic_path(target) as temp_path:
+                    temp_path.write_bytes(b"half")
+                    raise RuntimeError("capture failed")
+            except RuntimeError:
+                pass
+            kept = target.read_bytes()
+            
+            capture = ScreenshotCapture(os.path.join(tmp, "screenshots"), timestamped=False)
+            first = capture.save_png(b"png1", "deck_a/slide_001")
+            second = capture.save_png(b"png2", "deck_a/slide_001")
+            
+            deck_dir = Path(first).parent
+            missing = read_completion(str(deck_dir))
+            atomic_write_json(deck_dir / COMPLETION_FILENAME, {'deck_id': "deck_a", 'slides': []})
+            completion = read_completion(str(deck_dir))
+            leftovers = [p.name for p in Path(tmp).rglob("*") if ".tmp" in p.name]
+            contents = Path(second).read_bytes()
+            
+            # A rerun whose browser does not start leaves the last complete output marked complete
+            from utils.prezi_scraper import PreziScraper
+            
+            def no_browser():
+                raise RuntimeError("chrome not found")
+            
+            config = fake_deck_config(output_dir=tmp, phase_attempts=1)
+            scraper = PreziScraper(config=config, driver_factory=FakeDeckDriver)
+            scraper.screenshot_capture.settle_delay = 0
+            scraped = scraper.scrape_prezi("https://prezi.com/p/deck-b/")
+            scraper.driver_factory = no_browser
+            try:
+                scraper.scrape_prezi("https://prezi.com/p/deck-b/")
+            except Exception:
+                pass
+            kept_manifest = read_completion(scraped['deck_dir'])
+            # Likewise in parallel mode with the frame count given, so no browser opens first
+            parallel = scraper.scrape_prezi_parallel("https://prezi.com/p/deck-b/", total_frames=3,
+                                                     shards=2)
+            kept_parallel = read_completion(scraped['deck_dir'])
+        
+        if (kept == b"old" and first == second and Path(first).name == "slide_001.png"
+                and deck_dir.name == "deck_a" and contents == b"png2" and missing is None
+                and completion == {'deck_id': "deck_a", 'slides': []} and not leftovers
+                and kept_manifest is not None and kept_manifest['deck_id'] == "deck-b"
+                and parallel['failed_frames'] == ["1-1", "2-3"] and kept_parallel == kept_manifest):
+            print("✅ Deck output written atomically into per-deck folders")
+            return True
+        else:
+            print("❌ Atomic deck output test failed")
+            print(f"   kept: {kept}; paths: {first}, {second}; completion: {completion}; "
+                  f"leftovers: {leftovers}; manifest after a failed rerun: {kept_manifest}, "
+                  f"after a failed parallel rerun: {kept_parallel}")
+            return False
+            
+    except Exception as e:
+        print(f"❌ Atomic deck output error: {e}")
+        return False
+
+
 def test_prezi_scraper_init():
     """Test Prezi scraper initialization (without actually scraping)."""
     print("\nTesting Prezi scraper initialization...")
@@ -167,9 +1735,36 @@ def main():
     # Run tests
     tests = [
         test_imports,
+        test_lazy_scraper_import,
         test_config,
         test_youtube_extractor,
+        test_youtube_extractor_deck_scoping,
+        test_youtube_extractor_in_browser,
+        test_work_queue,
+        test_rate_limiter,
+        test_scrape_service,
+        test_phase_policy,
+        test_timing_tuner,
+        test_link_index,
+        test_remote_driver_factory,
+        test_remote_driver_deadline,
+        test_driver_supervisor_hang,
+        test_navigation_deadline,
+        test_prezi_probe_fixture,
+        test_incremental_slide_store,
+        test_session_record_replay,
+        test_slide_text_index,
+        test_youtube_metadata,
+        test_crop_bounds,
+        test_renditions,
+        test_scrape_profiler,
+        test_progress_tracker,
+        test_async_scraper,
+        test_scrape_events,
+        test_parallel_capture,
         test_screenshot_capture,
+        test_streaming_png_writer,
+        test_atomic_deck_output,
         test_prezi_scraper_init
     ]
     
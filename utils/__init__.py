@@ -1,8 +1,35 @@
 """Utils package for Prezi downloading functionality."""
 
-from .prezi_scraper import PreziScraper
-from .screenshot_capture import ScreenshotCapture
-from .youtube_extractor import YouTubeExtractor
-from .config import ScraperConfig
+from importlib import import_module
 
-__all__ = ['PreziScraper', 'ScreenshotCapture', 'YouTubeExtractor', 'ScraperConfig']
+# Submodules are imported on first attribute access so that lightweight
+# users (CLI help, config, YouTube extraction) do not pay for Selenium.
+_LAZY_ATTRIBUTES = {
+    'PreziScraper': '.prezi_scraper',
+    'AsyncPreziScraper': '.async_scraper',
+    'ScreenshotCapture': '.screenshot_capture',
+    'YouTubeExtractor': '.youtube_extractor',
+    'ScraperConfig': '.config',
+    'SlideEvent': '.events',
+    'LinkEvent': '.events',
+    'CompletedEvent': '.events',
+}
+
+__all__ = ['PreziScraper', 'AsyncPreziScraper', 'ScreenshotCapture', 'YouTubeExtractor', 'ScraperConfig',
+           'SlideEvent', 'LinkEvent', 'CompletedEvent']
+
+
+def __getattr__(name: str):
+    """Import public utilities lazily on first access."""
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    """Include lazily loaded utilities in dir() output."""
+    return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,205 @@
+"""Asyncio front end that runs PreziScraper jobs without blocking the event loop."""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import replace
+from pathlib import Path
+from typing import Optional, Dict, List, Callable, AsyncIterator, Union
+
+from .config import ScraperConfig
+from .events import CompletedEvent, ScrapeEvent
+
+# Marks the end of a deck's event stream
+_DONE = object()
+
+
+class AsyncPreziScraper:
+    """
+    Scrapes Prezi presentations from asyncio code.
+    
+    Each deck runs on a PreziScraper in a worker thread, and its events are
+    handed to the event loop as they arrive. Up to ``max_concurrency`` decks
+    run at once; further calls wait on a semaphore. Scrapers (and their warm
+    browsers) are reused across decks and shut down by close().
+    
+    Cancelling a scrape, or leaving ``async for`` early, stops the deck after
+    the WebDriver command in progress and releases its browser; its worker
+    slot is only reused once that has happened.
+    """
+    
+    def __init__(self, config: Optional[ScraperConfig] = None, max_concurrency: int = 2,
+                 scraper_factory: Optional[Callable[[int], object]] = None):
+        """
+        Initialize the async scraper.
+        
+        Args:
+            config: Scraper settings used by the default scraper factory (optional)
+            max_concurrency: Number of decks scraped at the same time
+            scraper_factory: Callable taking a worker index and returning a
+                PreziScraper; defaults to supervised scrapers that write to
+                ``worker_N`` subfolders when more than one deck runs at a time
+        """
+        self.config = config or ScraperConfig()
+        self.max_concurrency = max(1, max_concurrency)
+        self.scraper_factory = scraper_factory or self._default_scraper
+        
+        self._executor = ThreadPoolExecutor(max_workers=self.max_concurrency,
+                                            thread_name_prefix="async-prezi")
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._idle: List[object] = []
+        self._scrapers: List[object] = []
+        self._running: List[asyncio.Future] = []
+        self._progress = None
+        self._policy = None
+    
+    def _default_scraper(self, index: int):
+        """Create a scraper with a warm, supervised browser for one worker slot."""
+        from .driver_supervisor import DriverSupervisor
+        from .policy import PolicyEngine
+        from .prezi_scraper import PreziScraper
+        from .progress import ProgressTracker
+        
+        config = self.config
+        if self._progress is None and (config.progress_file or config.live_progress):
+            # Shared by every worker slot, so one status file covers all decks in flight
+            self._progress = ProgressTracker.from_config(config)
+        if self._policy is None:
+            # Shared too, so a deck that keeps failing is refused in every slot
+            self._policy = PolicyEngine.from_config(config)
+        if self.max_concurrency > 1:
+            # Concurrent decks write to separate folders so they never collide
+            config = replace(config, output_dir=str(Path(config.output_dir) / f"worker_{index + 1}"))
+        return PreziScraper(config=config, supervisor=DriverSupervisor.from_config(config),
+                            progress=self._progress, policy=self._policy)
+    
+    async def __aenter__(self) -> 'AsyncPreziScraper':
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def iter_scrape(self, prezi_url: str) -> AsyncIterator[ScrapeEvent]:
+        """
+        Scrape a Prezi presentation, yielding events as results become available.
+        
+        Args:
+            prezi_url: URL of the Prezi presentation
+        
+        Yields:
+            SlideEvent, LinkEvent and CompletedEvent objects, as PreziScraper.iter_scrape()
+        """
+        scraper = await self._acquire_scraper()
+        loop = asyncio.get_running_loop()
+        events: asyncio.Queue = asyncio.Queue()
+        cancelled = threading.Event()
+        
+        def emit(event):
+            loop.call_soon_threadsafe(events.put_nowait, event)
+        
+        try:
+            future = loop.run_in_executor(self._executor, self._drive, scraper, prezi_url,
+                                          emit, cancelled)
+        except BaseException:
+            self._release_scraper(scraper)
+            raise
+        self._running.append(future)
+        # Runs on the loop after every event the thread emitted
+        future.add_done_callback(lambda f: events.put_nowait(_DONE))
+        future.add_done_callback(lambda f: self._finish(f, scraper))
+        
+        try:
+            while True:
+                event = await events.get()
+                if event is _DONE:
+                    break
+                yield event
+            await future
+        finally:
+            # A no-op once the deck finished; otherwise the thread stops at
+            # its next event and closes the scraper's generator
+            cancelled.set()
+    
+    async def scrape(self, prezi_url: str) -> Optional[Dict[str, List[str]]]:
+        """
+        Scrape a Prezi presentation.
+        
+        Args:
+            prezi_url: URL of the Prezi presentation
+        
+        Returns:
+            Dictionary with lists of screenshot paths and YouTube links, as
+            PreziScraper.scrape_prezi()
+        """
+        result = None
+        async for event in self.iter_scrape(prezi_url):
+            if isinstance(event, CompletedEvent):
+                result = event.to_dict()
+        return result
+    
+    async def scrape_many(self, prezi_urls: List[str]) -> List[Union[Dict, BaseException]]:
+        """
+        Scrape several presentations concurrently.
+        
+        Args:
+            prezi_urls: URLs of the Prezi presentations
+        
+        Returns:
+            One result per URL, in order; a deck that failed gives its exception
+        """
+        return await asyncio.gather(*(self.scrape(url) for url in prezi_urls),
+                                    return_exceptions=True)
+    
+    async def close(self):
+        """Wait for running decks to stop and shut down every scraper and its browser."""
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        for scraper in self._scrapers:
+            await loop.run_in_executor(self._executor, scraper.close)
+        self._scrapers = []
+        self._idle = []
+        self._executor.shutdown()
+    
+    @staticmethod
+    def _drive(scraper, prezi_url: str, emit: Callable[[object], None],
+               cancelled: threading.Event):
+        """Run one deck in a worker thread, passing its events to the event loop."""
+        events = scraper.iter_scrape(prezi_url)
+        try:
+            for event in events:
+                if cancelled.is_set():
+                    break
+                emit(event)
+        finally:
+            events.close()
+    
+    async def _acquire_scraper(self):
+        """Wait for a free worker slot and get an idle scraper for it."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        await self._semaphore.acquire()
+        if self._idle:
+            return self._idle.pop()
+        
+        try:
+            scraper = self.scraper_factory(len(self._scrapers))
+        except BaseException:
+            self._semaphore.release()
+            raise
+        self._scrapers.append(scraper)
+        return scraper
+    
+    def _release_scraper(self, scraper):
+        """Return a scraper to the idle pool and free its worker slot."""
+        self._idle.append(scraper)
+        self._semaphore.release()
+    
+    def _finish(self, future: asyncio.Future, scraper):
+        """Free a deck's worker slot once its thread is done with the scraper."""
+        self._running.remove(future)
+        if not future.cancelled():
+            # Retrieved here so decks abandoned by their caller do not log
+            # "exception was never retrieved"
+            future.exception()
+        self._release_scraper(scraper)
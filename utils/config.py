@@ -3,7 +3,7 @@
 import os
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
 
 @dataclass
@@ -18,24 +18,92 @@ class ScraperConfig:
     headless: bool = True
     window_width: int = 1920
     window_height: int = 1080
+    device_scale_factor: float = 1.0  # Device pixel ratio; 2 captures slides at twice the size
+    
+    # Remote WebDriver endpoints ("URL" or "URL@CAPACITY"); empty uses local Chrome
+    remote_endpoints: Tuple[str, ...] = ()
+    remote_cooldown: float = 60.0  # Seconds a failed endpoint is skipped
+    
+    # Session recording (archive directory replayable with ReplayServer)
+    record_archive: Optional[str] = None
+    
+    # Profiling settings (written to <output_dir>/profiles)
+    profile_mode: Optional[str] = None  # "sample" or "cprofile"
+    profile_interval: float = 0.005  # Seconds between stack samples
+    chrome_trace: bool = False  # Also record a DevTools performance trace
+    
+    # Progress settings
+    progress_file: Optional[str] = None  # JSON status file rewritten as the run progresses
+    live_progress: bool = False  # Status line on the terminal
+    stall_seconds: float = 120.0  # A deck without progress for this long is reported as stalled
     
     # Timing settings
     page_load_timeout: int = 30
     element_wait_timeout: int = 10
-    screenshot_delay: float = 2.0
-    navigation_delay: float = 1.5
+    screenshot_delay: float = 2.0  # Maximum wait for a slide transition to settle
+    navigation_delay: float = 1.5  # Minimum wait after a transition when waits are tuned
+    render_delay: float = 5.0  # Maximum wait for the first render after loading
+    
+    # Timing auto-tuner settings (learned waits never exceed the values above)
+    timing_profile: Optional[str] = None  # JSON file for learned profiles
+    min_wait: float = 0.5
     
     # Navigation settings
     max_slides: int = 50  # Prevent infinite loops
     retry_attempts: int = 3
+    capture_shards: int = 1  # Browsers capturing one deck in parallel
+    retry_backoff: float = 30.0  # Seconds, doubled after each failed attempt, with jitter
+    
+    # Phase policy settings (page_load_timeout and element_wait_timeout are the
+    # deadlines of the load and navigation phases)
+    driver_start_timeout: float = 60.0
+    capture_timeout: float = 60.0
+    phase_attempts: int = 2  # Attempts at starting the browser, loading or capturing within a deck
+    phase_backoff: float = 2.0  # Seconds before retrying a phase, doubled after each attempt
+    circuit_threshold: int = 3  # Consecutive failures before a deck is refused (0 disables)
+    circuit_cooldown: float = 900.0  # Seconds a refused deck stays refused
+    
+    # Browser supervision settings (0 disables a threshold)
+    recycle_after_pages: int = 25
+    max_browser_rss_mb: int = 2048
+    command_timeout: float = 120.0
+    
+    # Rate limiting settings (per host, shared by all workers using a state file)
+    host_rate: float = 0.5  # Page loads per second
+    host_burst: int = 2
+    
+    # Work queue settings
+    lease_seconds: float = 300.0
     
     # Output settings
     screenshot_format: str = "png"
     screenshot_quality: int = 95
+    capture_mode: str = "full"  # "full" (one bitmap) or "tiled" (bounded memory)
+    incremental: bool = False  # Only write slides that changed since the last run
+    per_deck_output: bool = True  # Slides, links and a completion manifest in screenshots/<deck ID>/
+    
+    # Post-processing settings (cropping needs NumPy)
+    crop_slides: bool = False  # Crop viewer chrome and blank borders
+    normalize_size: Optional[Tuple[int, int]] = None  # Fit cropped slides into (width, height)
+    postprocess_workers: int = 2
+    postprocess_batch: int = 8  # Slides analysed together for static chrome
+    
+    # Renditions ("NAME:WIDTH", e.g. "web:1280") written next to each full-size slide
+    renditions: Tuple[str, ...] = ()
+    rendition_format: str = "jpeg"  # "jpeg", "png" or "webp"
+    rendition_quality: int = 85
+    rendition_workers: int = 2
     
     # YouTube extraction settings
     save_youtube_links: bool = True
     youtube_filename: str = "youtube_links.txt"
+    in_browser_extraction: bool = True  # Match links in the page, not via page_source
+    
+    # YouTube metadata settings (titles and availability through oEmbed, cached in SQLite)
+    youtube_metadata: bool = False
+    metadata_cache: Optional[str] = None  # Defaults to <output_dir>/youtube_metadata.db
+    metadata_ttl: float = 7 * 86400.0  # Seconds cached metadata stays valid
+    metadata_workers: int = 8  # Requests in flight at once
     
     @classmethod
     def from_env(cls) -> 'ScraperConfig':
@@ -47,6 +115,11 @@ class ScraperConfig:
             window_height=int(os.getenv('PREZI_WINDOW_HEIGHT', cls.window_height)),
             page_load_timeout=int(os.getenv('PREZI_PAGE_TIMEOUT', cls.page_load_timeout)),
             max_slides=int(os.getenv('PREZI_MAX_SLIDES', cls.max_slides)),
+            retry_attempts=int(os.getenv('PREZI_RETRY_ATTEMPTS', cls.retry_attempts)),
+            element_wait_timeout=int(os.getenv('PREZI_ELEMENT_TIMEOUT', cls.element_wait_timeout)),
+            remote_endpoints=tuple(
+                spec for spec in os.getenv('PREZI_REMOTE_ENDPOINTS', '').split(',') if spec.strip()
+            ),
         )
     
     def get_output_path(self) -> Path:
@@ -0,0 +1,65 @@
+"""Helpers for identifying Prezi decks."""
+
+import hashlib
+import json
+import re
+from pathlib import Path
+from typing import Optional
+from urllib.parse import urlparse
+
+# Written last into a deck's folder, once everything else in it is final
+COMPLETION_FILENAME = "complete.json"
+
+
+def deck_id_from_url(prezi_url: str) -> str:
+    """
+    Derive a stable, filesystem-safe deck ID from a Prezi URL.
+    
+    Args:
+        prezi_url: URL of the Prezi presentation
+        
+    Returns:
+        The presentation ID from the URL path, or a short hash of the URL
+        when no ID can be found
+    """
+    parsed = urlparse(prezi_url.strip())
+    parts = [part for part in parsed.path.split('/') if part]
+    
+    if 'p' in parts:
+        index = parts.index('p')
+        if index + 1 < len(parts):
+            deck_id = re.sub(r'[^A-Za-z0-9_-]', '_', parts[index + 1])
+            if deck_id:
+                return deck_id
+    
+    return hashlib.sha1(prezi_url.strip().encode('utf-8')).hexdigest()[:12]
+
+
+def clean_title(title: str) -> str:
+    """
+    Clean a presentation title for use as a filename.
+    
+    Args:
+        title: Raw title text
+        
+    Returns:
+        Title with only letters, digits, spaces, hyphens and underscores
+    """
+    return "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+
+
+def read_completion(deck_dir: str) -> Optional[dict]:
+    """
+    Read the completion manifest of a deck folder.
+    
+    Args:
+        deck_dir: Folder of one deck's output
+        
+    Returns:
+        The manifest, or None if the deck was never completed or is being
+        scraped again
+    """
+    try:
+        return json.loads((Path(deck_dir) / COMPLETION_FILENAME).read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,349 @@
+"""WebDriver factories for local Chrome and remote WebDriver/Grid endpoints."""
+
+import threading
+import time
+from typing import Optional, List, Tuple, Iterable, TYPE_CHECKING
+
+from .policy import call_with_deadline
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+
+
+# DevTools trace categories recorded for profiling: page loads, rendering,
+# script execution and user timing marks
+TRACE_CATEGORIES = ("devtools.timeline,disabled-by-default-devtools.timeline,"
+                    "disabled-by-default-devtools.timeline.frame,v8.execute,loading,blink.user_timing")
+
+
+def chrome_options(headless: bool = True, window_width: int = 1920, window_height: int = 1080,
+                   performance_log: bool = False, trace_categories: Optional[str] = None,
+                   device_scale_factor: float = 1.0):
+    """
+    Build the Chrome options used for scraping.
+    
+    Args:
+        headless: Whether to run browser in headless mode
+        window_width: Browser window width in pixels
+        window_height: Browser window height in pixels
+        performance_log: Enable the DevTools performance log (used for session recording)
+        trace_categories: Also record these DevTools trace categories into the
+            performance log (used for profiling)
+        device_scale_factor: Device pixel ratio to render at; screenshots are
+            this many times the window size
+    
+    Returns:
+        Selenium ChromeOptions instance
+    """
+    from selenium.webdriver.chrome.options import Options
+    
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+    options.add_argument("--disable-gpu")
+    options.add_argument(f"--window-size={window_width},{window_height}")
+    if device_scale_factor != 1.0:
+        options.add_argument(f"--force-device-scale-factor={device_scale_factor:g}")
+    options.add_argument("--disable-web-security")
+    options.add_argument("--allow-running-insecure-content")
+    if performance_log or trace_categories:
+        options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
+    if trace_categories:
+        options.add_experimental_option('perfLoggingPrefs', {'traceCategories': trace_categories})
+    return options
+
+
+def parse_endpoint(spec: str) -> Tuple[str, int]:
+    """
+    Parse a remote endpoint given as ``URL`` or ``URL@CAPACITY``.
+    
+    Args:
+        spec: Endpoint specification, e.g. ``http://render-1:4444@4``
+    
+    Returns:
+        Tuple of (URL, capacity); capacity defaults to 1
+    """
+    url, _, capacity = spec.strip().rpartition('@')
+    if url and capacity.isdigit():
+        return url, max(1, int(capacity))
+    return spec.strip(), 1
+
+
+class LocalChromeFactory:
+    """Starts Chrome through a local chromedriver."""
+    
+    def __init__(self, headless: bool = True, window_width: int = 1920,
+                 window_height: int = 1080, page_load_timeout: int = 30,
+                 performance_log: bool = False, trace_categories: Optional[str] = None,
+                 device_scale_factor: float = 1.0):
+        """
+        Initialize the factory.
+        
+        Args:
+            headless: Whether to run browser in headless mode
+            window_width: Browser window width in pixels
+            window_height: Browser window height in pixels
+            page_load_timeout: Page load timeout in seconds
+            performance_log: Enable the DevTools performance log
+            trace_categories: DevTools trace categories to record (optional)
+            device_scale_factor: Device pixel ratio to render at
+        """
+        self.headless = headless
+        self.window_width = window_width
+        self.window_height = window_height
+        self.page_load_timeout = page_load_timeout
+        self.performance_log = performance_log
+        self.trace_categories = trace_categories
+        self.device_scale_factor = device_scale_factor
+    
+    @classmethod
+    def from_config(cls, config) -> 'LocalChromeFactory':
+        """Create a factory using the browser settings of a ScraperConfig."""
+        return cls(config.headless, config.window_width, config.window_height,
+                   config.page_load_timeout, performance_log=bool(config.record_archive),
+                   trace_categories=TRACE_CATEGORIES if config.chrome_trace else None,
+                   device_scale_factor=config.device_scale_factor)
+    
+    def __call__(self) -> 'webdriver.Chrome':
+        from selenium import webdriver
+        
+        options = chrome_options(self.headless, self.window_width, self.window_height,
+                                 self.performance_log, self.trace_categories,
+                                 self.device_scale_factor)
+        driver = webdriver.Chrome(options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return driver
+
+
+class RemoteEndpoint:
+    """Scheduling state for one remote WebDriver endpoint."""
+    
+    __slots__ = ('url', 'capacity', 'active', 'failures', 'cooldown_until')
+    
+    def __init__(self, url: str, capacity: int = 1):
+        self.url = url
+        self.capacity = capacity
+        self.active = 0
+        self.failures = 0
+        self.cooldown_until = 0.0
+    
+    def load(self) -> float:
+        """Fraction of the endpoint's capacity in use."""
+        return self.active / self.capacity
+
+
+class RemoteDriverFactory:
+    """
+    Starts browsers on a pool of remote WebDriver endpoints.
+    
+    Each new session goes to the healthy endpoint with the lowest share of
+    its capacity in use. An endpoint that fails to start a session is put on
+    cooldown and the next one is tried; when every endpoint is full, callers
+    wait for a session to be quit. Sessions give their slot back on quit().
+    
+    A deadline given for the session start covers only opening the session,
+    not waiting for a free slot. A start abandoned at its deadline keeps its
+    slot until it ends, then quits any session it opened and gives the slot
+    back.
+    """
+    
+    def __init__(self, endpoints: Iterable[str], headless: bool = True,
+                 window_width: int = 1920, window_height: int = 1080,
+                 page_load_timeout: int = 30, cooldown: float = 60.0,
+                 acquire_timeout: float = 600.0, performance_log: bool = False,
+                 trace_categories: Optional[str] = None, device_scale_factor: float = 1.0):
+        """
+        Initialize the factory.
+        
+        Args:
+            endpoints: Endpoint specifications, ``URL`` or ``URL@CAPACITY``
+            headless: Whether to run browser in headless mode
+            window_width: Browser window width in pixels
+            window_height: Browser window height in pixels
+            page_load_timeout: Page load timeout in seconds
+            cooldown: Seconds a failed endpoint is skipped before it is retried
+            acquire_timeout: Seconds to wait for a free session slot
+            performance_log: Enable the DevTools performance log
+            trace_categories: DevTools trace categories to record (optional)
+            device_scale_factor: Device pixel ratio to render at
+        """
+        self.endpoints: List[RemoteEndpoint] = [
+            RemoteEndpoint(*parse_endpoint(spec)) for spec in endpoints
+        ]
+        if not self.endpoints:
+            raise ValueError("RemoteDriverFactory needs at least one endpoint")
+        
+        self.headless = headless
+        self.window_width = window_width
+        self.window_height = window_height
+        self.page_load_timeout = page_load_timeout
+        self.cooldown = cooldown
+        self.acquire_timeout = acquire_timeout
+        self.performance_log = performance_log
+        self.trace_categories = trace_categories
+        self.device_scale_factor = device_scale_factor
+        self._condition = threading.Condition()
+    
+    @classmethod
+    def from_config(cls, config) -> 'RemoteDriverFactory':
+        """Create a factory for the remote endpoints and browser settings of a ScraperConfig."""
+        return cls(config.remote_endpoints, config.headless, config.window_width,
+                   config.window_height, config.page_load_timeout,
+                   cooldown=config.remote_cooldown,
+                   performance_log=bool(config.record_archive),
+                   trace_categories=TRACE_CATEGORIES if config.chrome_trace else None,
+                   device_scale_factor=config.device_scale_factor)
+    
+    def __call__(self, session_timeout: Optional[float] = None) -> 'webdriver.Remote':
+        """
+        Start a browser session on the least loaded endpoint.
+        
+        Args:
+            session_timeout: Seconds allowed for opening the session once a slot
+                is free (optional); TimeoutError is raised when it runs out
+        
+        Returns:
+            Remote WebDriver session
+        """
+        deadline = time.monotonic() + self.acquire_timeout
+        errors = []
+        tried = set()
+        
+        while True:
+            endpoint = self._reserve(tried, deadline)
+            if endpoint is None:
+                detail = "; ".join(errors) or "all endpoints busy"
+                raise RuntimeError(f"No remote WebDriver endpoint available: {detail}")
+            
+            if session_timeout is None:
+                driver, error = self._try_start(endpoint)
+            else:
+                driver, error = call_with_deadline(
+                    lambda: self._try_start(endpoint), session_timeout,
+                    on_late=lambda outcome: self._abandon(endpoint, *outcome)
+                )
+            
+            if error is not None:
+                errors.append(f"{endpoint.url}: {type(error).__name__}: {error}")
+                print(f"Remote endpoint {endpoint.url} failed, trying another: {error}")
+                tried.add(endpoint.url)
+                self._release(endpoint, failed=True)
+                continue
+            
+            self._release_on_quit(driver, endpoint)
+            with self._condition:
+                endpoint.failures = 0
+            return driver
+    
+    def status(self) -> List[dict]:
+        """
+        Get the scheduling state of every endpoint.
+        
+        Returns:
+            List of dictionaries with URL, capacity, active sessions,
+            consecutive failures and whether the endpoint is cooling down
+        """
+        now = time.monotonic()
+        with self._condition:
+            return [{
+                'url': endpoint.url,
+                'capacity': endpoint.capacity,
+                'active': endpoint.active,
+                'failures': endpoint.failures,
+                'cooling_down': endpoint.cooldown_until > now,
+            } for endpoint in self.endpoints]
+    
+    def _reserve(self, tried: set, deadline: float) -> Optional[RemoteEndpoint]:
+        """Claim a slot on the least loaded healthy endpoint, waiting while all are full."""
+        with self._condition:
+            while True:
+                now = time.monotonic()
+                healthy = [e for e in self.endpoints
+                           if e.url not in tried and e.cooldown_until <= now]
+                if not healthy:
+                    # Everything has failed recently; fall back to the ones
+                    # not yet tried for this session, cooled down or not
+                    healthy = [e for e in self.endpoints if e.url not in tried]
+                if not healthy:
+                    return None
+                
+                free = [e for e in healthy if e.active < e.capacity]
+                if free:
+                    endpoint = min(free, key=RemoteEndpoint.load)
+                    endpoint.active += 1
+                    return endpoint
+                
+                remaining = deadline - now
+                if remaining <= 0:
+                    return None
+                self._condition.wait(min(remaining, 5.0))
+    
+    def _release(self, endpoint: RemoteEndpoint, failed: bool = False):
+        """Give back a slot, putting the endpoint on cooldown after a failure."""
+        with self._condition:
+            endpoint.active = max(0, endpoint.active - 1)
+            if failed:
+                endpoint.failures += 1
+                endpoint.cooldown_until = time.monotonic() + self.cooldown * endpoint.failures
+            self._condition.notify()
+    
+    def _try_start(self, endpoint: RemoteEndpoint) -> Tuple[Optional['webdriver.Remote'], Optional[Exception]]:
+        """Open a session on an endpoint, returning the error instead of raising it."""
+        try:
+            return self._start_session(endpoint), None
+        except Exception as e:
+            return None, e
+    
+    def _abandon(self, endpoint: RemoteEndpoint, driver, error: Optional[Exception]):
+        """Quit a session that opened after its deadline and give its slot back."""
+        try:
+            if driver is not None:
+                driver.quit()
+        except Exception as e:
+            print(f"Error quitting late remote session: {e}")
+        finally:
+            self._release(endpoint, failed=error is not None)
+    
+    def _start_session(self, endpoint: RemoteEndpoint) -> 'webdriver.Remote':
+        """Open a browser session on an endpoint."""
+        from selenium import webdriver
+        
+        options = chrome_options(self.headless, self.window_width, self.window_height,
+                                 self.performance_log, self.trace_categories,
+                                 self.device_scale_factor)
+        driver = webdriver.Remote(command_executor=endpoint.url, options=options)
+        driver.set_page_load_timeout(self.page_load_timeout)
+        return driver
+    
+    def _release_on_quit(self, driver, endpoint: RemoteEndpoint):
+        """Wrap driver.quit so the endpoint slot is freed exactly once."""
+        quit_driver = driver.quit
+        released = threading.Event()
+        
+        def quit_and_release():
+            try:
+                quit_driver()
+            finally:
+                if not released.is_set():
+                    released.set()
+                    self._release(endpoint)
+        
+        driver.quit = quit_and_release
+        driver.remote_endpoint = endpoint.url
+
+
+def driver_factory_from_config(config):
+    """
+    Create the driver factory a ScraperConfig asks for.
+    
+    Args:
+        config: ScraperConfig instance
+    
+    Returns:
+        RemoteDriverFactory if remote endpoints are configured, else LocalChromeFactory
+    """
+    if config.remote_endpoints:
+        return RemoteDriverFactory.from_config(config)
+    return LocalChromeFactory.from_config(config)
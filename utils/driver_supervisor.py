@@ -0,0 +1,294 @@
+"""Supervisor that recycles long-lived WebDriver instances and kills hung ones."""
+
+import os
+import signal
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Callable, Dict, List, Any
+
+
+class DriverHangError(RuntimeError):
+    """Raised when a WebDriver command exceeded its deadline and the driver was killed."""
+
+
+def _child_pids(pid: int) -> List[int]:
+    """Get all descendant process IDs of a process (Linux /proc, or psutil if available)."""
+    try:
+        import psutil
+        return [child.pid for child in psutil.Process(pid).children(recursive=True)]
+    except ImportError:
+        pass
+    except Exception:
+        return []
+    
+    children = {}
+    for stat_file in Path('/proc').glob('[0-9]*/stat'):
+        try:
+            # The command name may contain spaces, so split after its closing parenthesis
+            fields = stat_file.read_text().rsplit(')', 1)[1].split()
+            children.setdefault(int(fields[1]), []).append(int(stat_file.parent.name))
+        except (OSError, IndexError, ValueError):
+            continue
+    
+    result, stack = [], [pid]
+    while stack:
+        for child in children.get(stack.pop(), []):
+            result.append(child)
+            stack.append(child)
+    return result
+
+
+def _rss_bytes(pid: int) -> int:
+    """Get the resident set size of a process in bytes (0 if unavailable)."""
+    try:
+        import psutil
+        return psutil.Process(pid).memory_info().rss
+    except ImportError:
+        pass
+    except Exception:
+        return 0
+    
+    try:
+        for line in Path(f'/proc/{pid}/status').read_text().splitlines():
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class DriverSupervisor:
+    """
+    Keeps a WebDriver warm across pages and replaces it when it degrades.
+    
+    The browser is recycled after a number of pages or when the combined RSS
+    of chromedriver and its Chrome processes exceeds a limit. A watchdog
+    thread kills the whole process tree if any single WebDriver command runs
+    past its deadline, so a hung browser cannot freeze the worker. Remote
+    sessions have no local process, so their session is deleted instead.
+    """
+    
+    def __init__(self, factory: Optional[Callable[[], Any]] = None, max_pages: int = 25,
+                 max_rss_mb: int = 2048, command_timeout: float = 120.0):
+        """
+        Initialize the supervisor.
+        
+        Args:
+            factory: Callable that creates a new WebDriver
+            max_pages: Recycle the browser after serving this many pages (0 disables)
+            max_rss_mb: Recycle the browser above this memory use in MB (0 disables)
+            command_timeout: Seconds a single WebDriver command may take (0 disables)
+        """
+        self.factory = factory
+        self.max_pages = max_pages
+        self.max_rss_mb = max_rss_mb
+        self.command_timeout = command_timeout
+        
+        self.driver = None
+        self.pages_served = 0
+        self.recycle_count = 0
+        self.hang_count = 0
+        
+        self._lock = threading.Lock()
+        # Start time of the in-flight command of each thread using the driver
+        self._command_started: Dict[int, float] = {}
+        self._killed = False
+        self._stop = threading.Event()
+        self._watchdog: Optional[threading.Thread] = None
+    
+    @classmethod
+    def from_config(cls, config, factory: Optional[Callable[[], Any]] = None) -> 'DriverSupervisor':
+        """Create a supervisor using the thresholds of a ScraperConfig."""
+        return cls(
+            factory=factory,
+            max_pages=config.recycle_after_pages,
+            max_rss_mb=config.max_browser_rss_mb,
+            command_timeout=config.command_timeout,
+        )
+    
+    def acquire(self):
+        """
+        Get a live driver, starting a new one if needed.
+        
+        Returns:
+            WebDriver instance
+        """
+        if self.factory is None:
+            raise RuntimeError("DriverSupervisor has no driver factory")
+        
+        with self._lock:
+            if self.driver is None or self._killed:
+                self._start_driver()
+            return self.driver
+    
+    def release(self, failed: bool = False, discard: bool = False):
+        """
+        Report that a page has been served and recycle the driver if needed.
+        
+        Args:
+            failed: Whether the page failed in a way that may have broken the driver
+            discard: Whether a command was abandoned still running, so the driver
+                must not be reused
+        """
+        with self._lock:
+            self.pages_served += 1
+            if self.driver is None:
+                return
+            
+            reason = None
+            if self._killed:
+                reason = "watchdog killed a hung command"
+            elif discard:
+                reason = "a command ran past its phase deadline"
+            elif failed and not self._is_responsive():
+                reason = "driver stopped responding"
+            elif self.max_pages and self.pages_served >= self.max_pages:
+                reason = f"served {self.pages_served} pages"
+            elif self.max_rss_mb:
+                rss_mb = self.rss_mb()
+                if rss_mb > self.max_rss_mb:
+                    reason = f"memory use {rss_mb:.0f} MB above {self.max_rss_mb} MB"
+            
+            if reason:
+                print(f"Recycling browser: {reason}")
+                self._quit_driver(force=discard)
+                self.recycle_count += 1
+    
+    def rss_mb(self) -> float:
+        """
+        Get the combined memory use of chromedriver and its browser processes.
+        
+        Returns:
+            Resident set size in MB (0 if it cannot be determined)
+        """
+        pid = self._driver_pid()
+        if pid is None:
+            return 0.0
+        total = sum(_rss_bytes(p) for p in [pid] + _child_pids(pid))
+        return total / (1024 * 1024)
+    
+    def close(self):
+        """Quit the driver and stop the watchdog."""
+        self._stop.set()
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=5)
+            self._watchdog = None
+        with self._lock:
+            self._quit_driver()
+    
+    def __enter__(self) -> 'DriverSupervisor':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+    
+    def _start_driver(self):
+        """Replace any existing driver with a fresh, instrumented one."""
+        self._quit_driver()
+        
+        driver = self.factory()
+        self._instrument(driver)
+        self.driver = driver
+        self.pages_served = 0
+        self._killed = False
+        
+        if self.command_timeout and self._watchdog is None:
+            self._stop.clear()
+            self._watchdog = threading.Thread(target=self._watch, daemon=True)
+            self._watchdog.start()
+    
+    def _instrument(self, driver):
+        """Wrap driver.execute so the watchdog can see in-flight commands."""
+        execute = driver.execute
+        
+        def timed_execute(*args, **kwargs):
+            thread_id = threading.get_ident()
+            self._command_started[thread_id] = time.monotonic()
+            try:
+                return execute(*args, **kwargs)
+            except Exception as e:
+                if self._killed:
+                    raise DriverHangError(
+                        f"WebDriver command exceeded {self.command_timeout}s and the browser was killed"
+                    ) from e
+                raise
+            finally:
+                self._command_started.pop(thread_id, None)
+        
+        driver.execute = timed_execute
+    
+    def _watch(self):
+        """Watchdog loop that kills the driver when a command overruns its deadline."""
+        interval = min(5.0, max(0.1, self.command_timeout / 10))
+        while not self._stop.wait(interval):
+            in_flight = list(self._command_started.values())
+            if not in_flight or self._killed:
+                continue
+            started = min(in_flight)
+            if time.monotonic() - started > self.command_timeout:
+                print(f"Watchdog: WebDriver command exceeded {self.command_timeout}s, killing browser")
+                self.hang_count += 1
+                self._killed = True
+                self._kill_process_tree()
+    
+    def _driver_pid(self) -> Optional[int]:
+        """Get the process ID of the chromedriver service, if local."""
+        try:
+            return self.driver.service.process.pid
+        except AttributeError:
+            return None
+    
+    def _kill_process_tree(self):
+        """Forcefully kill chromedriver and every browser process it started."""
+        pid = self._driver_pid()
+        if pid is None:
+            self._abort_remote_session()
+            return
+        for target in _child_pids(pid) + [pid]:
+            try:
+                os.kill(target, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except OSError:
+                continue
+    
+    def _abort_remote_session(self):
+        """Delete a remote session and drop its connections so the hung command returns."""
+        executor = getattr(self.driver, 'command_executor', None)
+        if executor is None:
+            return
+        try:
+            # Bypasses the instrumented driver.execute, which is the call that is hung
+            executor.execute('quit', {'sessionId': self.driver.session_id})
+        except Exception as e:
+            print(f"Error deleting hung remote session: {e}")
+        try:
+            executor._conn.clear()
+        except AttributeError:
+            pass
+    
+    def _is_responsive(self) -> bool:
+        """Check whether the driver still answers a trivial command."""
+        try:
+            self.driver.execute_script("return 1")
+            return True
+        except Exception:
+            return False
+    
+    def _quit_driver(self, force: bool = False):
+        """
+        Quit the current driver, killing it if a clean quit fails.
+        
+        Args:
+            force: Kill the driver outright, since a command is still running in it
+        """
+        if self.driver is None:
+            return
+        if force or (self._killed and self._driver_pid() is not None):
+            self._kill_process_tree()
+        else:
+            try:
+                self.driver.quit()
+            except Exception as e:
+                print(f"Error quitting browser, killing it: {e}")
+                self._kill_process_tree()
+        self.driver = None
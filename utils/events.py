@@ -0,0 +1,54 @@
+"""Events emitted while a Prezi presentation is being scraped."""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Union
+
+
+@dataclass
+class SlideEvent:
+    """A slide screenshot has been captured and saved."""
+    
+    index: int
+    path: str
+
+
+@dataclass
+class LinkEvent:
+    """A new YouTube link has been found."""
+    
+    url: str
+    video_id: str
+    source: str
+
+
+@dataclass
+class CompletedEvent:
+    """Scraping of the deck has finished."""
+    
+    title: str
+    screenshots: List[str] = field(default_factory=list)
+    youtube_links: List[str] = field(default_factory=list)
+    new_youtube_links: Optional[List[str]] = None
+    diff: Optional[dict] = None
+    youtube_metadata: Optional[List[dict]] = None
+    deck_dir: Optional[str] = None
+    
+    def to_dict(self) -> dict:
+        """Get the result in the dictionary format returned by scrape_prezi()."""
+        result = {
+            "screenshots": self.screenshots,
+            "youtube_links": self.youtube_links,
+            "title": self.title
+        }
+        if self.new_youtube_links is not None:
+            result["new_youtube_links"] = self.new_youtube_links
+        if self.diff is not None:
+            result["diff"] = self.diff
+        if self.youtube_metadata is not None:
+            result["youtube_metadata"] = self.youtube_metadata
+        if self.deck_dir is not None:
+            result["deck_dir"] = self.deck_dir
+        return result
+
+
+ScrapeEvent = Union[SlideEvent, LinkEvent, CompletedEvent]
@@ -0,0 +1,108 @@
+"""Atomic file writes, so readers and concurrent workers never see a partial file."""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator, Union
+
+PathLike = Union[str, Path]
+
+
+def temp_path_for(path: PathLike) -> Path:
+    """
+    Get a temporary path next to a file, for writing it before moving it into place.
+    
+    The name is hidden, unique per process and thread, and keeps the file's
+    extension for writers that check it (such as WebDriver screenshots).
+    
+    Args:
+        path: Final path of the file
+    
+    Returns:
+        Temporary path in the same directory, so the move is a rename
+    """
+    path = Path(path)
+    return path.with_name(f".{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp{path.suffix}")
+
+
+@contextmanager
+def atomic_path(path: PathLike) -> Iterator[Path]:
+    """
+    Write a file under a temporary name and move it over the final path.
+    
+    The file is only moved into place when the block finishes without an
+    exception and has created it; otherwise any existing file is left as it
+    was and the temporary file is removed.
+    
+    Args:
+        path: Final path of the file
+    
+    Yields:
+        Temporary path to write to
+    """
+    temp_path = temp_path_for(path)
+    try:
+        yield temp_path
+        if temp_path.exists():
+            os.replace(temp_path, path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
+
+@contextmanager
+def file_lock(path: PathLike, timeout: float = 10.0, stale_after: float = 60.0) -> Iterator[None]:
+    """
+    Hold an exclusive lock on a file across threads and processes.
+    
+    The lock is a hidden ``.lock`` file next to the file, created exclusively.
+    A lock file older than stale_after seconds was left by a process that
+    crashed while holding it and is broken.
+    
+    Args:
+        path: File to lock
+        timeout: Seconds to wait for the lock before raising TimeoutError
+        stale_after: Age in seconds after which a lock file is broken
+    """
+    path = Path(path)
+    lock_path = path.with_name(f".{path.name}.lock")
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            os.close(os.open(lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+            break
+        except FileExistsError:
+            try:
+                if time.time() - lock_path.stat().st_mtime > stale_after:
+                    lock_path.unlink(missing_ok=True)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"could not lock {path} within {timeout:g}s")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        lock_path.unlink(missing_ok=True)
+
+
+def atomic_write_bytes(path: PathLike, data: bytes) -> Path:
+    """Write bytes to a file atomically, see atomic_path()."""
+    with atomic_path(path) as temp_path:
+        temp_path.write_bytes(data)
+    return Path(path)
+
+
+def atomic_write_text(path: PathLike, text: str, encoding: str = 'utf-8') -> Path:
+    """Write text to a file atomically, see atomic_path()."""
+    with atomic_path(path) as temp_path:
+        temp_path.write_text(text, encoding=encoding)
+    return Path(path)
+
+
+def atomic_write_json(path: PathLike, data, indent: int = 2) -> Path:
+    """Write data as JSON to a file atomically, see atomic_path()."""
+    return atomic_write_text(path, json.dumps(data, indent=indent))
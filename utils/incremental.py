@@ -0,0 +1,182 @@
+"""Incremental slide storage that only writes slides whose content changed."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, List
+
+from .fileio import atomic_write_bytes, atomic_write_json
+
+
+MANIFEST_FILENAME = "manifest.json"
+DIFF_FILENAME = "diff.json"
+
+
+class IncrementalSlideStore:
+    """
+    Keeps an archived deck's slides in sync with a new capture.
+    
+    Slides are stored under stable names (``slide_001.png``) in a per-deck
+    folder, next to a manifest of their SHA-256 hashes from the previous run.
+    A captured slide whose hash matches the manifest is discarded without
+    touching the archive; new and changed slides are written atomically.
+    finish() deletes slides the deck no longer has and writes a diff report.
+    """
+    
+    def __init__(self, deck_dir: str, deck_id: str, url: Optional[str] = None):
+        """
+        Initialize the store and load the previous manifest, if any.
+        
+        Args:
+            deck_dir: Folder holding this deck's slides and manifest
+            deck_id: Deck identifier
+            url: URL of the deck (recorded in the manifest)
+        """
+        self.deck_dir = Path(deck_dir)
+        self.deck_dir.mkdir(parents=True, exist_ok=True)
+        self.deck_id = deck_id
+        self.url = url
+        self.manifest_path = self.deck_dir / MANIFEST_FILENAME
+        
+        self.previous: Dict[str, Dict] = {}
+        if self.manifest_path.exists():
+            try:
+                manifest = json.loads(self.manifest_path.read_text(encoding='utf-8'))
+                self.previous = manifest.get('slides', {})
+            except (OSError, ValueError) as e:
+                print(f"Warning: could not read manifest {self.manifest_path}, "
+                      f"treating all slides as new: {e}")
+        
+        self.current: Dict[str, Dict] = {}
+        self.added: List[int] = []
+        self.changed: List[int] = []
+        self.unchanged: List[int] = []
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def slide_filename(index: int) -> str:
+        """Stable file name of a slide."""
+        return f"slide_{index:03d}.png"
+    
+    def store_bytes(self, index: int, png: bytes) -> str:
+        """
+        Store a captured slide held in memory.
+        
+        Args:
+            index: 1-based slide index
+            png: PNG image data
+        
+        Returns:
+            Path of the slide in the archive
+        """
+        digest = hashlib.sha256(png).hexdigest()
+        path = self.deck_dir / self.slide_filename(index)
+        
+        if self._classify(index, digest, len(png), path):
+            atomic_write_bytes(path, png)
+            self._wrote(index, len(png), path)
+        return str(path)
+    
+    def store_file(self, index: int, captured_path: str) -> str:
+        """
+        Store a slide that was already captured to a file.
+        
+        The captured file is moved into the archive if the slide changed and
+        deleted otherwise.
+        
+        Args:
+            index: 1-based slide index
+            captured_path: Path of the freshly captured PNG
+        
+        Returns:
+            Path of the slide in the archive
+        """
+        captured = Path(captured_path)
+        sha = hashlib.sha256()
+        with open(captured, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                sha.update(block)
+        size = captured.stat().st_size
+        path = self.deck_dir / self.slide_filename(index)
+        
+        if self._classify(index, sha.hexdigest(), size, path):
+            os.replace(captured, path)
+            self._wrote(index, size, path)
+        else:
+            captured.unlink(missing_ok=True)
+        return str(path)
+    
+    def _classify(self, index: int, digest: str, size: int, path: Path) -> bool:
+        """Record a slide's hash and decide whether it has to be written."""
+        key = str(index)
+        with self._lock:
+            if key in self.current:
+                # A retried capture replaces this run's earlier one rather than counting twice
+                for indexes in (self.added, self.changed, self.unchanged):
+                    if index in indexes:
+                        indexes.remove(index)
+            self.current[key] = {'file': path.name, 'sha256': digest, 'bytes': size}
+            previous = self.previous.get(key)
+            if previous is None:
+                self.added.append(index)
+                return True
+            if previous['sha256'] != digest or not path.exists():
+                self.changed.append(index)
+                return True
+            self.unchanged.append(index)
+            return False
+    
+    def _wrote(self, index: int, size: int, path: Path):
+        with self._lock:
+            self.bytes_written += size
+        print(f"Slide {index} stored: {path}")
+    
+    def finish(self, complete: bool = True) -> Dict:
+        """
+        Save the manifest and write the diff report.
+        
+        Args:
+            complete: Whether every slide of the deck was captured. Slides
+                missing from an incomplete run are kept rather than removed.
+        
+        Returns:
+            Diff report with added, changed, removed and unchanged slide indexes
+        """
+        with self._lock:
+            missing = sorted(int(key) for key in self.previous if key not in self.current)
+            removed = missing if complete else []
+            slides = dict(self.current)
+            if not complete:
+                for index in missing:
+                    slides[str(index)] = self.previous[str(index)]
+            
+            for index in removed:
+                (self.deck_dir / self.previous[str(index)]['file']).unlink(missing_ok=True)
+            
+            report = {
+                'deck_id': self.deck_id,
+                'url': self.url,
+                'generated_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'complete': complete,
+                'added': sorted(self.added),
+                'changed': sorted(self.changed),
+                'removed': removed,
+                'unchanged': sorted(self.unchanged),
+                'bytes_written': self.bytes_written,
+            }
+            manifest = {
+                'deck_id': self.deck_id,
+                'url': self.url,
+                'updated_at': report['generated_at'],
+                'slides': dict(sorted(slides.items(), key=lambda item: int(item[0]))),
+            }
+        
+        atomic_write_json(self.manifest_path, manifest)
+        atomic_write_json(self.deck_dir / DIFF_FILENAME, report)
+        print(f"Deck {self.deck_id}: {len(report['added'])} added, {len(report['changed'])} changed, "
+              f"{len(report['removed'])} removed, {len(report['unchanged'])} unchanged")
+        return report
@@ -0,0 +1,174 @@
+"""Shared on-disk index of YouTube videos seen across decks and workers."""
+
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, List, Iterable
+
+
+class LinkIndex:
+    """
+    Records which decks each YouTube video appeared in, across all workers.
+    
+    Writes go through SQLite ``INSERT OR IGNORE``, so whether a video is new
+    is decided atomically even with many concurrent writers. One index can
+    be shared by the threads of a process, which then record into one run.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the index.
+        
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        self.run_id: Optional[str] = None
+        
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS videos (
+                video_id TEXT PRIMARY KEY,
+                first_seen REAL NOT NULL,
+                first_run TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_videos_first_seen ON videos (first_seen);
+            CREATE TABLE IF NOT EXISTS sightings (
+                video_id TEXT NOT NULL,
+                deck_id TEXT NOT NULL,
+                seen_at REAL NOT NULL,
+                run_id TEXT,
+                PRIMARY KEY (video_id, deck_id)
+            );
+            CREATE TABLE IF NOT EXISTS runs (
+                run_id TEXT PRIMARY KEY,
+                started_at REAL NOT NULL
+            );
+        """)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection for the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+        return conn
+    
+    def start_run(self) -> str:
+        """
+        Start a new run; videos first seen from now on are attributed to it.
+        
+        Returns:
+            The new run ID
+        """
+        self.run_id = f"{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        self._connect().execute(
+            "INSERT INTO runs (run_id, started_at) VALUES (?, ?)", (self.run_id, time.time())
+        )
+        return self.run_id
+    
+    def record(self, video_ids: Iterable[str], deck_id: str) -> List[str]:
+        """
+        Record that videos appeared in a deck.
+        
+        Args:
+            video_ids: YouTube video IDs found in the deck
+            deck_id: Deck identifier
+        
+        Returns:
+            Video IDs that no worker had recorded before
+        """
+        now = time.time()
+        new_ids = []
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            for video_id in video_ids:
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO videos (video_id, first_seen, first_run) VALUES (?, ?, ?)",
+                    (video_id, now, self.run_id),
+                )
+                if cursor.rowcount == 1:
+                    new_ids.append(video_id)
+                conn.execute(
+                    "INSERT OR IGNORE INTO sightings (video_id, deck_id, seen_at, run_id) "
+                    "VALUES (?, ?, ?, ?)",
+                    (video_id, deck_id, now, self.run_id),
+                )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return new_ids
+    
+    def is_known(self, video_id: str) -> bool:
+        """
+        Check whether a video has been recorded.
+        
+        Args:
+            video_id: YouTube video ID
+        
+        Returns:
+            True if the video is in the index
+        """
+        row = self._connect().execute(
+            "SELECT 1 FROM videos WHERE video_id = ?", (video_id,)
+        ).fetchone()
+        return row is not None
+    
+    def decks_for(self, video_id: str) -> List[str]:
+        """
+        Get the decks a video appeared in.
+        
+        Args:
+            video_id: YouTube video ID
+        
+        Returns:
+            Deck IDs in the order they were first recorded
+        """
+        rows = self._connect().execute(
+            "SELECT deck_id FROM sightings WHERE video_id = ? ORDER BY seen_at", (video_id,)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def new_since(self, since: float) -> List[str]:
+        """
+        Get videos first recorded after a point in time.
+        
+        Args:
+            since: Unix timestamp
+        
+        Returns:
+            Video IDs in the order they were first recorded
+        """
+        rows = self._connect().execute(
+            "SELECT video_id FROM videos WHERE first_seen > ? ORDER BY first_seen", (since,)
+        ).fetchall()
+        return [row[0] for row in rows]
+    
+    def new_since_last_run(self) -> List[str]:
+        """
+        Get videos first recorded since the most recent run before the current one began.
+        
+        Runs that other workers started after the current one are not counted,
+        so they do not hide videos this run recorded before they began.
+        
+        Returns:
+            Video IDs in the order they were first recorded
+        """
+        if self.run_id is None:
+            row = self._connect().execute(
+                "SELECT MAX(started_at) FROM runs"
+            ).fetchone()
+        else:
+            row = self._connect().execute(
+                "SELECT MAX(started_at) FROM runs "
+                "WHERE started_at < (SELECT started_at FROM runs WHERE run_id = ?)",
+                (self.run_id,),
+            ).fetchone()
+        return self.new_since(row[0] or 0.0)
@@ -0,0 +1,443 @@
+"""Per-phase deadlines, retries with jittered backoff, and circuit breaking for decks."""
+
+import random
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Optional, Dict, Tuple, Callable, TypeVar, Any
+
+from .driver_supervisor import DriverHangError
+
+T = TypeVar('T')
+
+# Phases of scraping a deck, each with its own deadline and retry policy
+PHASES = ('driver', 'load', 'navigation', 'capture')
+
+# Failure reasons
+REASON_TIMEOUT = "timeout"  # The phase ran past its deadline
+REASON_DRIVER = "driver_error"  # The browser or its session is gone
+REASON_PAGE = "page_error"  # The page did not behave (missing elements, failed scripts, no image)
+REASON_THROTTLED = "throttled"  # HTTP 429
+REASON_HTTP = "http_error"  # HTTP 4xx, e.g. a deleted or private deck
+REASON_SERVER = "server_error"  # HTTP 5xx
+REASON_CIRCUIT_OPEN = "circuit_open"  # The deck failed too often and is refused for a while
+REASON_ERROR = "error"  # Anything else
+
+# Failures that will not go away by trying the same URL again soon
+PERMANENT_REASONS = (REASON_HTTP, REASON_CIRCUIT_OPEN)
+
+# Failures after which the browser cannot be trusted for the rest of the deck
+FATAL_REASONS = (REASON_TIMEOUT, REASON_DRIVER)
+
+
+class PhaseFailure(RuntimeError):
+    """A phase of scraping a deck failed, with a machine-readable reason."""
+    
+    def __init__(self, phase: str, reason: str, message: str, deck_id: Optional[str] = None,
+                 attempts: int = 1, elapsed: float = 0.0, retryable: Optional[bool] = None):
+        """
+        Initialize the failure.
+        
+        Args:
+            phase: Phase that failed ('driver', 'load', 'navigation' or 'capture')
+            reason: Failure reason, one of the REASON_* constants
+            message: Human-readable description
+            deck_id: Deck being scraped (optional)
+            attempts: Attempts made before giving up
+            elapsed: Seconds spent in the phase, including retries
+            retryable: Whether the deck is worth scraping again later; defaults
+                to False for permanent reasons and True otherwise
+        """
+        self.phase = phase
+        self.reason = reason
+        self.message = message
+        self.deck_id = deck_id
+        self.attempts = attempts
+        self.elapsed = elapsed
+        self.retryable = reason not in PERMANENT_REASONS if retryable is None else retryable
+        super().__init__(str(self))
+    
+    def __str__(self) -> str:
+        attempts = f" after {self.attempts} attempts" if self.attempts > 1 else ""
+        return f"{self.phase} {self.reason}{attempts}: {self.message}"
+    
+    @property
+    def fatal(self) -> bool:
+        """Whether the rest of the deck should be abandoned rather than continued."""
+        return self.reason in FATAL_REASONS
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the failure as a JSON-serializable dictionary."""
+        return {
+            'phase': self.phase,
+            'reason': self.reason,
+            'message': self.message,
+            'deck_id': self.deck_id,
+            'attempts': self.attempts,
+            'elapsed': round(self.elapsed, 3),
+            'retryable': self.retryable,
+        }
+
+
+def classify(error: BaseException) -> str:
+    """
+    Get the failure reason of an exception.
+    
+    Args:
+        error: Exception raised by a phase
+    
+    Returns:
+        One of the REASON_* constants
+    """
+    if isinstance(error, PhaseFailure):
+        return error.reason
+    if isinstance(error, DriverHangError):
+        return REASON_DRIVER
+    if isinstance(error, TimeoutError):
+        return REASON_TIMEOUT
+    
+    try:
+        from selenium.common import exceptions as selenium_errors
+    except ImportError:
+        selenium_errors = None
+    
+    if selenium_errors is not None:
+        if isinstance(error, selenium_errors.TimeoutException):
+            return REASON_TIMEOUT
+        if isinstance(error, (selenium_errors.InvalidSessionIdException,
+                              selenium_errors.NoSuchWindowException,
+                              selenium_errors.SessionNotCreatedException)):
+            return REASON_DRIVER
+        if isinstance(error, selenium_errors.WebDriverException):
+            return REASON_PAGE
+    
+    # chromedriver or the remote endpoint stopped answering
+    if isinstance(error, ConnectionError):
+        return REASON_DRIVER
+    return REASON_ERROR
+
+
+def backoff_delay(attempt: int, base: float, cap: Optional[float] = None,
+                  rng: Optional[random.Random] = None) -> float:
+    """
+    Get the delay before retrying, doubled after each attempt and jittered.
+    
+    Half of the delay is fixed and half is random, so the delay still grows
+    with each attempt while retries of jobs that failed together spread out
+    instead of hitting the host at the same moment.
+    
+    Args:
+        attempt: Number of attempts made so far (1 after the first failure)
+        base: Delay after the first attempt in seconds
+        cap: Maximum delay in seconds (optional)
+        rng: Random number generator (defaults to the random module)
+    
+    Returns:
+        Seconds to wait
+    """
+    delay = base * (2 ** max(0, attempt - 1))
+    if cap is not None:
+        delay = min(delay, cap)
+    return delay / 2 + (rng or random).uniform(0, delay / 2)
+
+
+# Helper thread each thread blocked in call_with_deadline is waiting on, by
+# thread ID, so the profiler can attribute the wait to the work being done
+_waiting_on: Dict[int, int] = {}
+
+
+def deadline_helper(ident: int) -> Optional[int]:
+    """
+    Get the thread doing the work a thread waits for in call_with_deadline.
+    
+    Args:
+        ident: Thread ID of the waiting thread
+    
+    Returns:
+        Thread ID of the helper thread, or None if the thread is not waiting
+    """
+    return _waiting_on.get(ident)
+
+
+def call_with_deadline(func: Callable[[], T], timeout: float,
+                       on_late: Optional[Callable[[T], None]] = None) -> T:
+    """
+    Call a blocking function, giving up on it after a deadline.
+    
+    The function runs in a daemon thread. If it has not returned in time,
+    TimeoutError is raised and the thread is abandoned; should it return a
+    value later anyway, that value is passed to on_late (e.g. to quit a
+    browser that took too long to start).
+    
+    Args:
+        func: Function to call
+        timeout: Seconds to wait for it
+        on_late: Called with a result that arrives after the deadline (optional)
+    
+    Returns:
+        The function's return value
+    """
+    lock = threading.Lock()
+    done = threading.Event()
+    outcome: Dict[str, Any] = {}
+    
+    def run():
+        try:
+            value = func()
+        except BaseException as e:
+            outcome['error'] = e
+            done.set()
+            return
+        with lock:
+            outcome['value'] = value
+            abandoned = outcome.get('abandoned', False)
+            done.set()
+        if abandoned and on_late is not None:
+            try:
+                on_late(value)
+            except Exception as e:
+                print(f"Error cleaning up after a late result: {e}")
+    
+    helper = threading.Thread(target=run, name="phase-deadline", daemon=True)
+    helper.start()
+    caller = threading.get_ident()
+    _waiting_on[caller] = helper.ident
+    try:
+        finished = done.wait(timeout)
+    finally:
+        _waiting_on.pop(caller, None)
+    if not finished:
+        with lock:
+            if not done.is_set():
+                outcome['abandoned'] = True
+                raise TimeoutError(f"did not finish within {timeout:g}s")
+    
+    if 'error' in outcome:
+        raise outcome['error']
+    return outcome['value']
+
+
+@dataclass
+class PhasePolicy:
+    """Deadline and retry policy of one phase."""
+    
+    timeout: float  # Deadline of one attempt in seconds
+    attempts: int = 1
+    backoff: float = 2.0  # Seconds before the second attempt, doubled after each
+    max_backoff: float = 30.0
+    retry_on: Tuple[str, ...] = (REASON_TIMEOUT, REASON_DRIVER)
+
+
+class CircuitBreaker:
+    """
+    Refuses decks that failed several times in a row, for a cooldown period.
+    
+    After the cooldown the deck is let through once more; a success closes
+    the circuit, another failure opens it again for a full cooldown. The
+    breaker is in memory and thread-safe, so scrapers sharing a process (such
+    as the scrape service's workers) can share one.
+    """
+    
+    def __init__(self, threshold: int = 3, cooldown: float = 900.0):
+        """
+        Initialize the breaker.
+        
+        Args:
+            threshold: Consecutive failures before a deck is refused
+            cooldown: Seconds a deck is refused once its circuit opens
+        """
+        self.threshold = max(1, threshold)
+        self.cooldown = cooldown
+        self._decks: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self.refused = 0
+    
+    def check(self, deck_id: str):
+        """
+        Raise if a deck's circuit is open.
+        
+        Args:
+            deck_id: Deck identifier
+        """
+        with self._lock:
+            state = self._decks.get(deck_id)
+            if state is None or state['opened_at'] is None:
+                return
+            remaining = state['opened_at'] + self.cooldown - time.monotonic()
+            if remaining <= 0:
+                # Half-open: let one attempt through; its outcome decides
+                state['opened_at'] = None
+                return
+            self.refused += 1
+            failures, last = state['failures'], state['last']
+        
+        raise PhaseFailure(
+            last['phase'], REASON_CIRCUIT_OPEN,
+            f"{failures} consecutive failures (last: {last['reason']}), "
+            f"retry in {remaining:.0f}s",
+            deck_id=deck_id, attempts=0,
+        )
+    
+    def record_success(self, deck_id: str):
+        """Close a deck's circuit."""
+        with self._lock:
+            self._decks.pop(deck_id, None)
+    
+    def record_failure(self, deck_id: str, failure: PhaseFailure):
+        """
+        Count a failure of a deck, opening its circuit at the threshold.
+        
+        Args:
+            deck_id: Deck identifier
+            failure: How the deck failed
+        """
+        with self._lock:
+            state = self._decks.setdefault(deck_id, {'failures': 0, 'opened_at': None, 'last': None})
+            state['failures'] += 1
+            state['last'] = {'phase': failure.phase, 'reason': failure.reason}
+            if state['failures'] >= self.threshold:
+                if state['opened_at'] is None:
+                    print(f"Circuit opened for deck {deck_id} after {state['failures']} "
+                          f"consecutive failures")
+                state['opened_at'] = time.monotonic()
+    
+    def state(self, deck_id: str) -> str:
+        """Get a deck's circuit state: 'closed', 'open' or 'half_open'."""
+        with self._lock:
+            state = self._decks.get(deck_id)
+            if state is None or (state['opened_at'] is None and state['failures'] < self.threshold):
+                return "closed"
+            if state['opened_at'] is None or time.monotonic() - state['opened_at'] >= self.cooldown:
+                return "half_open"
+            return "open"
+
+
+class PolicyEngine:
+    """
+    Runs the phases of a scrape under their deadlines and retry policies.
+    
+    Each attempt of a phase gets the phase's deadline, which the phase
+    enforces with the means it has (the page load timeout and element waits,
+    or a helper thread for calls that cannot time out on their own). Failures
+    are classified; reasons the phase retries on are retried after a jittered
+    backoff, anything else fails the phase at once with a PhaseFailure. Decks
+    that keep failing are refused by the circuit breaker, so a bad URL stops
+    tying up a worker.
+    """
+    
+    def __init__(self, policies: Optional[Dict[str, PhasePolicy]] = None,
+                 breaker: Optional[CircuitBreaker] = None, rng: Optional[random.Random] = None):
+        """
+        Initialize the engine.
+        
+        Args:
+            policies: Policy of each phase; phases left out fail on their first
+                error and have a 30 second deadline
+            breaker: Circuit breaker for failing decks (optional)
+            rng: Random number generator for the backoff jitter (optional)
+        """
+        self.policies = {phase: PhasePolicy(30.0) for phase in PHASES}
+        self.policies.update(policies or {})
+        self.breaker = breaker
+        self._rng = rng or random.Random()
+        self._lock = threading.Lock()
+        self.retries = 0
+        self.failures: Counter = Counter()  # (phase, reason) -> count
+    
+    @classmethod
+    def from_config(cls, config, breaker: Optional[CircuitBreaker] = None) -> 'PolicyEngine':
+        """Create an engine using the deadlines and retry settings of a ScraperConfig."""
+        retry = dict(attempts=max(1, config.phase_attempts), backoff=config.phase_backoff)
+        policies = {
+            'driver': PhasePolicy(config.driver_start_timeout, **retry),
+            # A lost browser needs a new one, which only the next attempt at the deck gets
+            'load': PhasePolicy(config.page_load_timeout, retry_on=(REASON_TIMEOUT, REASON_SERVER),
+                                **retry),
+            # Navigation is not idempotent (a retried key press skips a frame)
+            'navigation': PhasePolicy(config.element_wait_timeout),
+            # A capture that timed out left the browser busy, so only retry bad images
+            'capture': PhasePolicy(config.capture_timeout, retry_on=(REASON_PAGE,), **retry),
+        }
+        if breaker is None and config.circuit_threshold > 0:
+            breaker = CircuitBreaker(config.circuit_threshold, config.circuit_cooldown)
+        return cls(policies, breaker)
+    
+    def timeout(self, phase: str) -> float:
+        """Get the deadline of one attempt of a phase."""
+        return self.policies[phase].timeout
+    
+    def run(self, phase: str, operation: Callable[[float], T], deck_id: Optional[str] = None) -> T:
+        """
+        Run a phase, retrying it according to its policy.
+        
+        Args:
+            phase: Phase name
+            operation: Performs one attempt; called with the attempt's deadline
+                in seconds
+            deck_id: Deck being scraped, for failure reports (optional)
+        
+        Returns:
+            The operation's return value
+        """
+        policy = self.policies[phase]
+        start = time.monotonic()
+        attempt = 0
+        while True:
+            attempt += 1
+            try:
+                return operation(policy.timeout)
+            except Exception as e:
+                reason = classify(e)
+                if attempt >= policy.attempts or reason not in policy.retry_on:
+                    with self._lock:
+                        self.failures[(phase, reason)] += 1
+                    message = e.message if isinstance(e, PhaseFailure) else f"{type(e).__name__}: {e}"
+                    raise PhaseFailure(phase, reason, message, deck_id=deck_id, attempts=attempt,
+                                       elapsed=time.monotonic() - start,
+                                       retryable=e.retryable if isinstance(e, PhaseFailure) else None) from e
+                
+                delay = backoff_delay(attempt, policy.backoff, policy.max_backoff, self._rng)
+                print(f"{phase.capitalize()} attempt {attempt} failed ({reason}), "
+                      f"retrying in {delay:.1f}s")
+                with self._lock:
+                    self.retries += 1
+                time.sleep(delay)
+    
+    def check_circuit(self, deck_id: str):
+        """Raise PhaseFailure if a deck is refused by the circuit breaker."""
+        if self.breaker:
+            self.breaker.check(deck_id)
+    
+    def record_success(self, deck_id: str):
+        """Report that a deck was scraped."""
+        if self.breaker:
+            self.breaker.record_success(deck_id)
+    
+    def record_failure(self, deck_id: str, error: BaseException):
+        """
+        Report that a deck failed, counting it towards its circuit.
+        
+        Browser startup failures and refusals are not the deck's fault and
+        are not counted.
+        
+        Args:
+            deck_id: Deck identifier
+            error: Exception the deck failed with
+        """
+        if self.breaker is None:
+            return
+        if not isinstance(error, PhaseFailure):
+            error = PhaseFailure('load', classify(error), str(error), deck_id=deck_id)
+        if error.phase == 'driver' or error.reason == REASON_CIRCUIT_OPEN:
+            return
+        self.breaker.record_failure(deck_id, error)
+    
+    def summary(self) -> Dict[str, int]:
+        """Get the number of failed phases by "phase reason", plus retries and refusals."""
+        with self._lock:
+            result = {f"{phase} {reason}": count for (phase, reason), count in self.failures.items()}
+            result['retries'] = self.retries
+        if self.breaker:
+            result['refused'] = self.breaker.refused
+        return result
@@ -0,0 +1,292 @@
+"""Post-processing that crops viewer chrome and blank borders from captured slides."""
+
+import os
+from concurrent.futures import ProcessPoolExecutor, Future
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict
+
+from .fileio import atomic_path
+from .renditions import Rendition, render_image, parse_rendition
+
+# NumPy is an optional dependency (pip install "prezi-download[postprocess]")
+# and is only imported inside the functions that need it.
+
+Bounds = Tuple[int, int, int, int]  # left, top, right, bottom (exclusive)
+
+
+def _background(frame) -> 'numpy.ndarray':
+    """Estimate the background color from the median of the border pixels."""
+    import numpy as np
+    
+    border = np.concatenate([frame[0], frame[-1], frame[:, 0], frame[:, -1]])
+    return np.median(border, axis=0)
+
+
+def detect_content_bounds(frame, tolerance: int = 8) -> Optional[Bounds]:
+    """
+    Find the box around everything that differs from the background.
+    
+    Args:
+        frame: RGB image as an (height, width, 3) uint8 array
+        tolerance: Per-channel difference from the background still treated as background
+    
+    Returns:
+        Content bounds, or None if the frame is blank
+    """
+    import numpy as np
+    
+    diff = np.abs(frame.astype(np.int16) - _background(frame).astype(np.int16)).max(axis=2)
+    mask = diff > tolerance
+    rows = np.flatnonzero(mask.any(axis=1))
+    cols = np.flatnonzero(mask.any(axis=0))
+    if rows.size == 0 or cols.size == 0:
+        return None
+    return int(cols[0]), int(rows[0]), int(cols[-1]) + 1, int(rows[-1]) + 1
+
+
+def _trim_static_edges(chrome, start: int, end: int, max_fraction: float = 0.25) -> Tuple[int, int]:
+    """Move [start, end) inwards past edge rows or columns flagged as viewer chrome."""
+    limit = int((end - start) * max_fraction)
+    top = start
+    while top < start + limit and chrome[top]:
+        top += 1
+    bottom = end
+    while bottom > end - limit and chrome[bottom - 1]:
+        bottom -= 1
+    return top, bottom
+
+
+def detect_batch_bounds(frames: List, tolerance: int = 8,
+                        static_threshold: float = 1.0) -> Optional[Bounds]:
+    """
+    Find one crop box for a batch of frames of the same size.
+    
+    With three or more frames, edge rows and columns whose pixels do not vary
+    across frames and that mostly differ from the slide background (toolbars
+    and other opaque viewer chrome that stays put while the slides change)
+    are trimmed first. Content repeated on every slide, such as a footer or
+    logo drawn on the slide background, is kept. Blank borders and
+    letterboxing are then found per frame inside what is left, and the union
+    of the content boxes is kept so every frame of the batch is cropped alike.
+    
+    Args:
+        frames: RGB images as (height, width, 3) uint8 arrays of equal shape
+        tolerance: Per-channel difference from the background still treated as background
+        static_threshold: Mean per-pixel standard deviation across frames below
+            which an edge row or column counts as static chrome
+    
+    Returns:
+        Crop bounds, or None if every frame is blank
+    """
+    import numpy as np
+    
+    height, width = frames[0].shape[:2]
+    left, top, right, bottom = 0, 0, width, height
+    
+    if len(frames) >= 3:
+        # Grayscale keeps the stack at a third of the size of the RGB frames
+        stack = np.stack([f.mean(axis=2, dtype=np.float32) for f in frames])
+        temporal_std = stack.std(axis=0)
+        # Chrome is a solid band, so most of its pixels differ from the slide
+        # background, while repeated slide content covers only a few of a row's pixels
+        mean_frame = stack.mean(axis=0)
+        off_background = np.abs(mean_frame - _background(mean_frame)) > tolerance
+        rows = (temporal_std.mean(axis=1) <= static_threshold) & (off_background.mean(axis=1) > 0.5)
+        cols = (temporal_std.mean(axis=0) <= static_threshold) & (off_background.mean(axis=0) > 0.5)
+        top, bottom = _trim_static_edges(rows, top, bottom)
+        left, right = _trim_static_edges(cols, left, right)
+    
+    boxes = [box for box in (detect_content_bounds(f[top:bottom, left:right], tolerance)
+                             for f in frames) if box]
+    if not boxes:
+        # Slides that are a single color each still differ from one another
+        trimmed = (left, top, right, bottom) != (0, 0, width, height)
+        return (left, top, right, bottom) if trimmed else None
+    return (left + min(box[0] for box in boxes), top + min(box[1] for box in boxes),
+            left + max(box[2] for box in boxes), top + max(box[3] for box in boxes))
+
+
+def _save_atomic(image, path: Path):
+    """Save a PNG next to its destination and move it into place."""
+    with atomic_path(path) as temp_path:
+        image.save(temp_path, format='PNG')
+
+
+def process_batch(paths: List[str], tolerance: int = 8, static_threshold: float = 1.0,
+                  target_size: Optional[Tuple[int, int]] = None,
+                  renditions: Optional[List[Rendition]] = None, rendition_format: str = 'jpeg',
+                  rendition_quality: int = 85) -> List[Dict]:
+    """
+    Crop a batch of screenshots in place.
+    
+    Frames are grouped by size; each group shares one crop box. Runs in a
+    worker process, so it only takes and returns picklable values.
+    
+    Args:
+        paths: Screenshot files of one deck
+        tolerance: See detect_batch_bounds()
+        static_threshold: See detect_batch_bounds()
+        target_size: (width, height) to fit the cropped image into, padding
+            with the background color (optional)
+        renditions: (name, maximum width) pairs written from the cropped
+            image while it is still in memory (optional)
+        rendition_format: See render_image()
+        rendition_quality: See render_image()
+    
+    Returns:
+        One dictionary per file with its size and byte count before and after
+    """
+    import numpy as np
+    from PIL import Image
+    
+    frames: Dict[str, 'numpy.ndarray'] = {}
+    for path in paths:
+        with Image.open(path) as image:
+            frames[path] = np.asarray(image.convert('RGB'))
+    
+    groups: Dict[Tuple[int, ...], List[str]] = {}
+    for path, frame in frames.items():
+        groups.setdefault(frame.shape, []).append(path)
+    
+    results = []
+    for group in groups.values():
+        bounds = detect_batch_bounds([frames[p] for p in group], tolerance, static_threshold)
+        for path in group:
+            frame = frames[path]
+            height, width = frame.shape[:2]
+            bytes_before = os.path.getsize(path)
+            left, top, right, bottom = bounds or (0, 0, width, height)
+            
+            if (left, top, right, bottom) == (0, 0, width, height) and target_size is None:
+                if renditions:
+                    render_image(Image.fromarray(frame), path, renditions,
+                                 rendition_format, rendition_quality)
+                results.append({'path': path, 'size': (width, height), 'cropped': (width, height),
+                                'bytes_before': bytes_before, 'bytes_after': bytes_before})
+                continue
+            
+            image = Image.fromarray(np.ascontiguousarray(frame[top:bottom, left:right]))
+            if target_size:
+                background = tuple(int(v) for v in _background(frame))
+                fitted = image.copy()
+                fitted.thumbnail(target_size, Image.LANCZOS)
+                image = Image.new('RGB', target_size, background)
+                image.paste(fitted, ((target_size[0] - fitted.width) // 2,
+                                     (target_size[1] - fitted.height) // 2))
+            _save_atomic(image, Path(path))
+            if renditions:
+                render_image(image, path, renditions, rendition_format, rendition_quality)
+            
+            results.append({'path': path, 'size': (width, height), 'cropped': image.size,
+                            'bytes_before': bytes_before, 'bytes_after': os.path.getsize(path)})
+    return results
+
+
+class PostProcessor:
+    """
+    Crops captured slides in a process pool while capture continues.
+    
+    Slides are collected into batches per deck and handed to a worker process
+    while the following slides are still being captured. flush() submits the
+    rest and waits for the deck to finish.
+    """
+    
+    def __init__(self, workers: int = 2, batch_size: int = 8, tolerance: int = 8,
+                 static_threshold: float = 1.0, target_size: Optional[Tuple[int, int]] = None,
+                 renditions: Optional[List[Rendition]] = None, rendition_format: str = 'jpeg',
+                 rendition_quality: int = 85):
+        """
+        Initialize the post-processor.
+        
+        Args:
+            workers: Worker processes
+            batch_size: Slides analysed together for static viewer chrome
+            tolerance: Per-channel difference from the background still treated as background
+            static_threshold: Variation across frames below which edge rows count as chrome
+            target_size: (width, height) every slide is fitted into (optional)
+            renditions: (name, maximum width) pairs written from each cropped slide (optional)
+            rendition_format: 'jpeg', 'png' or 'webp'
+            rendition_quality: Encoder quality for JPEG and WebP renditions
+        """
+        try:
+            import numpy  # noqa: F401
+        except ImportError as e:
+            raise RuntimeError(
+                "Cropping needs NumPy: pip install 'prezi-download[postprocess]'"
+            ) from e
+        
+        self.workers = max(1, workers)
+        self.batch_size = max(1, batch_size)
+        self.options = {'tolerance': tolerance, 'static_threshold': static_threshold,
+                        'target_size': target_size, 'renditions': list(renditions or []),
+                        'rendition_format': rendition_format,
+                        'rendition_quality': rendition_quality}
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._batch: List[str] = []
+        self._futures: List[Future] = []
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.processed = 0
+    
+    @classmethod
+    def from_config(cls, config) -> 'PostProcessor':
+        """Create a post-processor using the settings of a ScraperConfig."""
+        return cls(workers=config.postprocess_workers, batch_size=config.postprocess_batch,
+                   target_size=config.normalize_size,
+                   renditions=[parse_rendition(spec) for spec in config.renditions],
+                   rendition_format=config.rendition_format,
+                   rendition_quality=config.rendition_quality)
+    
+    def add(self, path: str):
+        """
+        Queue a captured slide, submitting the batch once it is full.
+        
+        Args:
+            path: Screenshot file
+        """
+        self._batch.append(path)
+        # Hold a batch back until the next one is full too, so the deck's
+        # last slides are never analysed in a batch too small to spot chrome
+        if len(self._batch) >= 2 * self.batch_size:
+            self._submit(self._batch[:self.batch_size])
+            self._batch = self._batch[self.batch_size:]
+    
+    def _submit(self, paths: List[str]):
+        if not paths:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self._futures.append(self._executor.submit(process_batch, paths, **self.options))
+    
+    def flush(self) -> List[Dict]:
+        """
+        Process the remaining slides and wait for every submitted batch.
+        
+        Returns:
+            Per-file results of all batches since the last flush
+        """
+        self._submit(self._batch)
+        self._batch = []
+        results = []
+        for future in self._futures:
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                print(f"Post-processing batch failed, slides left uncropped: {e}")
+        self._futures = []
+        
+        for result in results:
+            self.processed += 1
+            self.bytes_before += result['bytes_before']
+            self.bytes_after += result['bytes_after']
+        if results:
+            saved = sum(r['bytes_before'] - r['bytes_after'] for r in results)
+            print(f"Cropped {len(results)} slide(s), {saved / 1024:.0f} KB saved")
+        return results
+    
+    def close(self):
+        """Flush and shut down the worker processes."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,197 @@
+"""Browser-free probing of Prezi pages for metadata and YouTube links."""
+
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, asdict
+from typing import Optional, List, Iterable
+
+from .deck import clean_title
+from .rate_limiter import HostRateLimiter, parse_retry_after
+from .youtube_extractor import YouTubeExtractor
+
+# Frame counts that Prezi pages expose in their embedded JSON, under the
+# names used by the classic and Next viewers
+FRAME_COUNT_PATTERN = re.compile(
+    r'"(?:frame_?count|num_?frames|steps_?count|slide_?count)"\s*:\s*(\d+)', re.IGNORECASE
+)
+
+USER_AGENT = ("Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+              "(KHTML, like Gecko) Chrome/120.0 Safari/537.36")
+
+
+@dataclass
+class ProbeResult:
+    """Metadata and link inventory for one deck."""
+    
+    url: str
+    status: Optional[int] = None
+    title: Optional[str] = None
+    estimated_frames: Optional[int] = None
+    youtube_links: List[str] = field(default_factory=list)
+    needs_browser: bool = False
+    method: str = "http"
+    elapsed: float = 0.0
+    error: Optional[str] = None
+    
+    def to_dict(self) -> dict:
+        """Get the result as a JSON-serializable dictionary."""
+        return asdict(self)
+
+
+class PreziProbe:
+    """
+    Fetches Prezi pages over plain HTTP instead of a browser.
+    
+    Title, estimated frame count and YouTube links are read from the served
+    HTML. Pages that only render their content with JavaScript are flagged
+    with ``needs_browser`` so the caller can fall back to PreziScraper.probe().
+    """
+    
+    def __init__(self, output_dir: str = "prezi_output", timeout: float = 15.0,
+                 rate_limiter: Optional[HostRateLimiter] = None, pool_size: int = 16):
+        """
+        Initialize the probe.
+        
+        Args:
+            output_dir: Directory passed to the YouTube extractor
+            timeout: HTTP request timeout in seconds
+            rate_limiter: Shared per-host rate limiter (optional)
+            pool_size: Connections kept open per host
+        """
+        self.output_dir = output_dir
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.pool_size = pool_size
+        self._session = None
+        self._session_lock = threading.Lock()
+        self._local = threading.local()
+    
+    @classmethod
+    def from_config(cls, config, rate_limiter: Optional[HostRateLimiter] = None,
+                    pool_size: int = 16) -> 'PreziProbe':
+        """Create a probe using the output directory and timeout of a ScraperConfig."""
+        return cls(config.output_dir, timeout=config.page_load_timeout,
+                   rate_limiter=rate_limiter, pool_size=pool_size)
+    
+    @property
+    def session(self):
+        """Pooled HTTP session, created on first use."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_size)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers['User-Agent'] = USER_AGENT
+                self._session = session
+            return self._session
+    
+    def close(self):
+        """Close the pooled HTTP session."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+    
+    def probe(self, prezi_url: str) -> ProbeResult:
+        """
+        Probe a deck over HTTP.
+        
+        Args:
+            prezi_url: URL of the Prezi presentation
+        
+        Returns:
+            ProbeResult; network errors are reported in its ``error`` field
+        """
+        start = time.time()
+        if self.rate_limiter:
+            self.rate_limiter.acquire(prezi_url)
+        
+        try:
+            response = self.session.get(prezi_url, timeout=self.timeout)
+        except Exception as e:
+            return ProbeResult(url=prezi_url, elapsed=round(time.time() - start, 3),
+                               error=f"{type(e).__name__}: {e}")
+        
+        elapsed = time.time() - start
+        if self.rate_limiter:
+            self.rate_limiter.report(prezi_url, status=response.status_code, elapsed=elapsed,
+                                     retry_after=parse_retry_after(response.headers.get('Retry-After')))
+        
+        result = self.probe_html(response.text, prezi_url, response.status_code)
+        result.elapsed = round(elapsed, 3)
+        return result
+    
+    def probe_many(self, prezi_urls: Iterable[str], workers: int = 16) -> List[ProbeResult]:
+        """
+        Probe many decks concurrently.
+        
+        Args:
+            prezi_urls: URLs of Prezi presentations
+            workers: Number of requests in flight at once
+        
+        Returns:
+            ProbeResult objects in the order of the input URLs
+        """
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            return list(executor.map(self.probe, prezi_urls))
+    
+    def probe_html(self, html: str, prezi_url: str, status: int = 200) -> ProbeResult:
+        """
+        Extract deck metadata from already fetched HTML.
+        
+        Args:
+            html: Page HTML
+            prezi_url: URL the HTML was fetched from
+            status: HTTP status code of the response
+        
+        Returns:
+            ProbeResult for the page
+        """
+        from bs4 import BeautifulSoup
+        
+        result = ProbeResult(url=prezi_url, status=status)
+        if status != 200:
+            result.error = f"HTTP {status}"
+            # Only a missing deck is final; bot protection (403, 429) and server
+            # errors may still let a real browser through
+            result.needs_browser = status != 404 and 400 <= status < 600
+            return result
+        
+        soup = BeautifulSoup(html, 'html.parser')
+        
+        og_title = soup.find('meta', attrs={'property': 'og:title'})
+        if og_title and og_title.get('content'):
+            result.title = clean_title(og_title['content']) or None
+        elif soup.title and soup.title.string:
+            result.title = clean_title(soup.title.string) or None
+        
+        counts = [int(match) for match in FRAME_COUNT_PATTERN.findall(html)]
+        if counts:
+            result.estimated_frames = max(counts)
+        
+        extractor = self._extractor()
+        candidates = [(tag.get('src') or tag.get('href') or tag.get('data'), tag.name)
+                      for tag in soup.find_all(['iframe', 'a', 'embed', 'object'])]
+        extractor.extract_from_candidates([(url, kind) for url, kind in candidates if url])
+        # Links inside embedded JSON are not attributes of any element and
+        # usually have their slashes escaped
+        extractor.extract_from_page_source(html.replace('\\/', '/'))
+        result.youtube_links = sorted(extractor.get_extracted_links())
+        
+        # Without a title or frame data the deck is rendered client-side only
+        result.needs_browser = result.title is None or result.estimated_frames is None
+        return result
+    
+    def _extractor(self) -> YouTubeExtractor:
+        """Get this thread's quiet YouTube extractor, reset for a new page."""
+        extractor = getattr(self._local, 'extractor', None)
+        if extractor is None:
+            extractor = self._local.extractor = YouTubeExtractor(self.output_dir, verbose=False)
+        extractor.start_deck()
+        return extractor
@@ -1,57 +1,176 @@
 """Main Prezi scraper module that coordinates screenshot capture and YouTube link extraction."""
 
+import os
+import socket
+import threading
 import time
 from pathlib import Path
-from typing import Optional, Dict, List
+from typing import Optional, Dict, List, Iterator, Callable, TYPE_CHECKING
 from urllib.parse import urlparse
 
-from selenium import webdriver
-from selenium.webdriver.common.by import By
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.chrome.options import Options
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-
+from .config import ScraperConfig
+from .deck import deck_id_from_url, clean_title, COMPLETION_FILENAME
+from .driver_factory import RemoteDriverFactory, driver_factory_from_config
+from .driver_supervisor import DriverSupervisor
+from .fileio import atomic_write_json
+from .events import SlideEvent, LinkEvent, CompletedEvent, ScrapeEvent
+from .policy import (PolicyEngine, PhaseFailure, call_with_deadline,
+                     REASON_THROTTLED, REASON_HTTP, REASON_SERVER, REASON_TIMEOUT, REASON_PAGE)
+from .rate_limiter import HostRateLimiter
 from .screenshot_capture import ScreenshotCapture
-from .youtube_extractor import YouTubeExtractor
+from .youtube_extractor import YouTubeExtractor, WATCH_URL_PREFIX
+
+if TYPE_CHECKING:
+    from selenium import webdriver
+    from .incremental import IncrementalSlideStore
+    from .link_index import LinkIndex
+    from .post_process import PostProcessor
+    from .prezi_probe import ProbeResult
+    from .profiling import ScrapeProfiler
+    from .progress import ProgressTracker
+    from .renditions import RenditionPool
+    from .session_archive import SessionRecorder
+    from .text_index import SlideTextIndex
+    from .timing_tuner import TimingTuner
+    from .youtube_metadata import YouTubeMetadataResolver, VideoMetadata
+
+# Selenium, and the modules behind optional features (SQLite indexes and
+# caches, worker pools, profilers, the replay server), are imported inside
+# the methods that use them so that importing this module stays cheap for
+# short-lived processes.
 
 
 class PreziScraper:
     """Main class for scraping Prezi presentations."""
     
-    def __init__(self, output_dir: str = "prezi_output", headless: bool = True):
+    def __init__(self, output_dir: str = "prezi_output", headless: bool = True,
+                 rate_limiter: Optional[HostRateLimiter] = None,
+                 supervisor: Optional[DriverSupervisor] = None,
+                 config: Optional[ScraperConfig] = None,
+                 tuner: Optional['TimingTuner'] = None,
+                 link_index: Optional['LinkIndex'] = None,
+                 driver_factory: Optional[Callable[[], 'webdriver.Remote']] = None,
+                 recorder: Optional['SessionRecorder'] = None,
+                 url_resolver: Optional[Callable[[str], str]] = None,
+                 post_processor: Optional['PostProcessor'] = None,
+                 profiler: Optional['ScrapeProfiler'] = None,
+                 rendition_pool: Optional['RenditionPool'] = None,
+                 text_index: Optional['SlideTextIndex'] = None,
+                 metadata_resolver: Optional['YouTubeMetadataResolver'] = None,
+                 progress: Optional['ProgressTracker'] = None,
+                 policy: Optional[PolicyEngine] = None):
         """
         Initialize the Prezi scraper.
         
         Args:
             output_dir: Directory to save output files
             headless: Whether to run browser in headless mode
+            rate_limiter: Shared per-host rate limiter for page loads (optional)
+            supervisor: Keeps the browser warm between decks and recycles it (optional)
+            config: Full scraper settings; its output_dir and headless take
+                precedence over the arguments above (optional)
+            tuner: Learns per-deck and per-host waits within the configured bounds (optional)
+            link_index: Shared index used to tell which links no deck had before (optional)
+            driver_factory: Callable that starts a browser; defaults to local Chrome,
+                or the config's remote endpoints when set (optional)
+            recorder: Records responses and navigation steps; created automatically
+                when the config sets record_archive (optional)
+            url_resolver: Maps deck URLs before loading, e.g. ReplayServer.resolve (optional)
+            post_processor: Crops slides in worker processes during capture; created
+                automatically when the config sets crop_slides (optional)
+            profiler: Profiles the run by deck and slide; created automatically when
+                the config sets profile_mode or chrome_trace, and stopped by close() (optional)
+            rendition_pool: Writes downscaled renditions of each slide during capture;
+                created automatically when the config sets renditions, unless the
+                post-processor renders them after cropping (optional)
+            text_index: Full-text index that each slide's visible text is added to (optional)
+            metadata_resolver: Looks up the title and availability of each deck's
+                YouTube links; created automatically when the config sets
+                youtube_metadata (optional)
+            progress: Tracks slides and decks completed with throughput and ETA;
+                created automatically when the config sets progress_file or
+                live_progress, and closed by close() (optional)
+            policy: Deadlines, retries and circuit breaking of the scrape phases;
+                created from the config's timeouts when not given (optional)
         """
-        self.output_dir = Path(output_dir)
+        if config is None:
+            config = ScraperConfig(output_dir=output_dir, headless=headless)
+        self.config = config
+        
+        self.output_dir = Path(config.output_dir)
         self.output_dir.mkdir(exist_ok=True)
         
-        self.screenshots_dir = self.output_dir / "screenshots"
+        self.screenshots_dir = self.output_dir / config.screenshots_dir
         self.screenshots_dir.mkdir(exist_ok=True)
         
-        self.headless = headless
-        self.driver: Optional[webdriver.Chrome] = None
+        self.headless = config.headless
+        self.rate_limiter = rate_limiter
+        if tuner is None and config.timing_profile:
+            from .timing_tuner import TimingTuner
+            tuner = TimingTuner.from_config(config)
+        self.tuner = tuner
+        self.link_index = link_index
+        self.text_index = text_index
+        self.driver_factory = driver_factory or driver_factory_from_config(config)
+        if recorder is None and config.record_archive:
+            from .session_archive import SessionRecorder
+            recorder = SessionRecorder(config.record_archive)
+        self.recorder = recorder
+        self.url_resolver = url_resolver
+        if post_processor is None and config.crop_slides:
+            from .post_process import PostProcessor
+            post_processor = PostProcessor.from_config(config)
+        self.post_processor = post_processor
+        if rendition_pool is None and config.renditions and post_processor is None:
+            from .renditions import RenditionPool
+            rendition_pool = RenditionPool.from_config(config)
+        self.rendition_pool = rendition_pool
+        if profiler is None and (config.profile_mode or config.chrome_trace):
+            from .profiling import ScrapeProfiler
+            profiler = ScrapeProfiler.from_config(config)
+        self.profiler = profiler.start() if profiler else None
+        if metadata_resolver is None and config.youtube_metadata:
+            from .youtube_metadata import YouTubeMetadataResolver
+            metadata_resolver = YouTubeMetadataResolver.from_config(config)
+        self.metadata_resolver = metadata_resolver
+        if progress is None and (config.progress_file or config.live_progress):
+            from .progress import ProgressTracker
+            progress = ProgressTracker.from_config(config)
+        self.progress = progress.start() if progress else None
+        self.policy = policy or PolicyEngine.from_config(config)
+        self.in_browser_extraction = config.in_browser_extraction
+        self.supervisor = supervisor
+        if supervisor is not None and supervisor.factory is None:
+            supervisor.factory = self._setup_driver
+        self.driver: Optional['webdriver.Remote'] = None
+        self._driver_abandoned = False
+        self._deck_id: Optional[str] = None
+        self._host = "prezi.com"
         
-        self.screenshot_capture = ScreenshotCapture(str(self.screenshots_dir))
+        self.screenshot_capture = ScreenshotCapture(
+            str(self.screenshots_dir),
+            tiled=config.capture_mode == 'tiled',
+            window_width=config.window_width,
+            window_height=config.window_height,
+            timestamped=not config.per_deck_output
+        )
         self.youtube_extractor = YouTubeExtractor(str(self.output_dir))
+        self.incremental: Optional['IncrementalSlideStore'] = None
+        self.deck_dir: Optional[Path] = None
+        self._slide_text: Dict[int, Dict] = {}
+        self.link_metadata: Dict[str, 'VideoMetadata'] = {}
         
-    def _setup_driver(self) -> webdriver.Chrome:
-        """Set up Chrome WebDriver with appropriate options."""
-        options = Options()
-        if self.headless:
-            options.add_argument("--headless")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--window-size=1920,1080")
-        options.add_argument("--disable-web-security")
-        options.add_argument("--allow-running-insecure-content")
+    def _setup_driver(self) -> 'webdriver.Remote':
+        """Start a browser through the configured driver factory, within the driver phase's deadline."""
+        def start(timeout: float):
+            if isinstance(self.driver_factory, RemoteDriverFactory):
+                # Waiting for a free remote slot is bounded by the factory's
+                # acquire_timeout; the deadline covers opening the session
+                return self.driver_factory(session_timeout=timeout)
+            # A browser that starts after the deadline is not used, so quit it
+            return call_with_deadline(self.driver_factory, timeout, on_late=lambda driver: driver.quit())
         
-        return webdriver.Chrome(options=options)
+        return self.policy.run('driver', start, self._deck_id)
     
     def scrape_prezi(self, prezi_url: str) -> Dict[str, List[str]]:
         """
@@ -63,137 +182,1029 @@ class PreziScraper:
         Returns:
             Dictionary with lists of screenshot paths and YouTube links
         """
+        events = self.iter_scrape(prezi_url)
+        try:
+            for event in events:
+                if isinstance(event, CompletedEvent):
+                    return event.to_dict()
+        finally:
+            # Release the browser now rather than whenever the generator is collected
+            events.close()
+    
+    def iter_scrape(self, prezi_url: str) -> Iterator[ScrapeEvent]:
+        """
+        Scrape a Prezi presentation, yielding events as results become available.
+        
+        A SlideEvent is yielded after each screenshot is saved, a LinkEvent for
+        each new YouTube link, and a final CompletedEvent. Closing the generator
+        early (or breaking out of the loop) shuts the browser down; slides that
+        were already yielded stay on disk.
+        
+        A phase that fails or runs past its deadline raises PhaseFailure, as
+        does a deck refused by the circuit breaker after failing repeatedly.
+        
+        Args:
+            prezi_url: URL of the Prezi presentation
+            
+        Yields:
+            SlideEvent, LinkEvent and CompletedEvent objects
+        """
         if not self._is_valid_prezi_url(prezi_url):
             raise ValueError("Invalid Prezi URL provided")
         
-        self.driver = self._setup_driver()
+        # Scope extracted links to this deck so they do not leak between runs
+        self._deck_id = deck_id_from_url(prezi_url)
+        self.policy.check_circuit(self._deck_id)
+        self._host = HostRateLimiter.host_for(prezi_url)
+        self.youtube_extractor.start_deck(self._deck_id)
+        self._slide_text = {}
+        self.link_metadata = {}
+        self._profile_label()
+        self._start_progress(prezi_url)
+        failed = True
+        error = None
         
         try:
-            print(f"Loading Prezi: {prezi_url}")
-            self.driver.get(prezi_url)
+            self.driver = self.supervisor.acquire() if self.supervisor else self._setup_driver()
+            # Only withdraw the last run's manifest once this run can actually start,
+            # so a deck whose browser fails to start keeps its complete output
+            self._start_deck_output()
+            self._start_incremental(prezi_url)
             
-            # Wait for the presentation to load
-            self._wait_for_prezi_load()
+            print(f"Loading Prezi: {prezi_url}")
+            self._open_deck(prezi_url)
             
             # Extract presentation info
             presentation_title = self._get_presentation_title()
             print(f"Processing presentation: {presentation_title}")
+            self._discover_frame_count()
             
             # Process slides
-            screenshots = self._process_slides()
-            youtube_links = self.youtube_extractor.get_extracted_links()
+            screenshots = []
+            slide_index = 0
+            for event in self._iter_slides():
+                if isinstance(event, SlideEvent):
+                    slide_index = event.index
+                    screenshots.append(event.path)
+                    self._post_process(event.index, event.path)
+                    self._progress_slide()
+                elif isinstance(event, LinkEvent):
+                    self._attach_slide_links(slide_index, [event.url])
+                yield event
+            
+            self._profile_label()
+            if self.post_processor:
+                self.post_processor.flush()
+            if self.rendition_pool:
+                self.rendition_pool.flush()
+            
+            self._index_text(prezi_url, presentation_title)
+            failed = False
+            self.policy.record_success(self._deck_id)
+            completed = CompletedEvent(
+                title=presentation_title,
+                screenshots=screenshots,
+                youtube_links=self.youtube_extractor.get_extracted_links(),
+                new_youtube_links=self._record_links(),
+                diff=self._finish_incremental(complete=True),
+                youtube_metadata=self._resolve_metadata()
+            )
+            completed.deck_dir = self._complete_deck_output(prezi_url, presentation_title, screenshots)
+            yield completed
+            
+        except GeneratorExit:
+            # Cancelled by the caller, not a browser failure; once the
+            # CompletedEvent is out, closing the generator is how it ends
+            if failed:
+                error = "cancelled"
+            failed = False
+            raise
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            self.policy.record_failure(self._deck_id, e)
+            raise
+        finally:
+            self._finish_incremental(complete=False)
+            if self.driver is not None:
+                self._release_driver(failed)
+            self._finish_progress(error)
+            self._clear_profile_label()
+    
+    def probe(self, prezi_url: str) -> 'ProbeResult':
+        """
+        Get a deck's title and YouTube links in the browser without capturing slides.
+        
+        This is the fallback for decks that PreziProbe cannot read over HTTP.
+        
+        Args:
+            prezi_url: URL of the Prezi presentation
+            
+        Returns:
+            ProbeResult with method 'browser'
+        """
+        if not self._is_valid_prezi_url(prezi_url):
+            raise ValueError("Invalid Prezi URL provided")
+        
+        self._deck_id = deck_id_from_url(prezi_url)
+        self.policy.check_circuit(self._deck_id)
+        self._host = HostRateLimiter.host_for(prezi_url)
+        self.youtube_extractor.start_deck(self._deck_id)
+        self._profile_label()
+        
+        self.driver = self.supervisor.acquire() if self.supervisor else self._setup_driver()
+        failed = True
+        start = time.time()
+        
+        try:
+            self._open_deck(prezi_url)
+            title = self._get_presentation_title()
+            self._process_embedded_content()
+            failed = False
+            from .prezi_probe import ProbeResult
+            return ProbeResult(
+                url=prezi_url,
+                status=self._get_navigation_status(),
+                title=title,
+                youtube_links=sorted(self.youtube_extractor.get_extracted_links()),
+                method="browser",
+                elapsed=round(time.time() - start, 3)
+            )
+        finally:
+            self._release_driver(failed)
+            self._clear_profile_label()
+    
+    def _release_driver(self, failed: bool):
+        """Hand the driver back to the supervisor, or quit it, after a deck."""
+        if self.supervisor:
+            self.supervisor.release(failed=failed, discard=self._driver_abandoned)
+        elif self.driver:
+            self.driver.quit()
+        self.driver = None
+        self._driver_abandoned = False
+        if self.tuner:
+            self.tuner.save()
+        if self.recorder:
+            self.recorder.save()
+    
+    def start_browser(self):
+        """
+        Start the supervised browser now, so the first deck does not wait for it.
+        
+        Without a supervisor every deck starts its own browser, so there is
+        nothing to start ahead of time.
+        """
+        if self.supervisor:
+            self.supervisor.acquire()
+    
+    def close(self):
+        """Shut down the supervised browser, worker pools and HTTP session, and write the profiles, if any."""
+        if self.supervisor:
+            self.supervisor.close()
+        if self.post_processor:
+            self.post_processor.close()
+        if self.rendition_pool:
+            self.rendition_pool.close()
+        if self.metadata_resolver:
+            self.metadata_resolver.close()
+        if self.progress:
+            self.progress.close()
+        if self.profiler:
+            self.profiler.stop()
+        if self.tuner:
+            self.tuner.save(force=True)
+    
+    def scrape_prezi_parallel(self, prezi_url: str, total_frames: Optional[int] = None,
+                              shards: int = 4) -> Dict[str, List[str]]:
+        """
+        Scrape a Prezi presentation with several browsers capturing in parallel.
+        
+        The frame range is split into contiguous shards. Each shard opens the
+        deck in its own browser, steps to its first frame and captures its
+        range; results are merged back into frame order. A failed shard is
+        retried once before its frames are reported as missing.
+        
+        Without a frame count the deck is opened once to read it from the
+        page; a deck that does not expose one is captured sequentially.
+        
+        Args:
+            prezi_url: URL of the Prezi presentation
+            total_frames: Number of frames to capture (read from the page if not given)
+            shards: Number of browsers to run in parallel
             
-            return {
+        Returns:
+            Dictionary with lists of screenshot paths, YouTube links and any
+            frame ranges that could not be captured
+        """
+        from concurrent.futures import ThreadPoolExecutor, as_completed
+        
+        if not self._is_valid_prezi_url(prezi_url):
+            raise ValueError("Invalid Prezi URL provided")
+        
+        self._deck_id = deck_id_from_url(prezi_url)
+        self.policy.check_circuit(self._deck_id)
+        self._host = HostRateLimiter.host_for(prezi_url)
+        
+        frames_source = 'caller'
+        if total_frames is None:
+            count = self._count_frames(prezi_url)
+            if count is None:
+                print("Deck does not expose its frame count; capturing it sequentially")
+                return self.scrape_prezi(prezi_url)
+            total_frames = min(count, self.config.max_slides)
+            frames_source = 'page' if total_frames == count else 'max_slides'
+        
+        self.youtube_extractor.start_deck(self._deck_id)
+        self.deck_dir = None
+        self.incremental = None
+        self._slide_text = {}
+        self.link_metadata = {}
+        self._start_progress(prezi_url, total_frames, frames_source)
+        error = None
+        
+        # A retried shard captures its frames again; count each frame once
+        counted = set()
+        counted_lock = threading.Lock()
+        output_lock = threading.Lock()
+        output_started = []
+        
+        def count_frame(index: int, path: str):
+            with counted_lock:
+                # Crop while the other shards keep capturing; a frame captured
+                # again by a retried shard is cropped again, as it was rewritten
+                self._post_process(index + 1, path)
+                if index in counted:
+                    return
+                counted.add(index)
+            self._progress_slide()
+        
+        def start_output():
+            # Only withdraw the last run's manifest once a shard's browser has
+            # started, so a deck whose browsers all fail to start keeps its
+            # complete output; the other shards wait here until it is done
+            with output_lock:
+                if not output_started:
+                    self._start_deck_output()
+                    self._start_incremental(prezi_url)
+                    output_started.append(True)
+        
+        try:
+            shards = max(1, min(shards, total_frames))
+            bounds = [(total_frames * i // shards, total_frames * (i + 1) // shards)
+                      for i in range(shards)]
+            
+            results = {}
+            failed_ranges = []
+            with ThreadPoolExecutor(max_workers=shards) as executor:
+                futures = {
+                    executor.submit(self._capture_shard, prezi_url, start, end,
+                                    count_frame, start_output): (start, end)
+                    for start, end in bounds
+                }
+                retries = {}
+                for future in as_completed(futures):
+                    start, end = futures[future]
+                    try:
+                        results[start] = future.result()
+                    except Exception as e:
+                        print(f"Shard for frames {start + 1}-{end} failed, retrying: {e}")
+                        retry = executor.submit(self._capture_shard, prezi_url, start, end,
+                                                count_frame, start_output)
+                        retries[retry] = (start, end)
+                
+                for future in as_completed(retries):
+                    start, end = retries[future]
+                    try:
+                        results[start] = future.result()
+                    except Exception as e:
+                        print(f"Shard for frames {start + 1}-{end} failed again: {e}")
+                        failed_ranges.append(f"{start + 1}-{end}")
+            
+            frames = []
+            title = "untitled_prezi"
+            for start in sorted(results):
+                shard = results[start]
+                if title == "untitled_prezi":
+                    title = shard["title"]
+                frames.extend(sorted(shard["frames"]))
+                self.youtube_extractor.merge_from(shard["extractor"])
+            screenshots = [path for _, path in frames]
+            
+            # The shards label their own threads; this thread only waited for them until now
+            self._profile_label()
+            if self.post_processor:
+                self.post_processor.flush()
+            if self.rendition_pool:
+                self.rendition_pool.flush()
+            
+            self._index_text(prezi_url, title)
+            results = {
                 "screenshots": screenshots,
-                "youtube_links": youtube_links,
-                "title": presentation_title
+                "youtube_links": self.youtube_extractor.get_extracted_links(),
+                "title": title,
+                "failed_frames": sorted(failed_ranges, key=lambda r: int(r.split('-')[0])),
             }
+            new_links = self._record_links()
+            if new_links is not None:
+                results["new_youtube_links"] = new_links
+            diff = self._finish_incremental(complete=not failed_ranges)
+            if diff is not None:
+                results["diff"] = diff
+            metadata = self._resolve_metadata()
+            if metadata is not None:
+                results["youtube_metadata"] = metadata
+            deck_dir = self._complete_deck_output(prezi_url, title, screenshots,
+                                                  complete=not failed_ranges)
+            if deck_dir is not None:
+                results["deck_dir"] = deck_dir
+            if failed_ranges:
+                error = f"frames {', '.join(results['failed_frames'])} not captured"
+                self.policy.record_failure(self._deck_id, PhaseFailure('capture', REASON_PAGE, error,
+                                                                       deck_id=self._deck_id))
+            else:
+                self.policy.record_success(self._deck_id)
+            return results
+            
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"
+            self.policy.record_failure(self._deck_id, e)
+            raise
+        finally:
+            self._finish_incremental(complete=False)
+            if self.tuner:
+                self.tuner.save()
+            if self.recorder:
+                self.recorder.save()
+            self._finish_progress(error)
+            self._clear_profile_label()
+    
+    def _count_frames(self, prezi_url: str) -> Optional[int]:
+        """Open a deck only to read its frame count, to split it into shards."""
+        self._profile_label()
+        self.driver = self.supervisor.acquire() if self.supervisor else self._setup_driver()
+        failed = True
+        try:
+            self._open_deck(prezi_url)
+            count = self._read_frame_count()
+            failed = False
+            return count
+        finally:
+            self._release_driver(failed)
+            self._clear_profile_label()
+    
+    def _record_step(self, driver, kind: str, **data):
+        """Record a navigation step and drain the performance log into the recorder and Chrome trace."""
+        entries = None
+        if self.profiler and self.profiler.chrome_trace:
+            entries = self.profiler.collect_trace(driver)
+        if self.recorder is None:
+            return
+        self.recorder.step(kind, deck_id=self._deck_id, **data)
+        self.recorder.collect(driver, entries)
+    
+    def _profile_label(self, slide: Optional[int] = None):
+        """Attribute the current thread's work to the current deck and slide, when profiling."""
+        if self.profiler:
+            self.profiler.label(self._deck_id, slide)
+    
+    def _clear_profile_label(self):
+        """Stop attributing the current thread's work to a deck, when profiling."""
+        if self.profiler:
+            self.profiler.clear_label()
+    
+    def _start_progress(self, prezi_url: str, total_frames: Optional[int] = None,
+                        frames_source: Optional[str] = None):
+        """Start tracking the current deck's progress, if a tracker is set."""
+        if self.progress:
+            self.progress.start_deck(self._deck_id, prezi_url, total_frames, frames_source)
+    
+    def _progress_slide(self):
+        """Count a captured slide of the current deck."""
+        if self.progress:
+            self.progress.slide_done(self._deck_id)
+    
+    def _finish_progress(self, error: Optional[str] = None):
+        """Stop tracking the current deck's progress."""
+        if self.progress:
+            self.progress.finish_deck(self._deck_id, error)
+    
+    def _read_frame_count(self, driver=None) -> Optional[int]:
+        """
+        Read the deck's frame count from the viewer's embedded data.
+        
+        Returns:
+            Number of frames in the deck, or None if the page does not expose a count
+        """
+        try:
+            from .prezi_probe import FRAME_COUNT_PATTERN
+            from .progress import FRAME_COUNT_SCRIPT
+            count = (driver or self.driver).execute_script(FRAME_COUNT_SCRIPT, FRAME_COUNT_PATTERN.pattern)
+        except Exception:
+            return None
+        if not isinstance(count, (int, float)) or count <= 0:
+            return None
+        return int(count)
+    
+    def _discover_frame_count(self, driver=None) -> Optional[int]:
+        """
+        Report the number of frames that will be captured to the progress tracker.
+        
+        Returns:
+            Number of frames (at most max_slides), or None without a tracker
+            or if the page does not expose a count
+        """
+        if self.progress is None:
+            return None
+        count = self._read_frame_count(driver)
+        if count is None:
+            return None
+        
+        total = min(count, self.config.max_slides)
+        source = 'page' if total == count else 'max_slides'
+        self.progress.set_total_frames(self._deck_id, total, source)
+        return total
+    
+    def _start_deck_output(self):
+        """Create the current deck's folder and withdraw its completion manifest until this run completes."""
+        self.deck_dir = None
+        if self.config.per_deck_output:
+            self.deck_dir = self.screenshots_dir / self._deck_id
+            self.deck_dir.mkdir(parents=True, exist_ok=True)
+            (self.deck_dir / COMPLETION_FILENAME).unlink(missing_ok=True)
+    
+    def _complete_deck_output(self, prezi_url: str, title: str, screenshots: List[str],
+                              complete: bool = True) -> Optional[str]:
+        """
+        Save the deck's links into its folder and mark the deck complete.
+        
+        The completion manifest is written last, after every slide, rendition
+        and link file of the deck is in place, so a deck folder with a manifest
+        can be used as is.
+        
+        Args:
+            prezi_url: URL of the deck
+            title: Presentation title
+            screenshots: Paths of the deck's slides
+            complete: Whether every frame was captured; incomplete decks get no manifest
+        
+        Returns:
+            The deck's folder, or None without per-deck output
+        """
+        if self.deck_dir is None:
+            return None
+        
+        youtube_links = sorted(self.youtube_extractor.get_extracted_links())
+        if youtube_links:
+            self.youtube_extractor.save_links_to_file(self.config.youtube_filename,
+                                                      metadata=self.link_metadata,
+                                                      directory=str(self.deck_dir))
+        if not complete:
+            print(f"Deck {self._deck_id} is incomplete; no completion manifest written")
+            return str(self.deck_dir)
+        
+        slides = []
+        for path in screenshots:
+            path = Path(path)
+            slides.append({'file': path.relative_to(self.deck_dir).as_posix()
+                                   if path.is_relative_to(self.deck_dir) else str(path),
+                           'bytes': path.stat().st_size if path.exists() else None})
+        atomic_write_json(self.deck_dir / COMPLETION_FILENAME, {
+            'deck_id': self._deck_id,
+            'url': prezi_url,
+            'title': title,
+            'completed_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'worker': f"{socket.gethostname()}:{os.getpid()}",
+            'slides': slides,
+            'youtube_links': youtube_links,
+            'youtube_links_file': self.config.youtube_filename if youtube_links else None,
+        })
+        return str(self.deck_dir)
+    
+    def _start_incremental(self, prezi_url: str):
+        """Open the deck's incremental slide store when incremental mode is on."""
+        self.incremental = None
+        if self.config.incremental:
+            from .incremental import IncrementalSlideStore
+            self.incremental = IncrementalSlideStore(
+                str(self.screenshots_dir / self._deck_id), self._deck_id, prezi_url
+            )
+    
+    def _finish_incremental(self, complete: bool) -> Optional[Dict]:
+        """
+        Close the incremental slide store, if open.
+        
+        Args:
+            complete: Whether all slides were captured, so missing ones were removed from the deck
+            
+        Returns:
+            Diff report, or None when not in incremental mode
+        """
+        if self.incremental is None:
+            return None
+        store, self.incremental = self.incremental, None
+        return store.finish(complete=complete)
+    
+    def _capture_slide(self, index: int, driver=None) -> Optional[str]:
+        """
+        Capture the current slide.
+        
+        In incremental mode the capture is compared with the previous run and
+        only written when it changed; otherwise it is saved as a new file.
+        Renditions are queued while the capture is still in memory.
+        
+        The capture runs within the capture phase's deadline; one that produced
+        no image is retried, one that ran past the deadline raises PhaseFailure
+        and the browser, still busy with it, is discarded after the deck.
+        
+        Args:
+            index: 1-based slide index
+            driver: WebDriver to capture (defaults to the current driver)
+            
+        Returns:
+            Path to the slide's screenshot or None if the capture failed
+        """
+        driver = driver or self.driver
+        
+        def capture() -> Optional[str]:
+            # Runs in a helper thread, so attribute it to the slide there too
+            self._profile_label(slide=index)
+            try:
+                self._record_step(driver, 'capture', index=index)
+                path = self._capture_screenshot(index, driver)
+                if path and self.text_index is not None:
+                    self._record_slide_text(index, path, driver)
+                return path
+            finally:
+                self._clear_profile_label()
+        
+        def attempt(timeout: float) -> str:
+            path = self._call_driver(capture, timeout, driver)
+            if not path:
+                raise PhaseFailure('capture', REASON_PAGE, f"no image of slide {index}")
+            return path
+        
+        try:
+            return self.policy.run('capture', attempt, self._deck_id)
+        except PhaseFailure as failure:
+            if failure.fatal:
+                raise
+            print(f"Could not capture slide {index}: {failure}")
+            return None
+    
+    def _capture_screenshot(self, index: int, driver) -> Optional[str]:
+        """Capture the current slide into a new file, the incremental store and the rendition pool."""
+        name = f"slide_{index:03d}"
+        if self.deck_dir is not None:
+            name = f"{self._deck_id}/{name}"
+        
+        if self.screenshot_capture.tiled:
+            # Tiled captures stream to disk, so compare and render the finished file;
+            # the store moves it over the archived slide only if it changed
+            if self.incremental is not None:
+                name += "_capture"
+            path = self.screenshot_capture.capture_tiled(driver, name)
+            if path and self.incremental is not None:
+                path = self.incremental.store_file(index, path)
+            self._render(index, path)
+            return path
+        
+        if self.incremental is None and self.rendition_pool is None:
+            return self.screenshot_capture.capture_full_page(driver, name)
+        
+        # Keep the capture in memory to compare it and render it without reading it back
+        png = self.screenshot_capture.capture_full_page_png(driver)
+        if not png:
+            return None
+        if self.incremental is not None:
+            path = self.incremental.store_bytes(index, png)
+        else:
+            path = self.screenshot_capture.save_png(png, name)
+        self._render(index, path, png)
+        return path
+    
+    def _record_slide_text(self, index: int, path: str, driver):
+        """Keep the visible text of a captured slide for the text index."""
+        try:
+            from .text_index import VISIBLE_TEXT_SCRIPT
+            text = driver.execute_script(VISIBLE_TEXT_SCRIPT) or ""
+        except Exception as e:
+            print(f"Could not extract text of slide {index}: {e}")
+            text = ""
+        self._slide_text[index] = {'index': index, 'path': path, 'text': text, 'youtube_links': []}
+    
+    def _attach_slide_links(self, index: int, links: List[str]):
+        """Attribute YouTube links to the slide they were found on."""
+        slide = self._slide_text.get(index)
+        if slide is not None:
+            slide['youtube_links'].extend(links)
+    
+    def _index_text(self, prezi_url: str, title: str):
+        """Add the current deck's slide text to the text index, if one is set."""
+        if self.text_index is None:
+            return
+        count = self.text_index.add_deck(
+            self._deck_id, title, list(self._slide_text.values()), url=prezi_url,
+            youtube_links=self.youtube_extractor.get_extracted_links()
+        )
+        print(f"Indexed the text of {count} slide(s)")
+    
+    def _render(self, index: int, path: Optional[str], png: Optional[bytes] = None):
+        """Queue a new slide's renditions; slides unchanged since the last run already have them."""
+        if self.rendition_pool is None or path is None:
+            return
+        if self.incremental is not None and index in self.incremental.unchanged:
+            return
+        self.rendition_pool.add(path, png)
+    
+    def _post_process(self, index: int, path: str):
+        """Queue a new slide for cropping; slides unchanged since the last run already are."""
+        if self.post_processor is None:
+            return
+        if self.incremental is not None and index in self.incremental.unchanged:
+            return
+        self.post_processor.add(path)
+    
+    def _record_links(self) -> Optional[List[str]]:
+        """
+        Record the current deck's links in the shared link index.
+        
+        Returns:
+            Links no deck had been recorded with before, or None without an index
+        """
+        if self.link_index is None:
+            return None
+        
+        video_ids = {record.video_id for record in self.youtube_extractor.iter_link_details()}
+        new_ids = self.link_index.record(sorted(video_ids), self._deck_id)
+        if video_ids:
+            print(f"{len(new_ids)} of {len(video_ids)} YouTube link(s) are new to the link index")
+        return [WATCH_URL_PREFIX + video_id for video_id in new_ids]
+    
+    def _resolve_metadata(self) -> Optional[List[dict]]:
+        """
+        Look up the title and availability of the current deck's links.
+        
+        Returns:
+            Metadata of each link, or None without a metadata resolver
+        """
+        if self.metadata_resolver is None:
+            return None
+        
+        video_ids = [record.video_id for record in self.youtube_extractor.iter_link_details()]
+        if not video_ids:
+            return []
+        try:
+            self.link_metadata = self.metadata_resolver.resolve_many(video_ids)
+        except Exception as e:
+            # Metadata is extra; the deck's screenshots and links are still good
+            print(f"Warning: could not resolve YouTube metadata: {e}")
+            return None
+        
+        unavailable = sum(1 for metadata in self.link_metadata.values()
+                          if metadata.status in ('restricted', 'unavailable'))
+        print(f"Resolved metadata of {len(self.link_metadata)} YouTube link(s), "
+              f"{unavailable} unavailable")
+        return [metadata.to_dict() for metadata in self.link_metadata.values()]
+    
+    def _capture_shard(self, prezi_url: str, start: int, end: int,
+                       on_frame: Callable[[int, str], None], on_started: Callable[[], None]) -> Dict:
+        """
+        Capture frames [start, end) of a deck in a dedicated browser.
+        
+        on_started is called once the browser is up, before anything is
+        written; on_frame is called with each captured frame's index and path.
+        """
+        self._profile_label()
+        driver = self._setup_driver()
+        extractor = YouTubeExtractor(str(self.output_dir))
+        frames = []
+        
+        try:
+            on_started()
+            self._open_deck(prezi_url, driver)
+            title = self._get_presentation_title(driver)
+            
+            self._advance_frames(driver, start)
+            for index in range(start, end):
+                self._profile_label(slide=index + 1)
+                if index > start:
+                    self._advance_frames(driver, 1)
+                
+                screenshot_path = self._capture_slide(index + 1, driver)
+                if screenshot_path:
+                    frames.append((index, screenshot_path))
+                    on_frame(index, screenshot_path)
+                
+                found = []
+                extractor.on_link = found.append
+                try:
+                    self._process_embedded_content(driver, extractor)
+                finally:
+                    extractor.on_link = None
+                self._attach_slide_links(index + 1, [record.url for record in found])
+            
+            return {"title": title, "frames": frames, "extractor": extractor}
             
         finally:
-            if self.driver:
-                self.driver.quit()
+            driver.quit()
+            self._clear_profile_label()
+    
+    def _advance_frames(self, driver, count: int):
+        """Step the presentation forward by a number of frames using the keyboard."""
+        if count <= 0:
+            return
+        
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.common.keys import Keys
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        
+        def advance(timeout: float):
+            body = WebDriverWait(driver, timeout).until(
+                EC.presence_of_element_located((By.TAG_NAME, "body"))
+            )
+            for _ in range(count):
+                # Each key press gets the deadline; WebDriver calls have none of their own
+                self._call_driver(lambda: body.send_keys(Keys.ARROW_RIGHT), timeout, driver)
+                time.sleep(0.2)
+        
+        self.policy.run('navigation', advance, self._deck_id)
+        self._record_step(driver, 'advance', count=count)
+        
+        # Wait for the final transition to finish before capturing
+        self._wait_for_settle('transition', self.config.screenshot_delay, driver,
+                              min_wait=self.config.navigation_delay)
+    
+    def _call_driver(self, func: Callable[[], object], timeout: float, driver=None):
+        """
+        Make a WebDriver call within a phase deadline.
+        
+        A call that overruns keeps running in its helper thread, so the current
+        driver is marked to be discarded rather than reused for the next deck.
+        
+        Args:
+            func: Function making the WebDriver call
+            timeout: Deadline in seconds
+            driver: Driver the call uses (defaults to the current driver)
+        
+        Returns:
+            The function's return value
+        """
+        try:
+            return call_with_deadline(func, timeout)
+        except TimeoutError:
+            if driver is None or driver is self.driver:
+                self._driver_abandoned = True
+            raise
+    
+    def _open_deck(self, prezi_url: str, driver=None):
+        """Load a deck and wait for it to render, within the load phase's deadline and retries."""
+        def load(timeout: float):
+            deadline = time.monotonic() + timeout
+            self._load_page(prezi_url, driver)
+            self._wait_for_prezi_load(max(0.0, deadline - time.monotonic()), driver)
+        
+        self.policy.run('load', load, self._deck_id)
+    
+    def _load_page(self, url: str, driver=None):
+        """Load a page, respecting and feeding back into the host rate limit."""
+        driver = driver or self.driver
+        target = self.url_resolver(url) if self.url_resolver else url
+        if self.rate_limiter is not None:
+            waited = self.rate_limiter.acquire(target)
+            if waited:
+                print(f"Waited {waited:.1f}s for rate limit on {HostRateLimiter.host_for(target)}")
+        
+        start = time.time()
+        driver.get(target)
+        status = self._get_navigation_status(driver)
+        if self.rate_limiter is not None:
+            self.rate_limiter.report(target, status=status, elapsed=time.time() - start)
+        self._record_step(driver, 'load', url=url, status=status)
+        
+        if status == 429:
+            raise PhaseFailure('load', REASON_THROTTLED, f"HTTP 429 while loading {url}")
+        if isinstance(status, int) and 400 <= status < 600:
+            reason = REASON_SERVER if status >= 500 else REASON_HTTP
+            raise PhaseFailure('load', reason, f"HTTP {status} while loading {url}")
+    
+    def _get_navigation_status(self, driver=None) -> Optional[int]:
+        """Get the HTTP status of the current page from the Navigation Timing API."""
+        try:
+            return (driver or self.driver).execute_script(
+                "var nav = performance.getEntriesByType('navigation')[0];"
+                "return nav && nav.responseStatus ? nav.responseStatus : null;"
+            )
+        except Exception:
+            return None
     
     def _is_valid_prezi_url(self, url: str) -> bool:
         """Check if the URL is a valid Prezi URL."""
         parsed = urlparse(url)
         return parsed.netloc in ['prezi.com', 'www.prezi.com'] and '/p/' in parsed.path
     
-    def _wait_for_prezi_load(self, timeout: int = 30):
-        """Wait for Prezi presentation to fully load."""
+    def _wait_for_prezi_load(self, timeout: Optional[float] = None, driver=None):
+        """Wait for Prezi presentation to fully load, raising PhaseFailure if it does not appear in time."""
+        from selenium.webdriver.common.by import By
+        from selenium.webdriver.support.ui import WebDriverWait
+        from selenium.webdriver.support import expected_conditions as EC
+        from selenium.common.exceptions import TimeoutException
+        
+        driver = driver or self.driver
+        timeout = self.config.page_load_timeout if timeout is None else timeout
+        
         try:
             # Wait for the presentation viewer to be present
-            WebDriverWait(self.driver, timeout).until(
+            start = time.time()
+            WebDriverWait(driver, timeout).until(
                 EC.presence_of_element_located((By.CLASS_NAME, "presentation-viewer"))
             )
+            if self.tuner:
+                self.tuner.record('load', time.time() - start, self._host, self._deck_id)
             
             # Additional wait for content to render
-            time.sleep(5)
+            self._wait_for_settle('render', self.config.render_delay, driver,
+                                  min_wait=self.tuner.min_wait if self.tuner else 0.0)
             
         except TimeoutException:
-            print("Warning: Prezi presentation may not have loaded completely")
+            # Capturing a page that never loaded only produces blank slides
+            raise PhaseFailure('load', REASON_TIMEOUT,
+                               f"presentation viewer did not appear within {timeout:.0f}s")
     
-    def _get_presentation_title(self) -> str:
+    def _wait_for_settle(self, phase: str, max_wait: float, driver=None,
+                         min_wait: float = 0.0) -> float:
+        """
+        Wait until the page stops changing, for at most the (tuned) maximum wait.
+        
+        Without a tuner this sleeps for the full configured wait, as before.
+        With one, the page is polled until no animation is running, its images
+        have loaded and its elements and their transforms are unchanged since
+        the last poll; the time that took is recorded so that later waits for
+        the same deck or host can be shortened. A wait that ran out before the
+        page settled is not recorded, since it says nothing about how long
+        settling takes.
+        
+        Args:
+            phase: Phase name used for tuning ('render' or 'transition')
+            max_wait: Configured worst-case wait in seconds
+            driver: WebDriver to poll (defaults to the current driver)
+            min_wait: Seconds to wait even if the page looks settled sooner
+            
+        Returns:
+            Seconds spent waiting
+        """
+        if self.tuner is None:
+            time.sleep(max_wait)
+            return max_wait
+        
+        from .timing_tuner import SETTLE_SCRIPT
+        
+        driver = driver or self.driver
+        min_wait = min(min_wait, max_wait)
+        limit = max(min_wait, self.tuner.recommend(phase, max_wait, self._host, self._deck_id))
+        start = time.time()
+        previous = None
+        settled = False
+        
+        while time.time() - start < limit:
+            time.sleep(0.25)
+            try:
+                running, loading, fingerprint = driver.execute_script(SETTLE_SCRIPT)
+            except Exception:
+                settled = False
+                break
+            settled = not running and not loading and fingerprint == previous
+            previous = fingerprint
+            if settled and time.time() - start >= min_wait:
+                break
+        
+        waited = time.time() - start
+        if settled:
+            self.tuner.record(phase, waited, self._host, self._deck_id)
+        return waited
+    
+    def _get_presentation_title(self, driver=None) -> str:
         """Extract the presentation title."""
+        from selenium.webdriver.common.by import By
+        from selenium.common.exceptions import NoSuchElementException
+        
         try:
-            title_element = self.driver.find_element(By.TAG_NAME, "title")
+            title_element = (driver or self.driver).find_element(By.TAG_NAME, "title")
             title = title_element.get_attribute("textContent") or "untitled_prezi"
             # Clean title for use as filename
-            return "".join(c for c in title if c.isalnum() or c in (' ', '-', '_')).strip()
+            return clean_title(title)
         except NoSuchElementException:
             return "untitled_prezi"
     
-    def _process_slides(self) -> List[str]:
-        """Process all slides in the presentation."""
-        screenshots = []
+    def _iter_slides(self) -> Iterator[ScrapeEvent]:
+        """Process all slides in the presentation, yielding slide and link events."""
         slide_count = 0
         
         # Try to find navigation elements or slides
         try:
             # Look for slide navigation or frames
-            self._navigate_through_slides(screenshots, slide_count)
+            for event in self._navigate_through_slides():
+                if isinstance(event, SlideEvent):
+                    slide_count += 1
+                yield event
             
         except Exception as e:
-            print(f"Error processing slides: {e}")            # Fallback: take a screenshot of the current view
-            screenshot_path = self.screenshot_capture.capture_full_page(
-                self.driver, "slide_001"
-            )
-            if screenshot_path:
-                screenshots.append(screenshot_path)
-        
-        return screenshots
+            if isinstance(e, PhaseFailure) and e.fatal:
+                raise
+            print(f"Error processing slides: {e}")
+            if slide_count == 0:
+                # Fallback: take a screenshot of the current view
+                self._profile_label(slide=1)
+                screenshot_path = self._capture_slide(1)
+                if screenshot_path:
+                    yield SlideEvent(index=1, path=screenshot_path)
     
-    def _navigate_through_slides(self, screenshots: List[str], slide_count: int):
-        """Navigate through slides and capture screenshots."""
+    def _navigate_through_slides(self) -> Iterator[ScrapeEvent]:
+        """Navigate through slides, capturing screenshots and embedded links."""
+        from selenium.webdriver.common.by import By
+        
         # This is a simplified approach - Prezi navigation can be complex
         # We'll capture the main view and any embedded content
+        slide_count = 0
         
         # Capture main presentation view
-        screenshot_path = self.screenshot_capture.capture_full_page(
-            self.driver, f"slide_{slide_count + 1:03d}"
-        )
+        self._profile_label(slide=slide_count + 1)
+        screenshot_path = self._capture_slide(slide_count + 1)
         if screenshot_path:
-            screenshots.append(screenshot_path)
             slide_count += 1
+            yield SlideEvent(index=slide_count, path=screenshot_path)
         
         # Look for YouTube iframes and process them
-        self._process_embedded_content()
+        yield from self._iter_embedded_links()
         
         # Try to find and click through navigation elements
         nav_elements = self.driver.find_elements(By.CSS_SELECTOR, 
             "[class*='nav'], [class*='next'], [class*='arrow'], [data-testid*='nav']")
         
-        for nav_element in nav_elements[:10]:  # Limit to prevent infinite loops
+        for nav_element in nav_elements:
+            if slide_count >= self.config.max_slides:  # Prevent infinite loops
+                break
             try:
                 if nav_element.is_displayed() and nav_element.is_enabled():
-                    nav_element.click()
-                    time.sleep(2)  # Wait for transition
+                    self._profile_label(slide=slide_count + 1)
+                    self.policy.run('navigation',
+                                    lambda timeout: self._call_driver(nav_element.click, timeout),
+                                    self._deck_id)
+                    self._record_step(self.driver, 'click')
+                    self._wait_for_settle('transition', self.config.screenshot_delay,
+                                          min_wait=self.config.navigation_delay)
                     
-                    screenshot_path = self.screenshot_capture.capture_full_page(
-                        self.driver, f"slide_{slide_count + 1:03d}"
-                    )
+                    screenshot_path = self._capture_slide(slide_count + 1)
                     if screenshot_path:
-                        screenshots.append(screenshot_path)
                         slide_count += 1
+                        yield SlideEvent(index=slide_count, path=screenshot_path)
                     
-                    self._process_embedded_content()
+                    yield from self._iter_embedded_links()
                     
+            except PhaseFailure as failure:
+                # A lost browser or a capture past its deadline ends the deck
+                if failure.fatal:
+                    raise
+                print(f"Error clicking navigation element: {failure}")
+                continue
             except Exception as e:
                 print(f"Error clicking navigation element: {e}")
                 continue
     
-    def _process_embedded_content(self):
+    def _iter_embedded_links(self) -> Iterator[LinkEvent]:
+        """Process embedded content and yield an event for each new YouTube link."""
+        found = []
+        self.youtube_extractor.on_link = found.append
+        try:
+            self._process_embedded_content()
+        finally:
+            self.youtube_extractor.on_link = None
+        
+        for record in found:
+            yield LinkEvent(url=record.url, video_id=record.video_id, source=record.source)
+    
+    def _process_embedded_content(self, driver=None, extractor: Optional[YouTubeExtractor] = None):
         """Process embedded content like YouTube videos."""
+        from selenium.webdriver.common.by import By
+        
+        driver = driver or self.driver
+        extractor = extractor or self.youtube_extractor
+        
+        if self.in_browser_extraction:
+            # Match links inside the page instead of transferring the whole DOM
+            extractor.extract_from_driver(driver)
+            return
+        
         # Find YouTube iframes
-        iframes = self.driver.find_elements(By.TAG_NAME, "iframe")
+        iframes = driver.find_elements(By.TAG_NAME, "iframe")
         
         for iframe in iframes:
             try:
                 src = iframe.get_attribute("src")
                 if src and "youtube" in src:
-                    self.youtube_extractor.extract_youtube_link(src)
+                    extractor.extract_youtube_link(src)
             except Exception as e:
                 print(f"Error processing iframe: {e}")
         
         # Also look for YouTube links in the page source
-        page_source = self.driver.page_source
-        self.youtube_extractor.extract_from_page_source(page_source)
+        page_source = driver.page_source
+        extractor.extract_from_page_source(page_source)
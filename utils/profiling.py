@@ -0,0 +1,295 @@
+"""Profiling hooks that attribute scraping time to decks and slides."""
+
+import cProfile
+import io
+import json
+import pstats
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+
+from .fileio import atomic_write_text
+from .policy import deadline_helper
+
+
+PROFILE_MODES = ('sample', 'cprofile')
+
+# Samples with a frame from these modules were waiting on a WebDriver round trip
+WEBDRIVER_MODULES = ('selenium.', 'urllib3.', 'http.client')
+
+
+class ScrapeProfiler:
+    """
+    Profiles a scraping run and labels the results by deck and slide.
+    
+    In 'sample' mode a background thread records the Python stack of every
+    labelled thread at a fixed interval (continued into the helper thread of
+    a call_with_deadline it is waiting on) and writes collapsed stacks (the input
+    of flamegraph.pl, speedscope and similar tools) prefixed with the deck and
+    slide being captured, plus a summary of how much of each slide went to
+    WebDriver round trips. In 'cprofile' mode one cProfile profile is written
+    per deck; decks should then run one at a time, as Python allows a single
+    active cProfile profiler.
+    
+    With chrome_trace, DevTools trace events read from the performance log are
+    labelled the same way and written as a Chrome trace (chrome://tracing,
+    Perfetto) showing what the browser itself was doing.
+    """
+    
+    def __init__(self, output_dir: str, mode: Optional[str] = 'sample',
+                 interval: float = 0.005, chrome_trace: bool = False):
+        """
+        Initialize the profiler.
+        
+        Args:
+            output_dir: Directory for profiles; each run writes to its own subfolder
+            mode: 'sample', 'cprofile' or None to only record the Chrome trace
+            interval: Seconds between stack samples in 'sample' mode
+            chrome_trace: Collect DevTools trace events (the browser must be started
+                with trace categories, see chrome_options())
+        """
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode {mode!r}, expected one of {PROFILE_MODES}")
+        
+        self.run_dir = Path(output_dir) / time.strftime('run-%Y%m%d-%H%M%S')
+        self.mode = mode
+        self.interval = max(0.001, interval)
+        self.chrome_trace = chrome_trace
+        
+        self._lock = threading.Lock()
+        self._labels: Dict[int, Tuple[str, Optional[int]]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._started_at: Optional[float] = None
+        self._elapsed = 0.0
+        self._ticks = 0
+        self.stacks: Counter = Counter()
+        self._samples: Counter = Counter()
+        self._webdriver_samples: Counter = Counter()
+        
+        self.profiles: Dict[str, cProfile.Profile] = {}
+        self._active_deck: Optional[str] = None
+        self._warned_cprofile = False
+        
+        self.trace_events: List[Dict] = []
+    
+    @classmethod
+    def from_config(cls, config) -> 'ScrapeProfiler':
+        """Create a profiler using the profiling settings of a ScraperConfig."""
+        return cls(str(Path(config.output_dir) / "profiles"), mode=config.profile_mode,
+                   interval=config.profile_interval, chrome_trace=config.chrome_trace)
+    
+    def start(self) -> 'ScrapeProfiler':
+        """Start sampling, if in 'sample' mode. Calling start() again has no effect."""
+        if self._started_at is not None:
+            return self
+        self._started_at = time.perf_counter()
+        if self.mode == 'sample':
+            self._thread = threading.Thread(target=self._sample_loop, name="scrape-profiler",
+                                            daemon=True)
+            self._thread.start()
+        return self
+    
+    def label(self, deck_id: str, slide: Optional[int] = None):
+        """
+        Attribute the calling thread's work to a deck and, optionally, a slide.
+        
+        Args:
+            deck_id: Deck being scraped
+            slide: 1-based index of the slide being navigated to and captured
+        """
+        with self._lock:
+            self._labels[threading.get_ident()] = (deck_id, slide)
+        if self.mode == 'cprofile':
+            self._switch_profile(deck_id)
+    
+    def clear_label(self):
+        """Stop attributing the calling thread's work to a deck."""
+        with self._lock:
+            self._labels.pop(threading.get_ident(), None)
+            idle = not self._labels
+        if self.mode == 'cprofile' and idle:
+            self._switch_profile(None)
+    
+    def current_label(self) -> Optional[Tuple[str, Optional[int]]]:
+        """Get the deck and slide the calling thread's work is attributed to."""
+        with self._lock:
+            return self._labels.get(threading.get_ident())
+    
+    def _switch_profile(self, deck_id: Optional[str]):
+        """Move cProfile over to the given deck's profile."""
+        with self._lock:
+            if deck_id == self._active_deck:
+                return
+            if self._active_deck is not None:
+                self.profiles[self._active_deck].disable()
+            self._active_deck = None
+            if deck_id is None:
+                return
+            profile = self.profiles.setdefault(deck_id, cProfile.Profile())
+            try:
+                profile.enable()
+            except ValueError as e:
+                # Another profiler (or debugger) already owns the interpreter
+                if not self._warned_cprofile:
+                    self._warned_cprofile = True
+                    print(f"Warning: cProfile unavailable, deck not profiled: {e}")
+                return
+            self._active_deck = deck_id
+    
+    def _sample_loop(self):
+        own_ident = threading.get_ident()
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            with self._lock:
+                labels = dict(self._labels)
+            
+            for ident, (deck_id, slide) in labels.items():
+                frame = frames.get(ident)
+                if frame is None or ident == own_ident:
+                    continue
+                names = self._stack_names(frame)
+                # A thread waiting on a phase deadline is doing the helper thread's work
+                helper = deadline_helper(ident)
+                while helper is not None and helper in frames:
+                    names += self._stack_names(frames[helper])
+                    helper = deadline_helper(helper)
+                
+                prefix = [f"deck {deck_id}"] + ([f"slide {slide}"] if slide is not None else [])
+                self.stacks[';'.join(prefix + [n.replace(';', ':') for n in names])] += 1
+                self._samples[(deck_id, slide)] += 1
+                if any(n.startswith(WEBDRIVER_MODULES) for n in names):
+                    self._webdriver_samples[(deck_id, slide)] += 1
+            
+            now = time.perf_counter()
+            self._elapsed += now - last
+            self._ticks += 1
+            last = now
+    
+    @staticmethod
+    def _stack_names(frame) -> List[str]:
+        """Get the qualified function names of a stack, outermost first."""
+        names = []
+        while frame is not None:
+            module = frame.f_globals.get('__name__', '?')
+            names.append(f"{module}.{frame.f_code.co_qualname}")
+            frame = frame.f_back
+        names.reverse()
+        return names
+    
+    def collect_trace(self, driver) -> Optional[List[Dict]]:
+        """
+        Drain the driver's performance log, keeping its trace events.
+        
+        Args:
+            driver: WebDriver started with performance logging enabled
+        
+        Returns:
+            All log entries read, so other consumers of the log (such as
+            SessionRecorder.collect) can be given the same entries, or None
+            if the log could not be read
+        """
+        try:
+            entries = driver.get_log('performance')
+        except Exception as e:
+            print(f"Warning: performance log unavailable, no Chrome trace recorded: {e}")
+            self.chrome_trace = False
+            return None
+        
+        label = self.current_label()
+        events = []
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            if message.get('method') != 'Tracing.dataCollected':
+                continue
+            event = dict(message.get('params', {}))
+            if label:
+                event['args'] = {**event.get('args', {}), 'deck': label[0], 'slide': label[1]}
+            events.append(event)
+        
+        with self._lock:
+            self.trace_events.extend(events)
+        return entries
+    
+    def summary(self) -> Dict:
+        """
+        Summarize the sampled time per deck and slide.
+        
+        Returns:
+            Dictionary with the sampling interval actually achieved and, per
+            deck and slide, the seconds sampled and the share spent in WebDriver
+        """
+        with self._lock:
+            samples = dict(self._samples)
+            webdriver = dict(self._webdriver_samples)
+        interval = self._elapsed / self._ticks if self._ticks else self.interval
+        
+        decks: Dict[str, Dict] = {}
+        for (deck_id, slide), count in sorted(samples.items(), key=lambda item: (item[0][0], item[0][1] or 0)):
+            deck = decks.setdefault(deck_id, {'seconds': 0.0, 'webdriver_seconds': 0.0, 'slides': {}})
+            seconds = count * interval
+            webdriver_seconds = webdriver.get((deck_id, slide), 0) * interval
+            deck['seconds'] = round(deck['seconds'] + seconds, 3)
+            deck['webdriver_seconds'] = round(deck['webdriver_seconds'] + webdriver_seconds, 3)
+            key = str(slide) if slide is not None else 'deck'
+            deck['slides'][key] = {'seconds': round(seconds, 3),
+                                   'webdriver_seconds': round(webdriver_seconds, 3)}
+        
+        return {'mode': self.mode, 'interval': round(interval, 5), 'samples': sum(samples.values()),
+                'decks': decks}
+    
+    def stop(self) -> Dict[str, str]:
+        """
+        Stop profiling and write the run's results.
+        
+        Returns:
+            Paths of the files written, by kind
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self.mode == 'cprofile':
+            self._switch_profile(None)
+        
+        written: Dict[str, str] = {}
+        if self.mode == 'sample' and self.stacks:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            lines = [f"{stack} {count}" for stack, count in sorted(self.stacks.items())]
+            written['collapsed'] = self._write(self.run_dir / "stacks.collapsed", "\n".join(lines) + "\n")
+            summary = self.summary()
+            written['summary'] = self._write(self.run_dir / "summary.json", json.dumps(summary, indent=2))
+            for deck_id, deck in summary['decks'].items():
+                share = deck['webdriver_seconds'] / deck['seconds'] if deck['seconds'] else 0.0
+                print(f"Profile {deck_id}: {deck['seconds']:.1f}s sampled, {share:.0%} in WebDriver calls")
+        
+        if self.mode == 'cprofile':
+            for deck_id, profile in self.profiles.items():
+                self.run_dir.mkdir(parents=True, exist_ok=True)
+                path = self.run_dir / f"{deck_id}.prof"
+                profile.dump_stats(str(path))
+                written[f'cprofile:{deck_id}'] = str(path)
+                
+                report = io.StringIO()
+                pstats.Stats(profile, stream=report).sort_stats('cumulative').print_stats(40)
+                self._write(self.run_dir / f"{deck_id}.txt", report.getvalue())
+        
+        if self.trace_events:
+            self.run_dir.mkdir(parents=True, exist_ok=True)
+            trace = {'traceEvents': self.trace_events, 'displayTimeUnit': 'ms'}
+            written['chrome_trace'] = self._write(self.run_dir / "trace.json", json.dumps(trace))
+        
+        if written:
+            print(f"Profile written to: {self.run_dir}")
+        return written
+    
+    @staticmethod
+    def _write(path: Path, text: str) -> str:
+        return str(atomic_write_text(path, text))
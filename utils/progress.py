@@ -0,0 +1,411 @@
+"""Progress of decks and batches, with rolling throughput and ETA."""
+
+import os
+import socket
+import sys
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Dict, TextIO
+
+from .fileio import atomic_write_json
+
+
+# Reads the frame count from the viewer's embedded JSON (arguments[0] is
+# FRAME_COUNT_PATTERN from prezi_probe) and from data attributes, without
+# transferring the page source
+FRAME_COUNT_SCRIPT = """
+const pattern = new RegExp(arguments[0], 'gi');
+let best = 0;
+for (const script of document.scripts) {
+    const text = script.textContent;
+    if (!text) continue;
+    let match;
+    while ((match = pattern.exec(text))) best = Math.max(best, parseInt(match[1], 10));
+}
+document.querySelectorAll('[data-frame-count], [data-frames]').forEach(function (element) {
+    best = Math.max(best, parseInt(element.dataset.frameCount || element.dataset.frames, 10) || 0);
+});
+return best || null;
+"""
+
+
+class RollingRate:
+    """Rate of a growing count, measured over its most recent samples."""
+    
+    def __init__(self, window: int = 20):
+        """
+        Initialize the rate.
+        
+        Args:
+            window: Number of recent samples the rate is measured over
+        """
+        self._samples = deque(maxlen=max(2, window + 1))
+    
+    def add(self, count: float, now: Optional[float] = None):
+        """
+        Record the count reached.
+        
+        Args:
+            count: Cumulative count (e.g. slides captured so far)
+            now: Time of the sample (defaults to the current time)
+        """
+        self._samples.append((time.time() if now is None else now, count))
+    
+    def per_second(self) -> Optional[float]:
+        """Get the rate, or None until two samples far enough apart exist."""
+        if len(self._samples) < 2:
+            return None
+        (first_time, first_count), (last_time, last_count) = self._samples[0], self._samples[-1]
+        if last_time - first_time <= 0 or last_count <= first_count:
+            return None
+        return (last_count - first_count) / (last_time - first_time)
+
+
+class _LiveConsole:
+    """Stand-in for sys.stdout that keeps a status line below everything printed."""
+    
+    def __init__(self, stream: TextIO):
+        self.stream = stream
+        self.line = ""
+        self._shown = False
+        self._at_line_start = True
+        self._lock = threading.RLock()
+    
+    def write(self, text: str) -> int:
+        with self._lock:
+            if self._shown:
+                self.stream.write("\r\x1b[K")
+                self._shown = False
+            self.stream.write(text)
+            if text:
+                self._at_line_start = text.endswith("\n")
+            self._draw()
+        return len(text)
+    
+    def set_line(self, line: str):
+        """Replace the status line."""
+        with self._lock:
+            self.line = line
+            if self._shown:
+                self.stream.write("\r\x1b[K")
+                self._shown = False
+            self._draw()
+    
+    def _draw(self):
+        # Output that has not reached the end of its line is never interrupted
+        if self.line and self._at_line_start and not self._shown:
+            self.stream.write(self.line)
+            self.stream.flush()
+            self._shown = True
+    
+    def release(self):
+        """Move below the status line, leaving it on screen."""
+        with self._lock:
+            if self._shown:
+                self.stream.write("\n")
+                self._shown = False
+            self.stream.flush()
+    
+    def flush(self):
+        self.stream.flush()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+
+class ProgressTracker:
+    """
+    Tracks slides and decks completed, and estimates when they will be done.
+    
+    Throughput is measured over the most recent slides and decks, so the ETA
+    follows a run that speeds up or slows down. The state is written as JSON
+    to a status file, atomically and at most every ``min_interval`` seconds,
+    and can be shown as a live line in the terminal. A background thread
+    refreshes both while nothing happens, and a deck that makes no progress
+    for ``stall_after`` seconds is reported as stalled.
+    
+    One tracker can be shared by shards and scrapers in several threads.
+    """
+    
+    def __init__(self, status_path: Optional[str] = None, live: bool = False,
+                 window: int = 20, stall_after: float = 120.0, min_interval: float = 0.5,
+                 refresh_interval: float = 5.0, worker_id: Optional[str] = None):
+        """
+        Initialize the tracker.
+        
+        Args:
+            status_path: JSON file the progress is written to (optional)
+            live: Show a status line on the terminal; only drawn when stdout is a TTY
+            window: Slides the rolling throughput is measured over
+            stall_after: Seconds without progress after which a deck counts as stalled
+            min_interval: Minimum seconds between writes of the status file
+            refresh_interval: Seconds between refreshes while nothing happens
+            worker_id: Name of this worker in the status file (defaults to host:pid)
+        """
+        self.status_path = Path(status_path) if status_path else None
+        self.live = live
+        self.window = window
+        self.stall_after = stall_after
+        self.min_interval = min_interval
+        self.refresh_interval = refresh_interval
+        self.worker_id = worker_id or f"{socket.gethostname()}:{os.getpid()}"
+        
+        self._lock = threading.RLock()
+        self._decks: Dict[str, Dict] = {}
+        self._slides = 0
+        self._slide_rate = RollingRate(window)
+        self._deck_rate = RollingRate(max(2, window // 4))
+        self._batch_total: Optional[int] = None
+        self._batch_done = 0
+        self._external_batch = False
+        self._finished = 0
+        self._failed = 0
+        self._started_at = time.time()
+        self._last_progress = self._started_at
+        self._last_write = 0.0
+        
+        self._console: Optional[_LiveConsole] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    @classmethod
+    def from_config(cls, config) -> 'ProgressTracker':
+        """Create a tracker using the progress settings of a ScraperConfig."""
+        return cls(config.progress_file, live=config.live_progress,
+                   stall_after=config.stall_seconds)
+    
+    def start(self) -> 'ProgressTracker':
+        """Start the refresh thread and the live line. Calling start() again has no effect."""
+        if self._thread is not None:
+            return self
+        if self.live and sys.stdout.isatty():
+            self._console = _LiveConsole(sys.stdout)
+            sys.stdout = self._console
+        self._thread = threading.Thread(target=self._refresh_loop, name="progress", daemon=True)
+        self._thread.start()
+        return self
+    
+    def start_batch(self, total_decks: int, completed: int = 0):
+        """
+        Set the number of decks in the batch.
+        
+        Args:
+            total_decks: Decks in the batch
+            completed: Decks of the batch already done
+        """
+        with self._lock:
+            self._batch_total = total_decks
+            self._batch_done = completed
+            self._deck_rate.add(completed)
+        self._publish(force=True)
+    
+    def update_batch(self, total_decks: int, completed: int):
+        """
+        Report the progress of a batch shared with other workers, such as a work queue.
+        
+        The batch ETA then reflects every worker's throughput, not only this one's.
+        
+        Args:
+            total_decks: Decks in the batch
+            completed: Decks finished or given up by any worker
+        """
+        with self._lock:
+            self._external_batch = True
+            self._batch_total = total_decks
+            self._batch_done = completed
+            self._deck_rate.add(completed)
+        self._publish()
+    
+    def start_deck(self, deck_id: str, url: Optional[str] = None,
+                   total_frames: Optional[int] = None, frames_source: Optional[str] = None):
+        """
+        Start tracking a deck.
+        
+        Args:
+            deck_id: Deck identifier
+            url: URL of the deck (optional)
+            total_frames: Number of frames expected, if known
+            frames_source: Where total_frames came from, e.g. 'page' or 'shards'
+        """
+        now = time.time()
+        with self._lock:
+            self._decks[deck_id] = {
+                'url': url, 'total_frames': total_frames, 'frames_source': frames_source,
+                'captured': 0, 'started_at': now, 'last_progress_at': now,
+                'rate': RollingRate(self.window),
+            }
+            self._decks[deck_id]['rate'].add(0, now)
+            self._last_progress = now
+            self._slide_rate.add(self._slides, now)
+        self._publish(force=True)
+    
+    def set_total_frames(self, deck_id: str, total_frames: int, frames_source: Optional[str] = None):
+        """Set the number of frames expected once it is known."""
+        with self._lock:
+            deck = self._decks.get(deck_id)
+            if deck is not None:
+                deck['total_frames'] = total_frames
+                deck['frames_source'] = frames_source
+        self._publish()
+    
+    def slide_done(self, deck_id: str):
+        """Count a captured slide of a deck."""
+        now = time.time()
+        with self._lock:
+            deck = self._decks.get(deck_id)
+            if deck is not None:
+                deck['captured'] += 1
+                deck['last_progress_at'] = now
+                deck['rate'].add(deck['captured'], now)
+            self._slides += 1
+            self._last_progress = now
+            self._slide_rate.add(self._slides, now)
+        self._publish()
+    
+    def finish_deck(self, deck_id: str, error: Optional[str] = None):
+        """
+        Stop tracking a deck.
+        
+        Args:
+            deck_id: Deck identifier
+            error: Why the deck failed, if it did
+        """
+        now = time.time()
+        with self._lock:
+            deck = self._decks.pop(deck_id, None)
+            if error:
+                self._failed += 1
+            else:
+                self._finished += 1
+            if not self._external_batch:
+                self._batch_done += 1
+                self._deck_rate.add(self._batch_done, now)
+            self._last_progress = now
+        
+        if deck is not None and self._console is None and self.live:
+            # Without a terminal to redraw, log one line per deck instead
+            print(self.format_line())
+        self._publish(force=True)
+    
+    def snapshot(self, now: Optional[float] = None) -> Dict:
+        """
+        Get the current progress.
+        
+        Returns:
+            JSON-serializable dictionary with throughput, the batch and its
+            ETA, and each active deck with its progress, ETA and whether it stalled
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            slide_rate = self._slide_rate.per_second()
+            deck_rate = self._deck_rate.per_second()
+            
+            decks = {}
+            for deck_id, deck in self._decks.items():
+                total = deck['total_frames']
+                # Until a deck has its own rate, it gets its share of the overall one
+                rate = deck['rate'].per_second() or (slide_rate / len(self._decks) if slide_rate else None)
+                eta = None
+                if total is not None and rate:
+                    eta = round(max(0, total - deck['captured']) / rate, 1)
+                idle = now - deck['last_progress_at']
+                decks[deck_id] = {
+                    'url': deck['url'],
+                    'captured': deck['captured'],
+                    'total_frames': total,
+                    'frames_source': deck['frames_source'],
+                    'elapsed_seconds': round(now - deck['started_at'], 1),
+                    'seconds_since_progress': round(idle, 1),
+                    'eta_seconds': eta,
+                    'stalled': idle > self.stall_after,
+                }
+            
+            batch = None
+            if self._batch_total is not None:
+                remaining = max(0, self._batch_total - self._batch_done)
+                batch = {
+                    'total_decks': self._batch_total,
+                    'completed': self._batch_done,
+                    'eta_seconds': round(remaining / deck_rate, 1) if deck_rate else None,
+                }
+            
+            stalled = any(deck['stalled'] for deck in decks.values())
+            return {
+                'worker': self.worker_id,
+                'state': 'stalled' if stalled else ('running' if decks else 'idle'),
+                'started_at': self._started_at,
+                'updated_at': now,
+                'seconds_since_progress': round(now - self._last_progress, 1),
+                'slides_captured': self._slides,
+                'decks_finished': self._finished,
+                'decks_failed': self._failed,
+                'slides_per_minute': round(slide_rate * 60, 2) if slide_rate else None,
+                'decks_per_hour': round(deck_rate * 3600, 2) if deck_rate else None,
+                'batch': batch,
+                'decks': decks,
+            }
+    
+    def format_line(self, snapshot: Optional[Dict] = None) -> str:
+        """Render progress as a single line for the terminal."""
+        snapshot = snapshot or self.snapshot()
+        parts = []
+        batch = snapshot['batch']
+        if batch:
+            parts.append(f"decks {batch['completed']}/{batch['total_decks']}")
+        for deck_id, deck in snapshot['decks'].items():
+            total = deck['total_frames'] if deck['total_frames'] is not None else "?"
+            text = f"{deck_id} {deck['captured']}/{total}"
+            if deck['stalled']:
+                text += f" STALLED {deck['seconds_since_progress']:.0f}s"
+            elif deck['eta_seconds'] is not None:
+                text += f" eta {_format_seconds(deck['eta_seconds'])}"
+            parts.append(text)
+        if snapshot['slides_per_minute'] is not None:
+            parts.append(f"{snapshot['slides_per_minute']:.1f} slides/min")
+        if batch and batch['eta_seconds'] is not None:
+            parts.append(f"batch eta {_format_seconds(batch['eta_seconds'])}")
+        return " | ".join(parts) or "waiting"
+    
+    def close(self):
+        """Stop refreshing, write the final status and leave the live line on screen."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._publish(force=True)
+        if self._console is not None:
+            self._console.release()
+            if sys.stdout is self._console:
+                sys.stdout = self._console.stream
+            self._console = None
+    
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            self._publish(force=True)
+    
+    def _publish(self, force: bool = False):
+        """Write the status file and redraw the live line, at most every min_interval."""
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_write < self.min_interval:
+                return
+            self._last_write = now
+            snapshot = self.snapshot(now)
+            
+            if self.status_path is not None:
+                try:
+                    self.status_path.parent.mkdir(parents=True, exist_ok=True)
+                    atomic_write_json(self.status_path, snapshot)
+                except OSError as e:
+                    print(f"Warning: could not write progress to {self.status_path}: {e}")
+            if self._console is not None:
+                self._console.set_line(self.format_line(snapshot))
+
+
+def _format_seconds(seconds: float) -> str:
+    """Format a duration as H:MM:SS or M:SS."""
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
@@ -0,0 +1,263 @@
+"""Per-host token-bucket rate limiting shared across threads and processes."""
+
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Dict, Callable, TYPE_CHECKING
+from urllib.parse import urlparse
+
+if TYPE_CHECKING:
+    import sqlite3
+
+# sqlite3 is only imported when a state file is shared between processes.
+
+
+THROTTLE_STATUS_CODES = (429, 503)
+
+
+class BucketState:
+    """Mutable token-bucket state for one host."""
+    
+    __slots__ = ('tokens', 'updated', 'rate', 'blocked_until')
+    
+    def __init__(self, tokens: float, updated: float, rate: float, blocked_until: float = 0.0):
+        self.tokens = tokens
+        self.updated = updated
+        self.rate = rate
+        self.blocked_until = blocked_until
+
+
+class _MemoryBucketStore:
+    """Bucket store shared by the threads of one process."""
+    
+    def __init__(self):
+        self._buckets: Dict[str, BucketState] = {}
+        self._lock = threading.Lock()
+    
+    def transact(self, host: str, default: Callable[[], BucketState],
+                 fn: Callable[[BucketState], float]) -> float:
+        with self._lock:
+            state = self._buckets.get(host)
+            if state is None:
+                state = self._buckets[host] = default()
+            return fn(state)
+
+
+class _SqliteBucketStore:
+    """Bucket store shared by every process that opens the same state file."""
+    
+    def __init__(self, state_path: str):
+        self.state_path = Path(state_path)
+        self._local = threading.local()
+        self._connect().execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL,
+                rate REAL NOT NULL,
+                blocked_until REAL NOT NULL
+            )
+        """)
+    
+    def _connect(self) -> 'sqlite3.Connection':
+        import sqlite3
+        
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.state_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            self._local.conn = conn
+        return conn
+    
+    def transact(self, host: str, default: Callable[[], BucketState],
+                 fn: Callable[[BucketState], float]) -> float:
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT tokens, updated, rate, blocked_until FROM buckets WHERE host = ?",
+                (host,),
+            ).fetchone()
+            state = BucketState(*row) if row else default()
+            result = fn(state)
+            conn.execute(
+                "INSERT OR REPLACE INTO buckets (host, tokens, updated, rate, blocked_until) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (host, state.tokens, state.updated, state.rate, state.blocked_until),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return result
+
+
+class HostRateLimiter:
+    """
+    Adaptive token-bucket scheduler that limits requests per host.
+    
+    Rates follow additive-increase/multiplicative-decrease: every healthy
+    response nudges a host's rate up towards ``max_rate``, while throttling
+    responses (HTTP 429/503) and slow responses cut it back down. Passing a
+    ``state_path`` stores the buckets in SQLite so that all worker processes
+    sharing the file draw from the same per-host budget.
+    """
+    
+    def __init__(self, rate: float = 0.5, burst: int = 2, max_rate: Optional[float] = None,
+                 min_rate: float = 0.05, slow_threshold: float = 15.0,
+                 increase_step: float = 0.02, state_path: Optional[str] = None):
+        """
+        Initialize the rate limiter.
+        
+        Args:
+            rate: Initial requests per second allowed for each host
+            burst: Maximum number of tokens a host can accumulate
+            max_rate: Upper bound for the adaptive rate (defaults to four times ``rate``,
+                so healthy hosts can speed up from the starting rate)
+            min_rate: Lower bound for the adaptive rate
+            slow_threshold: Response time in seconds treated as back-pressure
+            increase_step: Requests per second added after a healthy response
+            state_path: SQLite file for sharing buckets across processes (optional)
+        """
+        self.initial_rate = rate
+        self.burst = max(1, burst)
+        self.max_rate = max_rate or rate * 4
+        if self.max_rate < rate:
+            raise ValueError(f"max_rate ({self.max_rate}) is below the starting rate ({rate})")
+        self.min_rate = min_rate
+        self.slow_threshold = slow_threshold
+        self.increase_step = increase_step
+        self._store = _SqliteBucketStore(state_path) if state_path else _MemoryBucketStore()
+        
+        self._metrics_lock = threading.Lock()
+        self._metrics: Dict[str, Dict[str, float]] = {}
+    
+    @classmethod
+    def from_config(cls, config, state_path: Optional[str] = None) -> 'HostRateLimiter':
+        """Create a rate limiter using the settings of a ScraperConfig."""
+        return cls(rate=config.host_rate, burst=config.host_burst, state_path=state_path)
+    
+    @staticmethod
+    def host_for(url_or_host: str) -> str:
+        """Get the host name used as the bucket key."""
+        if '://' in url_or_host:
+            url_or_host = urlparse(url_or_host).netloc
+        host = url_or_host.lower().split('@')[-1].split(':')[0]
+        return host[4:] if host.startswith('www.') else host
+    
+    def _new_bucket(self) -> BucketState:
+        return BucketState(float(self.burst), time.time(), self.initial_rate)
+    
+    def _record(self, host: str, **increments: float):
+        with self._metrics_lock:
+            metrics = self._metrics.setdefault(host, {
+                'requests': 0, 'wait_seconds': 0.0, 'throttled': 0, 'slow': 0,
+            })
+            for key, value in increments.items():
+                metrics[key] += value
+    
+    def acquire(self, url_or_host: str, cost: float = 1.0) -> float:
+        """
+        Block until a request to the host is allowed.
+        
+        Args:
+            url_or_host: URL or host name about to be requested
+            cost: Number of tokens the request consumes, at most ``burst``
+        
+        Returns:
+            Seconds spent waiting
+        """
+        host = self.host_for(url_or_host)
+        burst = float(self.burst)
+        if not 0 < cost <= burst:
+            # Tokens never accumulate beyond the burst, so a larger cost would wait forever
+            raise ValueError(f"Request cost {cost} must be above 0 and at most the burst ({self.burst})")
+        
+        def take(state: BucketState) -> float:
+            now = time.time()
+            state.tokens = min(burst, state.tokens + (now - state.updated) * state.rate)
+            state.updated = now
+            
+            if now < state.blocked_until:
+                return state.blocked_until - now
+            if state.tokens >= cost:
+                state.tokens -= cost
+                return 0.0
+            return (cost - state.tokens) / state.rate
+        
+        waited = 0.0
+        while True:
+            delay = self._store.transact(host, self._new_bucket, take)
+            if delay <= 0:
+                break
+            time.sleep(delay)
+            waited += delay
+        
+        self._record(host, requests=1, wait_seconds=waited)
+        return waited
+    
+    def report(self, url_or_host: str, status: Optional[int] = None,
+               elapsed: Optional[float] = None, retry_after: Optional[float] = None):
+        """
+        Feed the outcome of a request back into the host's rate.
+        
+        Args:
+            url_or_host: URL or host name that was requested
+            status: HTTP status code of the response (optional)
+            elapsed: Response time in seconds (optional)
+            retry_after: Value of a Retry-After header in seconds (optional)
+        """
+        host = self.host_for(url_or_host)
+        throttled = status in THROTTLE_STATUS_CODES
+        slow = elapsed is not None and elapsed > self.slow_threshold
+        
+        def adapt(state: BucketState) -> float:
+            now = time.time()
+            if throttled:
+                state.rate = max(self.min_rate, state.rate * 0.5)
+                state.tokens = 0.0
+                pause = retry_after if retry_after is not None else 1.0 / state.rate
+                state.blocked_until = max(state.blocked_until, now + pause)
+            elif slow:
+                state.rate = max(self.min_rate, state.rate * 0.8)
+            else:
+                state.rate = min(self.max_rate, state.rate + self.increase_step)
+            return state.rate
+        
+        rate = self._store.transact(host, self._new_bucket, adapt)
+        self._record(host, throttled=int(throttled), slow=int(slow))
+        
+        if throttled:
+            print(f"Throttled by {host} (HTTP {status}); slowing to {rate:.2f} req/s")
+    
+    def current_rate(self, url_or_host: str) -> float:
+        """Get the host's current adaptive rate in requests per second."""
+        return self._store.transact(self.host_for(url_or_host), self._new_bucket,
+                                    lambda state: state.rate)
+    
+    def metrics(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get per-host metrics recorded by this process.
+        
+        Returns:
+            Dictionary mapping host to request count, total wait time in
+            seconds, and the number of throttled and slow responses
+        """
+        with self._metrics_lock:
+            return {host: dict(values) for host, values in self._metrics.items()}
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header given in seconds.
+    
+    Args:
+        value: Raw header value
+    
+    Returns:
+        Delay in seconds, or None if missing or not numeric
+    """
+    try:
+        return max(0.0, float(value)) if value else None
+    except ValueError:
+        return None
@@ -0,0 +1,190 @@
+"""Downscaled renditions (web size, thumbnails) of captured slides."""
+
+import io
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future, wait
+from pathlib import Path
+from typing import Optional, List, Tuple, Dict, Iterable
+
+from .fileio import atomic_path
+
+# Pillow is imported inside the functions that decode and encode images.
+
+Rendition = Tuple[str, int]  # folder name, maximum width in pixels
+
+FORMAT_EXTENSIONS = {'jpeg': '.jpg', 'png': '.png', 'webp': '.webp'}
+
+
+def parse_rendition(spec: str) -> Rendition:
+    """
+    Parse a rendition given as ``NAME:WIDTH``.
+    
+    Args:
+        spec: Rendition specification, e.g. ``web:1280``
+    
+    Returns:
+        Tuple of (name, maximum width)
+    """
+    name, _, width = spec.strip().partition(':')
+    if not name or not width.isdigit() or int(width) <= 0:
+        raise ValueError(f"Invalid rendition {spec!r}, expected NAME:WIDTH such as web:1280")
+    if name in ('.', '..') or '/' in name or os.sep in name:
+        raise ValueError(f"Invalid rendition name {name!r}")
+    return name, int(width)
+
+
+def rendition_path(source_path: str, name: str, image_format: str = 'jpeg') -> Path:
+    """Path of a slide's rendition: a folder per rendition next to the slide."""
+    source = Path(source_path)
+    return source.parent / name / (source.stem + FORMAT_EXTENSIONS[image_format])
+
+
+def render_image(image, source_path: str, renditions: Iterable[Rendition],
+                 image_format: str = 'jpeg', quality: int = 85) -> List[Dict]:
+    """
+    Write the renditions of a decoded slide.
+    
+    Renditions are produced from largest to smallest, each resampled from the
+    previous one rather than from the full-size capture, so the full-resolution
+    pixels are only resampled once.
+    
+    Args:
+        image: PIL image of the slide
+        source_path: Path of the full-size slide
+        renditions: (name, maximum width) pairs
+        image_format: 'jpeg', 'png' or 'webp'
+        quality: Encoder quality for JPEG and WebP
+    
+    Returns:
+        One dictionary per rendition with its path, size and byte count
+    """
+    from PIL import Image
+    
+    current = image.convert('RGB') if image.mode not in ('RGB', 'L') else image
+    results = []
+    for name, width in sorted(renditions, key=lambda r: r[1], reverse=True):
+        if width < current.width:
+            height = max(1, round(current.height * width / current.width))
+            current = current.resize((width, height), Image.LANCZOS, reducing_gap=3.0)
+        
+        path = rendition_path(source_path, name, image_format)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        options = {'quality': quality, 'optimize': True} if image_format in ('jpeg', 'webp') else {}
+        with atomic_path(path) as temp_path:
+            current.save(temp_path, format=image_format.upper(), **options)
+        results.append({'name': name, 'path': str(path), 'size': current.size,
+                        'bytes': os.path.getsize(path)})
+    return results
+
+
+def render_slide(source_path: str, renditions: Iterable[Rendition], png: Optional[bytes] = None,
+                 image_format: str = 'jpeg', quality: int = 85) -> List[Dict]:
+    """
+    Decode a slide once and write its renditions.
+    
+    Args:
+        source_path: Path of the full-size slide
+        renditions: (name, maximum width) pairs
+        png: The slide's PNG data if still in memory; read from source_path otherwise
+        image_format: 'jpeg', 'png' or 'webp'
+        quality: Encoder quality for JPEG and WebP
+    
+    Returns:
+        One dictionary per rendition, see render_image()
+    """
+    from PIL import Image
+    
+    with Image.open(io.BytesIO(png) if png is not None else source_path) as image:
+        image.load()
+        return render_image(image, source_path, renditions, image_format, quality)
+
+
+class RenditionPool:
+    """
+    Writes slide renditions in worker threads while capture continues.
+    
+    Captures still in memory are handed over as PNG data, so each slide is
+    decoded once and never read back from disk. Pillow releases the GIL while
+    decoding, resampling and encoding, so threads run in parallel without
+    copying every capture into another process. At most two slides per
+    worker are held at a time; add() waits for the oldest beyond that.
+    """
+    
+    def __init__(self, renditions: Iterable[Rendition], workers: int = 2,
+                 image_format: str = 'jpeg', quality: int = 85):
+        """
+        Initialize the pool.
+        
+        Args:
+            renditions: (name, maximum width) pairs
+            workers: Worker threads
+            image_format: 'jpeg', 'png' or 'webp'
+            quality: Encoder quality for JPEG and WebP
+        """
+        if image_format not in FORMAT_EXTENSIONS:
+            raise ValueError(f"Unsupported rendition format {image_format!r}, "
+                             f"expected one of {sorted(FORMAT_EXTENSIONS)}")
+        self.renditions = list(renditions)
+        self.workers = max(1, workers)
+        self.image_format = image_format
+        self.quality = quality
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: List[Future] = []
+        self._lock = threading.Lock()
+        self.rendered = 0
+    
+    @classmethod
+    def from_config(cls, config) -> 'RenditionPool':
+        """Create a pool for the renditions of a ScraperConfig."""
+        return cls([parse_rendition(spec) for spec in config.renditions],
+                   workers=config.rendition_workers, image_format=config.rendition_format,
+                   quality=config.rendition_quality)
+    
+    def add(self, path: str, png: Optional[bytes] = None):
+        """
+        Queue a captured slide.
+        
+        Args:
+            path: Path of the full-size slide
+            png: The slide's PNG data, if still in memory (optional)
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers,
+                                                    thread_name_prefix="renditions")
+            future = self._executor.submit(render_slide, path, self.renditions, png,
+                                           self.image_format, self.quality)
+            self._futures.append(future)
+            pending = [f for f in self._futures if not f.done()]
+        
+        if len(pending) > 2 * self.workers:
+            wait(pending[:1])
+    
+    def flush(self) -> List[Dict]:
+        """
+        Wait for every queued slide.
+        
+        Returns:
+            Per-rendition results of all slides since the last flush
+        """
+        with self._lock:
+            futures, self._futures = self._futures, []
+        
+        results = []
+        for future in futures:
+            try:
+                results.extend(future.result())
+            except Exception as e:
+                print(f"Rendition failed: {e}")
+        self.rendered += len(futures)
+        if futures:
+            print(f"Rendered {len(futures)} slide(s) as {', '.join(n for n, _ in self.renditions)}")
+        return results
+    
+    def close(self):
+        """Flush and shut down the worker threads."""
+        self.flush()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,342 @@
+"""Long-running local scrape service that keeps browsers warm between requests."""
+
+import json
+import queue
+import socketserver
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Dict, Callable, Tuple
+
+from .policy import PhaseFailure
+
+
+class ScrapeService:
+    """
+    Runs scrape jobs on a pool of warm, supervised browsers.
+    
+    Jobs are submitted by URL and processed in the background. Finished
+    results are cached per URL for ``cache_ttl`` seconds, and submitting a
+    URL that is already queued or running returns the existing job.
+    """
+    
+    def __init__(self, scraper_factory: Callable[[int], object], workers: int = 2,
+                 cache_ttl: float = 3600.0, max_jobs: int = 1000):
+        """
+        Initialize the service.
+        
+        Args:
+            scraper_factory: Callable taking a worker index and returning a PreziScraper
+            workers: Number of browsers scraping in parallel
+            cache_ttl: Seconds a finished result is reused for the same URL
+            max_jobs: Number of finished jobs kept for status queries
+        """
+        self.scraper_factory = scraper_factory
+        self.worker_count = max(1, workers)
+        self.cache_ttl = cache_ttl
+        self.max_jobs = max_jobs
+        
+        self._jobs: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._active_by_url: Dict[str, str] = {}
+        self._cache: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._queue: 'queue.Queue[Optional[str]]' = queue.Queue()
+        self._threads = []
+        self.started_at = time.time()
+    
+    def start(self):
+        """Start the worker threads."""
+        for index in range(self.worker_count):
+            thread = threading.Thread(target=self._worker, args=(index,), daemon=True)
+            thread.start()
+            self._threads.append(thread)
+    
+    def stop(self):
+        """Stop the workers once their current jobs finish and close their browsers."""
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+    
+    def submit(self, url: str, force: bool = False) -> Dict:
+        """
+        Submit a URL for scraping.
+        
+        Args:
+            url: Prezi URL to scrape
+            force: Ignore any cached result and scrape again
+        
+        Returns:
+            Status dictionary of the (new, running or cached) job
+        """
+        now = time.time()
+        with self._lock:
+            if url in self._active_by_url:
+                return self._public(self._jobs[self._active_by_url[url]])
+            
+            cached = self._cache.get(url)
+            if cached and not force and now - cached['finished_at'] < self.cache_ttl:
+                job = self._new_job(url, now)
+                job.update(status='done', cached=True, result=cached['result'],
+                           started_at=now, finished_at=now)
+                return self._public(job)
+            
+            job = self._new_job(url, now)
+            self._active_by_url[url] = job['id']
+        
+        self._queue.put(job['id'])
+        return self._public(job)
+    
+    def get_job(self, job_id: str) -> Optional[Dict]:
+        """
+        Get the status of a job.
+        
+        Args:
+            job_id: ID returned by submit()
+        
+        Returns:
+            Status dictionary, or None if the job is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._public(job) if job else None
+    
+    def get_result(self, job_id: str) -> Optional[Dict]:
+        """
+        Get the result of a finished job.
+        
+        Args:
+            job_id: ID returned by submit()
+        
+        Returns:
+            Result dictionary, or None if the job is unknown or not done
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job['result'] if job and job['status'] == 'done' else None
+    
+    def stats(self) -> Dict:
+        """Get counts of jobs by status and service uptime."""
+        with self._lock:
+            counts: Dict[str, int] = {}
+            for job in self._jobs.values():
+                counts[job['status']] = counts.get(job['status'], 0) + 1
+            return {
+                'workers': self.worker_count,
+                'uptime_seconds': round(time.time() - self.started_at, 1),
+                'jobs': counts,
+                'cached_urls': len(self._cache),
+            }
+    
+    def _new_job(self, url: str, now: float) -> Dict:
+        """Register a new job (caller holds the lock)."""
+        job = {
+            'id': uuid.uuid4().hex[:12], 'url': url, 'status': 'queued', 'cached': False,
+            'submitted_at': now, 'started_at': None, 'finished_at': None,
+            'error': None, 'failure': None, 'result': None,
+        }
+        self._jobs[job['id']] = job
+        self._trim_jobs()
+        return job
+    
+    def _trim_jobs(self):
+        """Forget the oldest finished jobs beyond max_jobs (caller holds the lock)."""
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in list(self._jobs):
+            if excess <= 0:
+                break
+            if self._jobs[job_id]['status'] in ('done', 'failed'):
+                del self._jobs[job_id]
+                excess -= 1
+    
+    @staticmethod
+    def _public(job: Dict) -> Dict:
+        """Job status without the (potentially large) result payload."""
+        return {key: value for key, value in job.items() if key != 'result'}
+    
+    def _worker(self, index: int):
+        """Worker loop: one warm scraper per thread, started again if creating it failed."""
+        scraper, error = self._start_scraper(index)
+        try:
+            while True:
+                job_id = self._queue.get()
+                if job_id is None:
+                    return
+                if scraper is None:
+                    scraper, error = self._start_scraper(index)
+                if scraper is None:
+                    # Fail the job rather than leave it queued behind a worker without a browser
+                    self._finish_job(job_id, None, error)
+                    continue
+                self._run_job(scraper, job_id)
+        finally:
+            if scraper is not None:
+                scraper.close()
+    
+    def _start_scraper(self, index: int) -> Tuple[Optional[object], Optional[str]]:
+        """Create a worker's scraper and start its browser, returning it or the reason it could not."""
+        scraper = None
+        try:
+            scraper = self.scraper_factory(index)
+            # Start the browser now, so the worker's first job finds it warm
+            scraper.start_browser()
+            return scraper, None
+        except Exception as e:
+            if scraper is not None:
+                scraper.close()
+            error = f"could not start scraper: {type(e).__name__}: {e}"
+            print(f"Service worker {index} {error}")
+            return None, error
+    
+    def _run_job(self, scraper, job_id: str):
+        """Scrape one job and record its outcome."""
+        with self._lock:
+            job = self._jobs[job_id]
+            job.update(status='running', started_at=time.time())
+            url = job['url']
+        
+        failure = None
+        try:
+            result = scraper.scrape_prezi(url)
+            # Per-deck output already saved the links into the deck's folder
+            if result['youtube_links'] and 'deck_dir' not in result:
+                result['youtube_file'] = scraper.youtube_extractor.save_links_to_file()
+            error = None
+        except Exception as e:
+            result, error = None, f"{type(e).__name__}: {e}"
+            if isinstance(e, PhaseFailure):
+                failure = e.to_dict()
+            print(f"Service job {job_id} failed: {error}")
+        
+        self._finish_job(job_id, result, error, failure)
+    
+    def _finish_job(self, job_id: str, result: Optional[Dict], error: Optional[str],
+                    failure: Optional[Dict] = None):
+        """Record a job's outcome and cache its result."""
+        now = time.time()
+        with self._lock:
+            job = self._jobs[job_id]
+            url = job['url']
+            job.update(status='failed' if error else 'done', finished_at=now,
+                       result=result, error=error, failure=failure)
+            self._active_by_url.pop(url, None)
+            if result is not None:
+                self._cache[url] = {'finished_at': now, 'result': result}
+            
+            # Drop expired cache entries so the cache does not grow forever
+            for cached_url in [u for u, c in self._cache.items()
+                               if now - c['finished_at'] >= self.cache_ttl]:
+                del self._cache[cached_url]
+
+
+class _ServiceRequestHandler(BaseHTTPRequestHandler):
+    """JSON API: POST /jobs, GET /jobs/<id>, GET /jobs/<id>/result, GET /health."""
+    
+    service: ScrapeService = None
+    validate_url: Callable[[str], bool] = staticmethod(lambda url: True)
+    
+    def _send_json(self, status: int, payload: Dict):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        parts = [part for part in self.path.split('?')[0].split('/') if part]
+        
+        if parts == ['health']:
+            self._send_json(200, self.service.stats())
+        elif len(parts) == 2 and parts[0] == 'jobs':
+            job = self.service.get_job(parts[1])
+            if job is None:
+                self._send_json(404, {'error': 'unknown job'})
+            else:
+                self._send_json(200, job)
+        elif len(parts) == 3 and parts[0] == 'jobs' and parts[2] == 'result':
+            job = self.service.get_job(parts[1])
+            if job is None:
+                self._send_json(404, {'error': 'unknown job'})
+            elif job['status'] != 'done':
+                self._send_json(409, {'error': f"job is {job['status']}", 'job': job})
+            else:
+                self._send_json(200, self.service.get_result(parts[1]))
+        else:
+            self._send_json(404, {'error': 'not found'})
+    
+    def do_POST(self):
+        if self.path.split('?')[0].rstrip('/') != '/jobs':
+            self._send_json(404, {'error': 'not found'})
+            return
+        
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            url = payload['url']
+        except (ValueError, KeyError, TypeError):
+            self._send_json(400, {'error': 'expected JSON body with a "url" field'})
+            return
+        
+        if not self.validate_url(url):
+            self._send_json(400, {'error': f'invalid Prezi URL: {url}'})
+            return
+        
+        job = self.service.submit(url, force=bool(payload.get('force', False)))
+        self._send_json(202 if job['status'] in ('queued', 'running') else 200, job)
+    
+    def address_string(self) -> str:
+        # Unix socket clients have no address tuple
+        return self.client_address[0] if self.client_address else 'unix'
+    
+    def log_message(self, format, *args):
+        print(f"[service] {self.address_string()} {format % args}")
+
+
+class _UnixHTTPServer(socketserver.ThreadingUnixStreamServer):
+    """HTTP server listening on a Unix domain socket."""
+    
+    daemon_threads = True
+
+
+def serve(service: ScrapeService, host: str = '127.0.0.1', port: int = 8765,
+          socket_path: Optional[str] = None,
+          validate_url: Optional[Callable[[str], bool]] = None):
+    """
+    Run the service's HTTP API until interrupted.
+    
+    Args:
+        service: Service to expose
+        host: Interface to bind for TCP (ignored with socket_path)
+        port: TCP port to bind (ignored with socket_path)
+        socket_path: Unix domain socket path to listen on instead of TCP (optional)
+        validate_url: Check applied to submitted URLs (optional)
+    """
+    handler = type('ServiceRequestHandler', (_ServiceRequestHandler,), {
+        'service': service,
+        'validate_url': staticmethod(validate_url or (lambda url: True)),
+    })
+    
+    if socket_path:
+        Path(socket_path).unlink(missing_ok=True)
+        server = _UnixHTTPServer(socket_path, handler)
+        location = f"unix:{socket_path}"
+    else:
+        server = ThreadingHTTPServer((host, port), handler)
+        location = f"http://{host}:{server.server_address[1]}"
+    
+    service.start()
+    print(f"Scrape service listening on {location} with {service.worker_count} warm browser(s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down scrape service...")
+    finally:
+        server.server_close()
+        service.stop()
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
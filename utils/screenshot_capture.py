@@ -1,25 +1,122 @@
 """Screenshot capture utility for taking screenshots of web pages."""
 
+import io
+import struct
 import time
+import zlib
 from pathlib import Path
 from typing import Optional
 from datetime import datetime
 
-from selenium.webdriver.common.by import By
+from .fileio import atomic_path, atomic_write_bytes
+
+
+class StreamingPNGWriter:
+    """Writes an RGB PNG band by band so the full image is never held in memory."""
+    
+    SIGNATURE = b'\x89PNG\r\n\x1a\n'
+    
+    def __init__(self, file_obj, width: int, height: int, compress_level: int = 6):
+        """
+        Initialize the writer and emit the PNG header.
+        
+        Args:
+            file_obj: Binary file object to write to
+            width: Image width in pixels
+            height: Image height in pixels
+            compress_level: zlib compression level (0-9)
+        """
+        self.file = file_obj
+        self.width = width
+        self.height = height
+        self.rows_written = 0
+        self._compressor = zlib.compressobj(compress_level)
+        
+        self.file.write(self.SIGNATURE)
+        # Bit depth 8, colour type 2 (RGB), default compression/filter, no interlace
+        self._write_chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 2, 0, 0, 0))
+    
+    def _write_chunk(self, chunk_type: bytes, data: bytes):
+        """Write a single PNG chunk with its length and CRC."""
+        self.file.write(struct.pack('>I', len(data)))
+        self.file.write(chunk_type)
+        self.file.write(data)
+        self.file.write(struct.pack('>I', zlib.crc32(chunk_type + data) & 0xffffffff))
+    
+    def write_rows(self, rgb_bytes: bytes):
+        """
+        Append rows of raw RGB pixels.
+        
+        Args:
+            rgb_bytes: Pixel data for whole rows, 3 bytes per pixel
+        """
+        stride = self.width * 3
+        row_count = len(rgb_bytes) // stride
+        row_count = min(row_count, self.height - self.rows_written)
+        
+        # Each scanline is prefixed with filter type 0 (None)
+        view = memoryview(rgb_bytes)
+        scanlines = b''.join(
+            b'\x00' + view[row * stride:(row + 1) * stride] for row in range(row_count)
+        )
+        compressed = self._compressor.compress(scanlines)
+        if compressed:
+            self._write_chunk(b'IDAT', compressed)
+        self.rows_written += row_count
+    
+    def close(self):
+        """Pad any missing rows with white and finish the PNG stream."""
+        blank_row = b'\xff' * (self.width * 3)
+        while self.rows_written < self.height:
+            self.write_rows(blank_row)
+        
+        remaining = self._compressor.flush()
+        if remaining:
+            self._write_chunk(b'IDAT', remaining)
+        self._write_chunk(b'IEND', b'')
 
 
 class ScreenshotCapture:
     """Utility class for capturing screenshots."""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, tiled: bool = False, window_width: int = 1920,
+                 window_height: int = 1080, settle_delay: float = 1.0, timestamped: bool = True):
         """
         Initialize screenshot capture utility.
         
         Args:
             output_dir: Directory to save screenshots
+            tiled: Capture full pages in viewport-sized bands instead of one bitmap
+            window_width: Browser window width used for full-page captures
+            window_height: Minimum browser window height for full-page captures
+            settle_delay: Seconds to wait after resizing before capturing
+            timestamped: Add the capture time to file names; without it a new
+                capture replaces the previous one of the same name
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
+        self.tiled = tiled
+        self.window_width = window_width
+        self.window_height = window_height
+        self.settle_delay = settle_delay
+        self.timestamped = timestamped
+    
+    def screenshot_path(self, filename: str) -> Path:
+        """
+        Get the path a screenshot is saved to.
+        
+        Args:
+            filename: Base filename (without extension), optionally in a
+                subfolder such as ``deck_id/slide_001``
+            
+        Returns:
+            Path of the PNG file; its folder is created if needed
+        """
+        if self.timestamped:
+            filename = f"{filename}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        path = self.output_dir / f"{filename}.png"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
     
     def capture_full_page(self, driver, filename: str) -> Optional[str]:
         """
@@ -32,21 +129,18 @@ class ScreenshotCapture:
         Returns:
             Path to the saved screenshot or None if failed
         """
-        try:            # Get the full page height
-            total_height = driver.execute_script("return document.body.scrollHeight")
-            
-            # Set window size to capture full content
-            driver.set_window_size(1920, max(1080, total_height))
-            
-            # Wait a moment for any dynamic content to load
-            time.sleep(1)
+        if self.tiled:
+            return self.capture_tiled(driver, filename)
+        
+        try:
+            self._fit_window(driver)
             
             # Take screenshot
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_filename = f"{filename}_{timestamp}.png"
-            screenshot_path = self.output_dir / screenshot_filename
+            screenshot_path = self.screenshot_path(filename)
+            with atomic_path(screenshot_path) as temp_path:
+                saved = driver.save_screenshot(str(temp_path))
             
-            if driver.save_screenshot(str(screenshot_path)):
+            if saved:
                 print(f"Screenshot saved: {screenshot_path}")
                 return str(screenshot_path)
             else:
@@ -57,6 +151,106 @@ class ScreenshotCapture:
             print(f"Error capturing screenshot: {e}")
             return None
     
+    def capture_full_page_png(self, driver) -> Optional[bytes]:
+        """
+        Capture a full-page screenshot into memory instead of a file.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            
+        Returns:
+            PNG bytes or None if failed
+        """
+        try:
+            self._fit_window(driver)
+            return driver.get_screenshot_as_png()
+        except Exception as e:
+            print(f"Error capturing screenshot: {e}")
+            return None
+    
+    def save_png(self, png: bytes, filename: str) -> str:
+        """
+        Save PNG data captured into memory.
+        
+        Args:
+            png: PNG image data
+            filename: Base filename for the screenshot (without extension)
+            
+        Returns:
+            Path to the saved screenshot
+        """
+        screenshot_path = atomic_write_bytes(self.screenshot_path(filename), png)
+        print(f"Screenshot saved: {screenshot_path}")
+        return str(screenshot_path)
+    
+    def _fit_window(self, driver):
+        """Resize the window to the full page height and let the content settle."""
+        # Get the full page height
+        total_height = driver.execute_script("return document.body.scrollHeight")
+        
+        # Set window size to capture full content
+        driver.set_window_size(self.window_width, max(self.window_height, total_height))
+        
+        # Wait a moment for any dynamic content to load
+        time.sleep(self.settle_delay)
+    
+    def capture_tiled(self, driver, filename: str, settle_delay: float = 0.3) -> Optional[str]:
+        """
+        Capture a full-page screenshot by scrolling through viewport-sized bands.
+        
+        The browser window keeps its size and each band is decoded, cropped and
+        streamed into the output PNG before the next one is captured, so memory
+        use is bounded by one viewport regardless of page height.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            filename: Base filename for the screenshot (without extension)
+            settle_delay: Seconds to wait after each scroll
+            
+        Returns:
+            Path to the saved screenshot or None if failed
+        """
+        screenshot_path = self.screenshot_path(filename)
+        
+        try:
+            from PIL import Image
+            
+            total_height, viewport_height, ratio = driver.execute_script(
+                "return [Math.max(document.body.scrollHeight, document.documentElement.scrollHeight),"
+                " window.innerHeight, window.devicePixelRatio || 1];"
+            )
+            total_height = max(int(total_height), 1)
+            viewport_height = max(int(viewport_height), 1)
+            
+            writer = None
+            # The PNG only appears under its final name once every band is written
+            with atomic_path(screenshot_path) as temp_path, open(temp_path, 'wb') as f:
+                for top in range(0, total_height, viewport_height):
+                    driver.execute_script("window.scrollTo(0, arguments[0]);", top)
+                    time.sleep(settle_delay)
+                    scroll_y = driver.execute_script("return window.pageYOffset;") or 0
+                    
+                    band = Image.open(io.BytesIO(driver.get_screenshot_as_png())).convert('RGB')
+                    if writer is None:
+                        writer = StreamingPNGWriter(f, band.width, round(total_height * ratio))
+                    
+                    # The last scroll is clamped at the bottom, so skip rows already written
+                    offset = round((top - scroll_y) * ratio)
+                    rows = round(min(viewport_height, total_height - top) * ratio)
+                    band = band.crop((0, offset, writer.width, min(band.height, offset + rows)))
+                    writer.write_rows(band.tobytes())
+                    band.close()
+                
+                writer.close()
+            
+            driver.execute_script("window.scrollTo(0, 0);")
+            print(f"Tiled screenshot saved: {screenshot_path}")
+            return str(screenshot_path)
+            
+        except Exception as e:
+            print(f"Error capturing tiled screenshot: {e}")
+            return None
+    
     def capture_element(self, driver, element_selector: str, filename: str) -> Optional[str]:
         """
         Capture a screenshot of a specific element.
@@ -69,14 +263,16 @@ class ScreenshotCapture:
         Returns:
             Path to the saved screenshot or None if failed
         """
+        from selenium.webdriver.common.by import By
+        
         try:
             element = driver.find_element(By.CSS_SELECTOR, element_selector)
             
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_filename = f"{filename}_{timestamp}.png"
-            screenshot_path = self.output_dir / screenshot_filename
+            screenshot_path = self.screenshot_path(filename)
+            with atomic_path(screenshot_path) as temp_path:
+                saved = element.screenshot(str(temp_path))
             
-            if element.screenshot(str(screenshot_path)):
+            if saved:
                 print(f"Element screenshot saved: {screenshot_path}")
                 return str(screenshot_path)
             else:
@@ -99,11 +295,11 @@ class ScreenshotCapture:
             Path to the saved screenshot or None if failed
         """
         try:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            screenshot_filename = f"{filename}_{timestamp}.png"
-            screenshot_path = self.output_dir / screenshot_filename
+            screenshot_path = self.screenshot_path(filename)
+            with atomic_path(screenshot_path) as temp_path:
+                saved = driver.save_screenshot(str(temp_path))
             
-            if driver.save_screenshot(str(screenshot_path)):
+            if saved:
                 print(f"Viewport screenshot saved: {screenshot_path}")
                 return str(screenshot_path)
             else:
@@ -0,0 +1,346 @@
+"""Record live scraping sessions into an archive and replay them offline."""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+from .fileio import atomic_write_bytes, atomic_write_text
+
+
+INDEX_FILENAME = "index.json"
+
+# Body types whose absolute URLs are rewritten to point at the replay server
+TEXT_MIME_PATTERN = re.compile(r'text/|javascript|json|xml|svg', re.IGNORECASE)
+
+# Headers that no longer describe the body once it is served from the archive
+DROPPED_HEADERS = {
+    'content-encoding', 'content-length', 'transfer-encoding', 'connection',
+    'content-security-policy', 'strict-transport-security', 'alt-svc', 'location',
+}
+
+
+class SessionRecorder:
+    """
+    Captures the HTTP responses and navigation steps of scraping sessions.
+    
+    Responses are read from Chrome's performance log, which the driver
+    factory enables when recording, and their bodies are fetched over the
+    DevTools protocol. Bodies are stored once per content hash.
+    """
+    
+    def __init__(self, archive_dir: str):
+        """
+        Initialize the recorder, appending to an existing archive if present.
+        
+        Args:
+            archive_dir: Directory to write the archive to
+        """
+        self.archive_dir = Path(archive_dir)
+        self.bodies_dir = self.archive_dir / "bodies"
+        self.bodies_dir.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._pending: Dict[Tuple[int, str], Dict] = {}
+        self._warned_log = False
+        self._warned_bodies = False
+        
+        index_path = self.archive_dir / INDEX_FILENAME
+        if index_path.exists():
+            index = json.loads(index_path.read_text(encoding='utf-8'))
+        else:
+            index = {'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'), 'responses': [], 'steps': []}
+        self.created_at: str = index['created_at']
+        self.responses: List[Dict] = index['responses']
+        self.steps: List[Dict] = index['steps']
+    
+    def step(self, kind: str, **data):
+        """
+        Record a navigation step.
+        
+        Args:
+            kind: Step type, e.g. 'load', 'advance', 'click' or 'capture'
+            **data: Step details such as the URL or slide index
+        """
+        with self._lock:
+            self.steps.append({'kind': kind, 'at': round(time.time(), 3), **data})
+    
+    def collect(self, driver, entries: Optional[List[Dict]] = None) -> int:
+        """
+        Drain the driver's performance log and store new responses.
+        
+        Args:
+            driver: WebDriver started with performance logging enabled
+            entries: Log entries already drained by another consumer of the
+                log, such as ScrapeProfiler.collect_trace (optional)
+        
+        Returns:
+            Number of responses recorded
+        """
+        if entries is None:
+            try:
+                entries = driver.get_log('performance')
+            except Exception as e:
+                if not self._warned_log:
+                    self._warned_log = True
+                    print(f"Warning: performance log unavailable, responses not recorded: {e}")
+                return 0
+        
+        recorded = 0
+        for entry in entries:
+            try:
+                message = json.loads(entry['message'])['message']
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get('method'), message.get('params', {})
+            
+            if method == 'Network.requestWillBeSent' and params.get('redirectResponse'):
+                self._add_response(params['redirectResponse'], params['request'].get('method', 'GET'))
+                recorded += 1
+            elif method == 'Network.requestWillBeSent':
+                key = (id(driver), params.get('requestId'))
+                with self._lock:
+                    self._pending[key] = {'method': params['request'].get('method', 'GET')}
+            elif method == 'Network.responseReceived':
+                key = (id(driver), params.get('requestId'))
+                with self._lock:
+                    self._pending.setdefault(key, {'method': 'GET'})['response'] = params['response']
+            elif method == 'Network.loadingFinished':
+                key = (id(driver), params.get('requestId'))
+                with self._lock:
+                    pending = self._pending.pop(key, None)
+                if pending and 'response' in pending:
+                    body = self._fetch_body(driver, params['requestId'])
+                    self._add_response(pending['response'], pending['method'], body)
+                    recorded += 1
+        return recorded
+    
+    def _fetch_body(self, driver, request_id: str) -> Optional[bytes]:
+        """Get a response body over the DevTools protocol."""
+        try:
+            result = driver.execute_cdp_cmd('Network.getResponseBody', {'requestId': request_id})
+        except Exception as e:
+            if not self._warned_bodies:
+                self._warned_bodies = True
+                print(f"Warning: response bodies unavailable, recording headers only: {e}")
+            return None
+        if result.get('base64Encoded'):
+            return base64.b64decode(result['body'])
+        return result['body'].encode('utf-8')
+    
+    def _add_response(self, response: Dict, method: str, body: Optional[bytes] = None):
+        """Store one response and its body."""
+        record = {
+            'method': method,
+            'url': response['url'].split('#')[0],
+            'status': response.get('status', 200),
+            'mime_type': response.get('mimeType', ''),
+            'headers': response.get('headers', {}),
+            'elapsed_ms': round((response.get('timing') or {}).get('receiveHeadersEnd', 0), 1),
+            'body': None,
+        }
+        if body is not None:
+            digest = hashlib.sha1(body).hexdigest()
+            body_path = self.bodies_dir / digest
+            # Written atomically, so a body of the wrong size was cut short by
+            # an older recorder and is replaced
+            if not body_path.exists() or body_path.stat().st_size != len(body):
+                atomic_write_bytes(body_path, body)
+            record['body'] = digest
+        
+        with self._lock:
+            self.responses.append(record)
+    
+    def save(self):
+        """Write the archive index."""
+        with self._lock:
+            data = json.dumps({
+                'created_at': self.created_at,
+                'responses': self.responses,
+                'steps': self.steps,
+            }, indent=1)
+        
+        atomic_write_text(self.archive_dir / INDEX_FILENAME, data)
+
+
+class ReplayServer:
+    """
+    Serves a recorded archive over local HTTP.
+    
+    Every recorded URL is served at ``/<host>/<path>``, and absolute URLs to
+    recorded hosts inside text bodies are rewritten to match, so a browser
+    pointed at resolve(url) never leaves the machine. Root-relative requests
+    (``/static/app.js``) go to the host of the page that made them. Requests
+    missing from the archive get a 404 and are counted in ``misses``.
+    """
+    
+    def __init__(self, archive_dir: str, host: str = '127.0.0.1', port: int = 0,
+                 simulate_latency: bool = False):
+        """
+        Initialize the server.
+        
+        Args:
+            archive_dir: Directory written by SessionRecorder
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            simulate_latency: Delay each response by its recorded time to first byte
+        """
+        self.archive_dir = Path(archive_dir)
+        index = json.loads((self.archive_dir / INDEX_FILENAME).read_text(encoding='utf-8'))
+        self.steps: List[Dict] = index['steps']
+        self.simulate_latency = simulate_latency
+        self.misses: List[str] = []
+        
+        # Later recordings of the same URL win, as they reflect the latest state
+        self._exact: Dict[Tuple[str, str, str], Dict] = {}
+        self._by_path: Dict[Tuple[str, str], Dict] = {}
+        for record in index['responses']:
+            parts = urlsplit(record['url'])
+            target = parts.path + (f"?{parts.query}" if parts.query else "")
+            self._exact[(record['method'], parts.netloc, target)] = record
+            self._by_path[(parts.netloc, parts.path)] = record
+        self.hosts = sorted({netloc for netloc, _ in self._by_path}, key=len, reverse=True)
+        self._host_set = set(self.hosts)
+        
+        handler = type('ReplayRequestHandler', (_ReplayRequestHandler,), {'replay': self})
+        self._server = ThreadingHTTPServer((host, port), handler)
+        self.base_url = f"http://{host}:{self._server.server_address[1]}"
+        self._thread: Optional[threading.Thread] = None
+        
+        pattern = '|'.join(re.escape(h) for h in self.hosts) or r'(?!)'
+        self._url_pattern = re.compile(r'(?:https?:)?(//|\\/\\/)(' + pattern + r')(?=[/\\"\'?#:\s)]|$)')
+    
+    def start(self) -> 'ReplayServer':
+        """Serve the archive in a background thread."""
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        print(f"Replaying {self.archive_dir} on {self.base_url}")
+        return self
+    
+    def stop(self):
+        """Stop serving."""
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def __enter__(self) -> 'ReplayServer':
+        return self.start()
+    
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+    
+    def resolve(self, url: str) -> str:
+        """
+        Map a live URL to its address on the replay server.
+        
+        Args:
+            url: Original URL
+        
+        Returns:
+            URL on the replay server
+        """
+        parts = urlsplit(url)
+        query = f"?{parts.query}" if parts.query else ""
+        return f"{self.base_url}/{parts.netloc}{parts.path or '/'}{query}"
+    
+    def route(self, path: str, referer: Optional[str] = None) -> Tuple[str, str]:
+        """
+        Split a request path on the replay server into a recorded host and target.
+        
+        A path whose first segment is not a recorded host was requested
+        root-relative by a replayed page, so it belongs to the host in the
+        Referer, which is itself served at ``/<host>/<path>``.
+        
+        Args:
+            path: Request path, e.g. ``/prezi.com/p/abc/`` or ``/static/app.js``
+            referer: Value of the request's Referer header (optional)
+        
+        Returns:
+            Host and target (path with query) of the original URL
+        """
+        netloc, _, rest = path.lstrip('/').partition('/')
+        if netloc not in self._host_set and referer:
+            referer_host = urlsplit(referer).path.lstrip('/').partition('/')[0]
+            if referer_host in self._host_set:
+                return referer_host, path
+        return netloc, '/' + rest
+    
+    def lookup(self, method: str, netloc: str, target: str) -> Optional[Dict]:
+        """Find the recorded response for a request, ignoring the query string as a fallback."""
+        record = self._exact.get((method, netloc, target))
+        if record is None:
+            record = self._by_path.get((netloc, target.split('?')[0]))
+        return record
+    
+    def rewrite(self, body: bytes) -> bytes:
+        """Point absolute URLs to recorded hosts at the replay server."""
+        def replace(match):
+            if match.group(1) == '//':
+                return f"{self.base_url}/{match.group(2)}"
+            return f"{self.base_url}/{match.group(2)}".replace('/', '\\/')
+        
+        text = body.decode('utf-8', errors='surrogateescape')
+        return self._url_pattern.sub(replace, text).encode('utf-8', errors='surrogateescape')
+    
+    def body_for(self, record: Dict) -> bytes:
+        """Get the (rewritten) body of a recorded response."""
+        if not record['body']:
+            return b""
+        body = (self.archive_dir / "bodies" / record['body']).read_bytes()
+        if TEXT_MIME_PATTERN.search(record['mime_type'] or ''):
+            body = self.rewrite(body)
+        return body
+
+
+class _ReplayRequestHandler(BaseHTTPRequestHandler):
+    """Serves recorded responses by host and path."""
+    
+    replay: ReplayServer = None
+    
+    def _serve(self, send_body: bool):
+        netloc, target = self.replay.route(self.path, self.headers.get('Referer'))
+        method = 'GET' if self.command == 'HEAD' else self.command
+        record = self.replay.lookup(method, netloc, target)
+        
+        if record is None:
+            self.replay.misses.append(f"{self.command} {netloc}{target}")
+            self.send_error(404, "Not in archive")
+            return
+        
+        if self.replay.simulate_latency and record.get('elapsed_ms'):
+            time.sleep(record['elapsed_ms'] / 1000)
+        
+        body = self.replay.body_for(record)
+        self.send_response(record['status'])
+        for name, value in record['headers'].items():
+            if name.lower() not in DROPPED_HEADERS:
+                for line in str(value).split('\n'):
+                    self.send_header(name, line)
+        location = {k.lower(): v for k, v in record['headers'].items()}.get('location')
+        if location:
+            if location.startswith('/') and not location.startswith('//'):
+                # Host-relative redirects stay on the original host
+                location = f"/{netloc}{location}"
+            self.send_header('Location', self.replay.rewrite(location.encode('utf-8')).decode('utf-8'))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+    
+    def do_GET(self):
+        self._serve(send_body=True)
+    
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self._serve(send_body=True)
+    
+    def do_HEAD(self):
+        self._serve(send_body=False)
+    
+    def log_message(self, format, *args):
+        pass
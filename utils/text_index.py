@@ -0,0 +1,193 @@
+"""Full-text search index of the visible text of captured slides."""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Optional, List, Dict, Iterable
+
+
+# Collects the text of visible text nodes inside the viewport, in document
+# order, so each frame only contributes what is on screen when it is captured
+VISIBLE_TEXT_SCRIPT = """
+const width = window.innerWidth, height = window.innerHeight;
+const walker = document.createTreeWalker(document.body || document.documentElement,
+                                         NodeFilter.SHOW_TEXT);
+const parts = [];
+const range = document.createRange();
+let node;
+while ((node = walker.nextNode())) {
+    const text = node.textContent.trim();
+    if (!text) continue;
+    const element = node.parentElement;
+    if (!element || element.closest('script, style, noscript, template')) continue;
+    const style = getComputedStyle(element);
+    if (style.visibility === 'hidden' || style.display === 'none' || style.opacity === '0') continue;
+    range.selectNodeContents(node);
+    const visible = Array.from(range.getClientRects()).some(r =>
+        r.width > 0 && r.height > 0 && r.bottom > 0 && r.right > 0 && r.top < height && r.left < width);
+    if (visible) parts.push(text);
+}
+return parts.join('\\n');
+"""
+
+
+class SlideTextIndex:
+    """
+    SQLite FTS5 index of slide text, searchable across every archived deck.
+    
+    Each slide is stored with its deck's title, frame index, screenshot path
+    and the YouTube links found with it; the title, text and links are
+    indexed for full-text search. Re-indexing a deck replaces its slides.
+    Connections are per thread, so parallel shards and workers can share one
+    index file.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the index.
+        
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        
+        conn = self._connect()
+        try:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS decks (
+                    deck_id TEXT PRIMARY KEY,
+                    url TEXT,
+                    title TEXT,
+                    youtube_links TEXT NOT NULL DEFAULT '',
+                    indexed_at REAL NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS slides (
+                    id INTEGER PRIMARY KEY,
+                    deck_id TEXT NOT NULL,
+                    frame_index INTEGER NOT NULL,
+                    screenshot_path TEXT,
+                    text TEXT NOT NULL DEFAULT '',
+                    youtube_links TEXT NOT NULL DEFAULT '',
+                    UNIQUE (deck_id, frame_index)
+                );
+                CREATE VIRTUAL TABLE IF NOT EXISTS slide_fts USING fts5(
+                    title, text, youtube_links,
+                    tokenize = 'porter unicode61 remove_diacritics 2'
+                );
+            """)
+        except sqlite3.OperationalError as e:
+            raise RuntimeError(
+                f"Slide text search needs SQLite with FTS5 (found SQLite {sqlite3.sqlite_version}): {e}"
+            ) from e
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection for the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+        return conn
+    
+    def add_deck(self, deck_id: str, title: str, slides: Iterable[Dict],
+                 url: Optional[str] = None, youtube_links: Iterable[str] = ()) -> int:
+        """
+        Index a deck's slides, replacing any earlier version of the deck.
+        
+        Args:
+            deck_id: Deck identifier
+            title: Presentation title
+            slides: Dictionaries with 'index', 'text', 'path' and optionally
+                'youtube_links' (links first found on that slide)
+            url: URL of the deck (optional)
+            youtube_links: All YouTube links of the deck
+        
+        Returns:
+            Number of slides indexed
+        """
+        deck_links = "\n".join(sorted(youtube_links))
+        count = 0
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                "DELETE FROM slide_fts WHERE rowid IN (SELECT id FROM slides WHERE deck_id = ?)",
+                (deck_id,),
+            )
+            conn.execute("DELETE FROM slides WHERE deck_id = ?", (deck_id,))
+            conn.execute(
+                "INSERT OR REPLACE INTO decks (deck_id, url, title, youtube_links, indexed_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (deck_id, url, title, deck_links, time.time()),
+            )
+            for slide in sorted(slides, key=lambda s: s['index']):
+                links = "\n".join(sorted(slide.get('youtube_links') or ()))
+                cursor = conn.execute(
+                    "INSERT INTO slides (deck_id, frame_index, screenshot_path, text, youtube_links) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (deck_id, slide['index'], slide.get('path'), slide.get('text') or '', links),
+                )
+                conn.execute(
+                    "INSERT INTO slide_fts (rowid, title, text, youtube_links) VALUES (?, ?, ?, ?)",
+                    (cursor.lastrowid, title, slide.get('text') or '', links),
+                )
+                count += 1
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return count
+    
+    def search(self, query: str, limit: int = 20) -> List[Dict]:
+        """
+        Find slides matching a full-text query.
+        
+        Args:
+            query: FTS5 query, e.g. ``climate AND policy`` or ``"sea level"``;
+                text that is not valid query syntax is searched as plain words
+            limit: Maximum number of slides returned
+        
+        Returns:
+            Best matches first, as dictionaries with the deck ID, URL and title,
+            frame index, screenshot path, YouTube links and a text snippet
+        """
+        sql = """
+            SELECT s.deck_id, d.url, d.title, s.frame_index, s.screenshot_path,
+                   s.youtube_links, d.youtube_links,
+                   snippet(slide_fts, 1, '[', ']', '...', 12)
+            FROM slide_fts
+            JOIN slides s ON s.id = slide_fts.rowid
+            JOIN decks d ON d.deck_id = s.deck_id
+            WHERE slide_fts MATCH ?
+            ORDER BY bm25(slide_fts, 5.0, 1.0, 1.0)
+            LIMIT ?
+        """
+        conn = self._connect()
+        try:
+            rows = conn.execute(sql, (query, limit)).fetchall()
+        except sqlite3.OperationalError:
+            # Punctuation such as "covid-19" is query syntax; match the words literally
+            quoted = " ".join('"' + term.replace('"', '""') + '"' for term in query.split())
+            rows = conn.execute(sql, (quoted, limit)).fetchall() if quoted else []
+        
+        return [{
+            'deck_id': deck_id,
+            'url': url,
+            'title': title,
+            'frame_index': frame_index,
+            'screenshot_path': path,
+            'youtube_links': [link for link in slide_links.split("\n") if link],
+            'deck_youtube_links': [link for link in deck_links.split("\n") if link],
+            'snippet': snippet,
+        } for deck_id, url, title, frame_index, path, slide_links, deck_links, snippet in rows]
+    
+    def stats(self) -> Dict[str, int]:
+        """Get the number of decks and slides in the index."""
+        conn = self._connect()
+        return {
+            'decks': conn.execute("SELECT COUNT(*) FROM decks").fetchone()[0],
+            'slides': conn.execute("SELECT COUNT(*) FROM slides").fetchone()[0],
+        }
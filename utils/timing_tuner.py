@@ -0,0 +1,245 @@
+"""Adaptive wait-time tuning learned from observed load and transition times."""
+
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Optional, Dict, List, Deque
+
+from .fileio import atomic_write_text, file_lock
+
+
+# Reports whether the page is still moving: the number of running animations
+# and transitions, images still loading, and a hash of the element count and
+# the computed transforms in the viewer, which change during CSS zooms that
+# neither add elements nor load images
+SETTLE_SCRIPT = """
+var running = document.getAnimations ? document.getAnimations().filter(function (animation) {
+    return animation.playState === 'running';
+}).length : 0;
+var images = document.images, loading = 0;
+for (var i = 0; i < images.length; i++) { if (!images[i].complete) loading++; }
+var viewer = document.querySelector('.presentation-viewer') || document.body;
+var elements = viewer.getElementsByTagName('*'), hash = elements.length;
+for (var j = 0; j < Math.min(elements.length, 300); j++) {
+    var transform = getComputedStyle(elements[j]).transform;
+    if (transform === 'none') continue;
+    for (var k = 0; k < transform.length; k++) hash = (hash * 31 + transform.charCodeAt(k)) | 0;
+}
+return [running, loading, hash];
+"""
+
+
+class TimingTuner:
+    """
+    Learns how long decks and hosts actually take to load and settle.
+    
+    Observed durations are kept per phase (e.g. 'load', 'render',
+    'transition') for each host and each deck. The recommended wait for a
+    phase is the 90th percentile of recent observations times a safety
+    margin, clamped between a minimum and the configured worst case. Deck
+    profiles are preferred over host profiles once they have enough samples.
+    
+    Only the most recently updated deck profiles are kept, and ones not
+    updated for a while expire. Workers sharing a profile file merge their
+    new observations into it under a lock, so they do not overwrite each
+    other's profiles.
+    """
+    
+    def __init__(self, profile_path: Optional[str] = None, min_wait: float = 0.5,
+                 margin: float = 1.25, min_samples: int = 3, max_samples: int = 20,
+                 max_decks: int = 1000, max_age: float = 30 * 86400, save_interval: float = 30.0):
+        """
+        Initialize the tuner.
+        
+        Args:
+            profile_path: JSON file to load and persist learned profiles (optional)
+            min_wait: Lower bound for any recommended wait in seconds
+            margin: Multiplier applied to the observed 90th percentile
+            min_samples: Observations required before a deck or host profile is used
+            max_samples: Recent observations kept per phase and profile
+            max_decks: Deck profiles kept; the least recently updated are dropped
+            max_age: Seconds after which a deck profile that was not updated expires
+            save_interval: Minimum seconds between writes of the profile file
+        """
+        self.profile_path = Path(profile_path) if profile_path else None
+        self.min_wait = min_wait
+        self.margin = margin
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.max_decks = max_decks
+        self.max_age = max_age
+        self.save_interval = save_interval
+        self._lock = threading.Lock()
+        self._profiles: Dict[str, Dict[str, Deque[float]]] = {}
+        self._updated: Dict[str, float] = {}
+        # Observations not yet merged into the profile file
+        self._pending: Dict[str, Dict[str, List[float]]] = {}
+        self._last_save: Optional[float] = None
+        
+        if self.profile_path:
+            self._load(self._read())
+    
+    @classmethod
+    def from_config(cls, config) -> 'TimingTuner':
+        """Create a tuner using the profile file and bounds of a ScraperConfig."""
+        return cls(config.timing_profile, min_wait=config.min_wait)
+    
+    @staticmethod
+    def _keys(host: str, deck_id: Optional[str]) -> List[str]:
+        keys = [f"host:{host}"]
+        if deck_id:
+            keys.insert(0, f"deck:{deck_id}")
+        return keys
+    
+    def record(self, phase: str, seconds: float, host: str, deck_id: Optional[str] = None):
+        """
+        Record an observed duration.
+        
+        Args:
+            phase: Phase name, e.g. 'load', 'render' or 'transition'
+            seconds: Observed duration
+            host: Host the deck was served from
+            deck_id: Deck identifier (optional)
+        """
+        seconds = round(seconds, 3)
+        now = time.time()
+        with self._lock:
+            for key in self._keys(host, deck_id):
+                added = key not in self._profiles
+                self._add(key, phase, [seconds])
+                self._pending.setdefault(key, {}).setdefault(phase, []).append(seconds)
+                self._updated[key] = now
+                if added:
+                    self._expire()
+    
+    def recommend(self, phase: str, default: float, host: str,
+                  deck_id: Optional[str] = None) -> float:
+        """
+        Get the wait to use for a phase.
+        
+        Args:
+            phase: Phase name
+            default: Configured worst-case wait, also the upper bound
+            host: Host the deck is served from
+            deck_id: Deck identifier (optional)
+        
+        Returns:
+            Recommended wait in seconds
+        """
+        with self._lock:
+            samples = None
+            for key in self._keys(host, deck_id):
+                candidate = self._profiles.get(key, {}).get(phase, ())
+                if len(candidate) >= self.min_samples:
+                    samples = sorted(candidate)
+                    break
+        
+        if not samples:
+            return default
+        
+        p90 = samples[min(len(samples) - 1, int(0.9 * len(samples)))]
+        return max(self.min_wait, min(default, p90 * self.margin))
+    
+    def save(self, force: bool = False):
+        """
+        Merge new observations into the profile file, if one is configured.
+        
+        The file is re-read under a lock and the observations made since the
+        last save are added to it, so profiles learned by other workers are
+        kept. Writes happen at most every save_interval seconds unless forced.
+        
+        Args:
+            force: Write now even if the last write was recent
+        """
+        if not self.profile_path:
+            return
+        
+        with self._lock:
+            if not self._pending:
+                return
+            if (not force and self._last_save is not None
+                    and time.monotonic() - self._last_save < self.save_interval):
+                return
+            pending, self._pending = self._pending, {}
+            updated = dict(self._updated)
+            self._last_save = time.monotonic()
+        
+        try:
+            self.profile_path.parent.mkdir(parents=True, exist_ok=True)
+            with file_lock(self.profile_path):
+                merged = self._read()
+                for key, phases in pending.items():
+                    entry = merged.setdefault(key, {'updated': 0.0, 'phases': {}})
+                    entry['updated'] = max(entry['updated'], updated.get(key, 0.0))
+                    for phase, samples in phases.items():
+                        entry['phases'][phase] = entry['phases'].get(phase, []) + samples
+                
+                with self._lock:
+                    self._load(merged)
+                    data = json.dumps({key: {'updated': self._updated.get(key, 0.0),
+                                             'phases': {phase: list(samples)
+                                                        for phase, samples in phases.items()}}
+                                       for key, phases in self._profiles.items()},
+                                      indent=2, sort_keys=True)
+                atomic_write_text(self.profile_path, data)
+        except (OSError, TimeoutError) as e:
+            print(f"Warning: could not save timing profile {self.profile_path}: {e}")
+            with self._lock:
+                for key, phases in pending.items():
+                    for phase, samples in phases.items():
+                        self._pending.setdefault(key, {}).setdefault(phase, [])[:0] = samples
+    
+    def _add(self, key: str, phase: str, samples: List[float]):
+        """Append observations to a profile, keeping only the most recent ones."""
+        profile = self._profiles.setdefault(key, {})
+        if phase not in profile:
+            profile[phase] = deque(maxlen=self.max_samples)
+        profile[phase].extend(samples)
+    
+    def _load(self, data: Dict[str, Dict]):
+        """Replace the profiles with ones read from the file, keeping unsaved observations."""
+        self._profiles = {}
+        for key, entry in data.items():
+            self._updated[key] = max(self._updated.get(key, 0.0), entry['updated'])
+            for phase, samples in entry['phases'].items():
+                self._add(key, phase, samples)
+        for key, phases in self._pending.items():
+            for phase, samples in phases.items():
+                self._add(key, phase, samples)
+        self._expire()
+    
+    def _expire(self):
+        """Drop deck profiles that are too old or beyond the number kept."""
+        now = time.time()
+        decks = sorted((key for key in self._profiles if key.startswith('deck:')),
+                       key=lambda key: self._updated.get(key, 0.0))
+        expired = [key for key in decks if now - self._updated.get(key, 0.0) > self.max_age]
+        kept = len(decks) - len(expired)
+        if kept > self.max_decks:
+            expired += [key for key in decks if key not in expired][:kept - self.max_decks]
+        for key in expired:
+            self._profiles.pop(key, None)
+            self._updated.pop(key, None)
+            self._pending.pop(key, None)
+    
+    def _read(self) -> Dict[str, Dict]:
+        """Read the profile file as ``{key: {'updated': ..., 'phases': {...}}}``."""
+        if not self.profile_path.exists():
+            return {}
+        try:
+            data = json.loads(self.profile_path.read_text(encoding='utf-8'))
+        except (OSError, ValueError) as e:
+            print(f"Warning: could not read timing profile {self.profile_path}: {e}")
+            return {}
+        
+        profiles = {}
+        for key, entry in data.items():
+            if 'phases' not in entry:
+                # Written before profiles had an update time; count it as fresh
+                entry = {'updated': time.time(), 'phases': entry}
+            profiles[key] = {'updated': float(entry.get('updated', 0.0)),
+                             'phases': {phase: list(samples)
+                                        for phase, samples in entry['phases'].items()}}
+        return profiles
@@ -0,0 +1,363 @@
+"""SQLite-backed work queue for distributing Prezi URLs across workers."""
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Optional, Dict, List, Iterable
+
+from .policy import backoff_delay
+
+
+STATUS_PENDING = "pending"
+STATUS_LEASED = "leased"
+STATUS_DONE = "done"
+STATUS_DEAD = "dead"
+
+
+class Job:
+    """A job leased from the work queue."""
+    
+    __slots__ = ('id', 'url', 'attempts', 'worker_id')
+    
+    def __init__(self, job_id: int, url: str, attempts: int, worker_id: str):
+        """
+        Initialize a leased job.
+        
+        Args:
+            job_id: Database ID of the job
+            url: Prezi URL to scrape
+            attempts: Number of attempts including the current one
+            worker_id: ID of the worker holding the lease
+        """
+        self.id = job_id
+        self.url = url
+        self.attempts = attempts
+        self.worker_id = worker_id
+    
+    def __repr__(self) -> str:
+        return f"Job(id={self.id}, url={self.url!r}, attempts={self.attempts})"
+
+
+class WorkQueue:
+    """Durable job queue with worker leases, retries and dead-lettering."""
+    
+    def __init__(self, db_path: str, max_attempts: int = 3, retry_backoff: float = 30.0,
+                 lease_seconds: float = 300.0):
+        """
+        Initialize the work queue.
+        
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+            max_attempts: Attempts before a job is dead-lettered
+            retry_backoff: Base delay in seconds, doubled after each failed attempt
+                and jittered so jobs that failed together are not retried together
+            lease_seconds: How long a lease lasts without a heartbeat
+        """
+        self.db_path = Path(db_path)
+        self.max_attempts = max(1, max_attempts)
+        self.retry_backoff = retry_backoff
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+        self._create_schema()
+    
+    @classmethod
+    def from_config(cls, db_path: str, config) -> 'WorkQueue':
+        """Create a queue using retry settings from a ScraperConfig."""
+        return cls(
+            db_path,
+            max_attempts=config.retry_attempts,
+            retry_backoff=config.retry_backoff,
+            lease_seconds=config.lease_seconds,
+        )
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection for the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA busy_timeout = 30000")
+            # WAL lets readers proceed while a worker holds the write lock.
+            # It requires a local filesystem; on network shares the default
+            # rollback journal is used instead.
+            if os.getenv('PREZI_QUEUE_NO_WAL', 'false').lower() != 'true':
+                conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+        return conn
+    
+    def _create_schema(self):
+        """Create the jobs table if it does not exist."""
+        self._connect().executescript("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                url TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                available_at REAL NOT NULL,
+                lease_owner TEXT,
+                lease_expires REAL,
+                last_error TEXT,
+                result TEXT,
+                created_at REAL NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_jobs_ready
+                ON jobs (status, available_at);
+        """)
+    
+    def close(self):
+        """Close the connection for the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+    
+    def enqueue(self, urls: Iterable[str]) -> int:
+        """
+        Add URLs to the queue, skipping URLs that are already queued.
+        
+        Args:
+            urls: Prezi URLs to add
+        
+        Returns:
+            Number of new jobs created
+        """
+        now = time.time()
+        rows = [(url.strip(), now, now, now) for url in urls if url and url.strip()]
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (url, available_at, created_at, updated_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            added = conn.total_changes - before
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return added
+    
+    def lease(self, worker_id: str) -> Optional[Job]:
+        """
+        Lease the next available job.
+        
+        Jobs whose lease expired without a heartbeat are treated as available
+        again, so work held by a crashed worker is picked up by others.
+        
+        Args:
+            worker_id: ID of the worker taking the lease
+        
+        Returns:
+            The leased job, or None if no job is ready
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Expired leases that already used every attempt belong to workers
+            # that keep crashing on them; dead-letter those instead of retrying.
+            conn.execute(
+                "UPDATE jobs SET status = ?, last_error = ?, lease_owner = NULL, "
+                "lease_expires = NULL, updated_at = ? "
+                "WHERE status = ? AND lease_expires < ? AND attempts >= ?",
+                (STATUS_DEAD, "lease expired", now, STATUS_LEASED, now, self.max_attempts),
+            )
+            
+            row = conn.execute(
+                "SELECT id, url, attempts FROM jobs "
+                "WHERE (status = ? AND available_at <= ?) "
+                "   OR (status = ? AND lease_expires < ?) "
+                "ORDER BY available_at, id LIMIT 1",
+                (STATUS_PENDING, now, STATUS_LEASED, now),
+            ).fetchone()
+            
+            if row is None:
+                conn.execute("COMMIT")
+                return None
+            
+            attempts = row['attempts'] + 1
+            conn.execute(
+                "UPDATE jobs SET status = ?, attempts = ?, lease_owner = ?, "
+                "lease_expires = ?, updated_at = ? WHERE id = ?",
+                (STATUS_LEASED, attempts, worker_id, now + self.lease_seconds, now, row['id']),
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        
+        return Job(row['id'], row['url'], attempts, worker_id)
+    
+    def heartbeat(self, job: Job) -> bool:
+        """
+        Extend the lease on a job.
+        
+        Args:
+            job: Job currently held by this worker
+        
+        Returns:
+            True if the lease is still held, False if it was lost
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET lease_expires = ?, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (now + self.lease_seconds, now, job.id, STATUS_LEASED, job.worker_id),
+        )
+        return cursor.rowcount == 1
+    
+    def complete(self, job: Job, result: Optional[Dict] = None) -> bool:
+        """
+        Mark a job as done.
+        
+        Args:
+            job: Job currently held by this worker
+            result: JSON-serializable result summary (optional)
+        
+        Returns:
+            True if the job was completed, False if the lease was lost
+        """
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, result = ?, lease_owner = NULL, "
+            "lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (STATUS_DONE, json.dumps(result) if result is not None else None,
+             time.time(), job.id, STATUS_LEASED, job.worker_id),
+        )
+        return cursor.rowcount == 1
+    
+    def fail(self, job: Job, error: str, retryable: bool = True) -> str:
+        """
+        Record a failed attempt and schedule a retry or dead-letter the job.
+        
+        Args:
+            job: Job currently held by this worker
+            error: Description of the failure
+            retryable: Whether the failure is worth retrying
+        
+        Returns:
+            The job's new status ('pending' or 'dead')
+        """
+        now = time.time()
+        if retryable and job.attempts < self.max_attempts:
+            status = STATUS_PENDING
+            available_at = now + backoff_delay(job.attempts, self.retry_backoff)
+        else:
+            status = STATUS_DEAD
+            available_at = now
+        
+        self._connect().execute(
+            "UPDATE jobs SET status = ?, available_at = ?, last_error = ?, "
+            "lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+            "WHERE id = ? AND status = ? AND lease_owner = ?",
+            (status, available_at, error, now, job.id, STATUS_LEASED, job.worker_id),
+        )
+        return status
+    
+    def seconds_until_ready(self) -> Optional[float]:
+        """
+        Get the time until the next job becomes available.
+        
+        Returns:
+            Seconds until a pending job is due or a lease expires (0 if one is
+            ready now), or None if no unfinished jobs remain
+        """
+        row = self._connect().execute(
+            "SELECT MIN(CASE WHEN status = ? THEN available_at ELSE lease_expires END) AS due "
+            "FROM jobs WHERE status IN (?, ?)",
+            (STATUS_PENDING, STATUS_PENDING, STATUS_LEASED),
+        ).fetchone()
+        if row['due'] is None:
+            return None
+        return max(0.0, row['due'] - time.time())
+    
+    def requeue_dead(self) -> int:
+        """
+        Move all dead-lettered jobs back to pending with a fresh attempt count.
+        
+        Returns:
+            Number of jobs requeued
+        """
+        now = time.time()
+        cursor = self._connect().execute(
+            "UPDATE jobs SET status = ?, attempts = 0, available_at = ?, updated_at = ? "
+            "WHERE status = ?",
+            (STATUS_PENDING, now, now, STATUS_DEAD),
+        )
+        return cursor.rowcount
+    
+    def dead_letters(self) -> List[Dict]:
+        """
+        Get all dead-lettered jobs.
+        
+        Returns:
+            List of dictionaries with url, attempts and last_error
+        """
+        rows = self._connect().execute(
+            "SELECT url, attempts, last_error FROM jobs WHERE status = ? ORDER BY id",
+            (STATUS_DEAD,),
+        ).fetchall()
+        return [dict(row) for row in rows]
+    
+    def stats(self) -> Dict[str, int]:
+        """
+        Count jobs by status.
+        
+        Returns:
+            Dictionary mapping status to job count
+        """
+        counts = {status: 0 for status in (STATUS_PENDING, STATUS_LEASED, STATUS_DONE, STATUS_DEAD)}
+        for row in self._connect().execute("SELECT status, COUNT(*) AS n FROM jobs GROUP BY status"):
+            counts[row['status']] = row['n']
+        return counts
+
+
+class LeaseHeartbeat:
+    """Background thread that keeps a job's lease alive while it is processed."""
+    
+    def __init__(self, queue: WorkQueue, job: Job, interval: Optional[float] = None):
+        """
+        Initialize the heartbeat.
+        
+        Args:
+            queue: Queue the job was leased from
+            job: Job to keep alive
+            interval: Seconds between heartbeats (defaults to a third of the lease)
+        """
+        self.queue = queue
+        self.job = job
+        self.interval = interval or max(1.0, queue.lease_seconds / 3)
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def __enter__(self) -> 'LeaseHeartbeat':
+        self._thread.start()
+        return self
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._stop.set()
+        self._thread.join()
+    
+    def _run(self):
+        try:
+            while not self._stop.wait(self.interval):
+                if not self.queue.heartbeat(self.job):
+                    print(f"Warning: lost lease on job {self.job.id} ({self.job.url})")
+                    self.lost = True
+                    return
+        finally:
+            self.queue.close()
+
+
+def default_worker_id() -> str:
+    """Build a worker ID that is unique across processes and machines."""
+    return f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
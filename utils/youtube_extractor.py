@@ -1,26 +1,200 @@
 """YouTube link extraction utility."""
 
 import re
+import sys
+import time
 from pathlib import Path
-from typing import Set, List
+from typing import Set, FrozenSet, List, Dict, Iterator, Optional, Tuple, Callable
 from urllib.parse import urlparse, parse_qs
 from datetime import datetime
 
+from .fileio import atomic_path
+
+
+WATCH_URL_PREFIX = "https://www.youtube.com/watch?v="
+
+# Runs inside the page and returns only unique candidate URLs with the kind of
+# element they came from, so the DOM never has to be serialized to Python.
+IN_BROWSER_EXTRACTION_SCRIPT = r"""
+var pattern = /https?:\/\/(?:www\.|m\.)?(?:youtube\.com\/(?:watch\?v=|embed\/|v\/)|youtu\.be\/)[A-Za-z0-9_-]+/gi;
+var seen = {};
+var results = [];
+function add(url, kind) {
+    if (url && !seen[url]) {
+        seen[url] = true;
+        results.push([url, kind]);
+    }
+}
+var selectors = [
+    ['iframe[src]', 'src', 'iframe'],
+    ['embed[src]', 'src', 'embed'],
+    ['object[data]', 'data', 'object'],
+    ['a[href]', 'href', 'anchor'],
+    ['[data-src]', 'data-src', 'data_attribute'],
+    ['[data-url]', 'data-url', 'data_attribute']
+];
+selectors.forEach(function (entry) {
+    document.querySelectorAll(entry[0]).forEach(function (el) {
+        var value = el.getAttribute(entry[1]);
+        if (value && /youtu/i.test(value)) {
+            add(value, entry[2]);
+        }
+    });
+});
+var markup = document.documentElement.outerHTML.match(pattern) || [];
+markup.forEach(function (url) { add(url, 'page_source'); });
+return results;
+"""
+
+
+class LinkRecord:
+    """Compact record describing one extracted YouTube link."""
+    
+    __slots__ = ('video_id', 'source', 'extracted_at')
+    
+    def __init__(self, video_id: str, source: str, extracted_at: Optional[float] = None):
+        """
+        Initialize a link record.
+        
+        Args:
+            video_id: YouTube video ID (interned to share storage across decks)
+            source: Where the link was found (e.g. 'iframe', 'page_source')
+            extracted_at: Unix timestamp of extraction (defaults to now)
+        """
+        self.video_id = sys.intern(video_id)
+        self.source = sys.intern(source)
+        self.extracted_at = time.time() if extracted_at is None else extracted_at
+    
+    @property
+    def url(self) -> str:
+        """Normalized watch URL for this video."""
+        return WATCH_URL_PREFIX + self.video_id
+    
+    def __getitem__(self, key: str):
+        """Dict-style access kept for callers written against the old dict records."""
+        if key == 'url':
+            return self.url
+        if key == 'extracted_at':
+            return datetime.fromtimestamp(self.extracted_at).isoformat()
+        if key in self.__slots__:
+            return getattr(self, key)
+        raise KeyError(key)
+    
+    def to_line(self) -> str:
+        """Serialize the record as a tab-separated line for spill files."""
+        return f"{self.video_id}\t{self.source}\t{self.extracted_at:.6f}\n"
+    
+    @classmethod
+    def from_line(cls, line: str) -> 'LinkRecord':
+        """Parse a record previously written by to_line()."""
+        video_id, source, extracted_at = line.rstrip('\n').split('\t')
+        return cls(video_id, source, float(extracted_at))
+
 
 class YouTubeExtractor:
     """Utility class for extracting YouTube links from web content."""
     
-    def __init__(self, output_dir: str):
+    def __init__(self, output_dir: str, spill_dir: Optional[str] = None,
+                 spill_threshold: int = 10000, verbose: bool = True):
         """
         Initialize YouTube extractor.
         
         Args:
             output_dir: Directory to save extracted links
+            spill_dir: Directory for spilling link records to disk (optional)
+            spill_threshold: Number of in-memory records that triggers a spill
+            verbose: Print each link as it is found
         """
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(exist_ok=True)
-        self.youtube_links: Set[str] = set()
-        self.link_details: List[dict] = []
+        self.verbose = verbose
+        self.deck_id: Optional[str] = None
+        self.on_link: Optional[Callable[[LinkRecord], None]] = None
+        self._video_ids: Set[str] = set()
+        self.link_details: List[LinkRecord] = []
+        
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self.spill_threshold = spill_threshold
+        self._spill_file: Optional[Path] = None
+        if self.spill_dir:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+    
+    @property
+    def youtube_links(self) -> FrozenSet[str]:
+        """
+        Normalized YouTube URLs extracted for the current deck.
+        
+        Built from the stored video IDs on each access, so it is read-only:
+        add links with extract_youtube_link() instead.
+        """
+        return frozenset(WATCH_URL_PREFIX + video_id for video_id in self._video_ids)
+    
+    def start_deck(self, deck_id: Optional[str] = None):
+        """
+        Reset state so that links are scoped to a new deck.
+        
+        Args:
+            deck_id: Identifier of the deck about to be processed (optional)
+        """
+        self.clear_links()
+        self.deck_id = deck_id
+    
+    def _add_record(self, video_id: str, source: str):
+        """Store a new link record, spilling to disk when the threshold is hit."""
+        record = LinkRecord(video_id, source)
+        self._video_ids.add(record.video_id)
+        self.link_details.append(record)
+        if self.on_link is not None:
+            self.on_link(record)
+        
+        if self.spill_dir and len(self.link_details) >= self.spill_threshold:
+            self._spill()
+    
+    def _spill(self):
+        """Append in-memory link records to the spill file and drop them."""
+        if self._spill_file is None:
+            name = f"links_{self.deck_id or 'deck'}_{id(self):x}_{time.time_ns()}.tsv"
+            self._spill_file = self.spill_dir / name
+        
+        with open(self._spill_file, 'a', encoding='utf-8') as f:
+            f.writelines(record.to_line() for record in self.link_details)
+        
+        self.link_details.clear()
+    
+    def iter_link_details(self) -> Iterator[LinkRecord]:
+        """
+        Iterate over all link records for the current deck, including spilled ones.
+        
+        Returns:
+            Iterator of LinkRecord objects in extraction order
+        """
+        if self._spill_file and self._spill_file.exists():
+            with open(self._spill_file, 'r', encoding='utf-8') as f:
+                for line in f:
+                    yield LinkRecord.from_line(line)
+        yield from self.link_details
+    
+    def merge_from(self, other: 'YouTubeExtractor') -> int:
+        """
+        Merge link records found by another extractor into this one.
+        
+        Args:
+            other: Extractor whose records should be added
+            
+        Returns:
+            Number of new links added
+        """
+        added = 0
+        for record in other.iter_link_details():
+            if record.video_id not in self._video_ids:
+                self._add_record(record.video_id, record.source)
+                added += 1
+        other.clear_links()
+        return added
+    
+    def link_count(self) -> int:
+        """Number of unique links extracted for the current deck."""
+        return len(self._video_ids)
     
     def extract_youtube_link(self, url: str) -> bool:
         """
@@ -33,20 +207,15 @@ class YouTubeExtractor:
             True if a valid YouTube link was found and processed
         """
         youtube_url = self._normalize_youtube_url(url)
-        if youtube_url and youtube_url not in self.youtube_links:
-            self.youtube_links.add(youtube_url)
-            
-            # Extract video details
-            video_id = self._extract_video_id(youtube_url)
-            details = {
-                'url': youtube_url,
-                'video_id': video_id,
-                'extracted_at': datetime.now().isoformat(),
-                'source': 'iframe'
-            }
-            self.link_details.append(details)
+        if not youtube_url:
+            return False
+        
+        video_id = self._extract_video_id(youtube_url)
+        if video_id not in self._video_ids:
+            self._add_record(video_id, 'iframe')
             
-            print(f"Found YouTube link: {youtube_url}")
+            if self.verbose:
+                print(f"Found YouTube link: {youtube_url}")
             return True
         return False
     
@@ -60,7 +229,7 @@ class YouTubeExtractor:
         Returns:
             Number of new YouTube links found
         """
-        initial_count = len(self.youtube_links)
+        initial_count = len(self._video_ids)
         
         # Patterns to match YouTube URLs
         patterns = [
@@ -76,21 +245,65 @@ class YouTubeExtractor:
                 youtube_url = match.group(0)
                 normalized_url = self._normalize_youtube_url(youtube_url)
                 
-                if normalized_url and normalized_url not in self.youtube_links:
-                    self.youtube_links.add(normalized_url)
-                    
-                    video_id = match.group(1)
-                    details = {
-                        'url': normalized_url,
-                        'video_id': video_id,
-                        'extracted_at': datetime.now().isoformat(),
-                        'source': 'page_source'
-                    }
-                    self.link_details.append(details)
+                if not normalized_url:
+                    continue
+                
+                video_id = self._extract_video_id(normalized_url)
+                if video_id not in self._video_ids:
+                    self._add_record(video_id, 'page_source')
                     
-                    print(f"Found YouTube link in source: {normalized_url}")
+                    if self.verbose:
+                        print(f"Found YouTube link in source: {normalized_url}")
         
-        return len(self.youtube_links) - initial_count
+        return len(self._video_ids) - initial_count
+    
+    def extract_from_candidates(self, candidates: List[Tuple[str, str]]) -> int:
+        """
+        Extract YouTube links from (url, source) pairs gathered elsewhere.
+        
+        Args:
+            candidates: Candidate URLs with the kind of element they came from
+            
+        Returns:
+            Number of new YouTube links found
+        """
+        initial_count = len(self._video_ids)
+        
+        for url, source in candidates:
+            normalized_url = self._normalize_youtube_url(url.replace('&amp;', '&'))
+            if not normalized_url:
+                continue
+            
+            video_id = self._extract_video_id(normalized_url)
+            if video_id not in self._video_ids:
+                self._add_record(video_id, source)
+                
+                if self.verbose:
+                    print(f"Found YouTube link ({source}): {normalized_url}")
+        
+        return len(self._video_ids) - initial_count
+    
+    def extract_from_driver(self, driver) -> int:
+        """
+        Extract YouTube links by matching inside the browser.
+        
+        Only the unique candidate URLs cross the WebDriver connection, instead
+        of the full serialized DOM. Falls back to page source extraction if the
+        script cannot run.
+        
+        Args:
+            driver: Selenium WebDriver instance
+            
+        Returns:
+            Number of new YouTube links found
+        """
+        try:
+            candidates = driver.execute_script(IN_BROWSER_EXTRACTION_SCRIPT) or []
+        except Exception as e:
+            print(f"In-browser link extraction failed, using page source: {e}")
+            return self.extract_from_page_source(driver.page_source)
+        
+        return self.extract_from_candidates([(url, source) for url, source in candidates])
     
     def _normalize_youtube_url(self, url: str) -> str:
         """
@@ -175,12 +388,19 @@ class YouTubeExtractor:
         """
         return list(self.youtube_links)
     
-    def save_links_to_file(self, filename: str = None) -> str:
+    def save_links_to_file(self, filename: str = None, metadata: Optional[Dict] = None,
+                           directory: Optional[str] = None) -> str:
         """
         Save extracted YouTube links to a text file.
         
+        The file is written under a temporary name and renamed into place, so
+        readers never see it half-written.
+        
         Args:
             filename: Custom filename (optional)
+            metadata: VideoMetadata by video ID, see YouTubeMetadataResolver (optional)
+            directory: Folder to save to instead of the output directory, such
+                as the deck's own folder (optional)
             
         Returns:
             Path to the saved file
@@ -189,29 +409,37 @@ class YouTubeExtractor:
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             filename = f"youtube_links_{timestamp}.txt"
         
-        file_path = self.output_dir / filename
+        file_path = Path(directory or self.output_dir) / filename
         
-        with open(file_path, 'w', encoding='utf-8') as f:
+        with atomic_path(file_path) as temp_path, open(temp_path, 'w', encoding='utf-8') as f:
             f.write("Extracted YouTube Links\n")
             f.write("=" * 50 + "\n\n")
             
-            if not self.youtube_links:
+            youtube_links = self.youtube_links
+            if not youtube_links:
                 f.write("No YouTube links found.\n")
             else:
-                for i, link in enumerate(sorted(self.youtube_links), 1):
+                for i, link in enumerate(sorted(youtube_links), 1):
                     f.write(f"{i}. {link}\n")
                 
-                f.write(f"\nTotal links found: {len(self.youtube_links)}\n")
+                f.write(f"\nTotal links found: {len(youtube_links)}\n")
                 
                 # Add detailed information
                 f.write("\n" + "=" * 50 + "\n")
                 f.write("Detailed Information\n")
                 f.write("=" * 50 + "\n\n")
                 
-                for details in self.link_details:
+                for details in self.iter_link_details():
                     f.write(f"URL: {details['url']}\n")
                     f.write(f"Video ID: {details['video_id']}\n")
                     f.write(f"Source: {details['source']}\n")
+                    video = (metadata or {}).get(details['video_id'])
+                    if video is not None:
+                        f.write(f"Status: {video.status}\n")
+                        if video.title:
+                            f.write(f"Title: {video.title}\n")
+                        if video.duration is not None:
+                            f.write(f"Duration: {video.duration // 60}:{video.duration % 60:02d}\n")
                     f.write(f"Extracted at: {details['extracted_at']}\n")
                     f.write("-" * 30 + "\n")
         
@@ -219,6 +447,10 @@ class YouTubeExtractor:
         return str(file_path)
     
     def clear_links(self):
-        """Clear all extracted links."""
-        self.youtube_links.clear()
+        """Clear all extracted links, including any spilled records."""
+        self._video_ids.clear()
         self.link_details.clear()
+        
+        if self._spill_file is not None:
+            self._spill_file.unlink(missing_ok=True)
+            self._spill_file = None
@@ -0,0 +1,287 @@
+"""Title, duration and availability of YouTube videos, resolved through oEmbed."""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Optional, Dict, Iterable
+
+from .youtube_extractor import WATCH_URL_PREFIX
+
+OEMBED_ENDPOINT = "https://www.youtube.com/oembed"
+
+# How the oEmbed endpoint answers for videos it will not describe: 401/403
+# for private videos and videos with embedding disabled, 400/404 for IDs
+# that do not exist or were removed
+RESTRICTED_STATUSES = (401, 403)
+UNAVAILABLE_STATUSES = (400, 404, 410)
+
+# SQLite limits the number of parameters in one statement
+_LOOKUP_CHUNK = 500
+
+
+@dataclass
+class VideoMetadata:
+    """What is known about one YouTube video."""
+    
+    video_id: str
+    status: str  # "available", "restricted", "unavailable" or "error"
+    title: Optional[str] = None
+    author_name: Optional[str] = None
+    thumbnail_url: Optional[str] = None
+    duration: Optional[int] = None  # Seconds, when the endpoint reports it
+    fetched_at: float = 0.0
+    error: Optional[str] = None
+    
+    @property
+    def url(self) -> str:
+        """Normalized watch URL for this video."""
+        return WATCH_URL_PREFIX + self.video_id
+    
+    @property
+    def available(self) -> bool:
+        """Whether the video can be watched."""
+        return self.status == "available"
+    
+    def to_dict(self) -> dict:
+        """Get the metadata as a JSON-serializable dictionary."""
+        return {'url': self.url, **asdict(self)}
+
+
+class MetadataCache:
+    """
+    SQLite cache of resolved video metadata with per-entry expiry.
+    
+    Connections are per thread, so scrapers in several threads or processes
+    can share one cache file. Lookups and writes are done for a whole batch
+    of videos at a time.
+    """
+    
+    def __init__(self, db_path: str):
+        """
+        Initialize the cache.
+        
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self._local = threading.local()
+        
+        conn = self._connect()
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS video_metadata (
+                video_id TEXT PRIMARY KEY,
+                data TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL
+            );
+        """)
+    
+    def _connect(self) -> sqlite3.Connection:
+        """Get the connection for the current thread."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+            conn.execute("PRAGMA busy_timeout = 30000")
+            conn.execute("PRAGMA journal_mode = WAL")
+            self._local.conn = conn
+        return conn
+    
+    def get_many(self, video_ids: Iterable[str], now: Optional[float] = None) -> Dict[str, VideoMetadata]:
+        """
+        Look up videos whose cached metadata has not expired.
+        
+        Args:
+            video_ids: YouTube video IDs
+            now: Time to check expiry against (defaults to the current time)
+        
+        Returns:
+            Metadata of the cached videos, by video ID; missing and expired
+            videos are left out
+        """
+        now = time.time() if now is None else now
+        ids = list(dict.fromkeys(video_ids))
+        conn = self._connect()
+        found = {}
+        for i in range(0, len(ids), _LOOKUP_CHUNK):
+            chunk = ids[i:i + _LOOKUP_CHUNK]
+            rows = conn.execute(
+                f"SELECT data FROM video_metadata WHERE expires_at > ? "
+                f"AND video_id IN ({', '.join('?' * len(chunk))})",
+                (now, *chunk),
+            ).fetchall()
+            for (data,) in rows:
+                metadata = VideoMetadata(**json.loads(data))
+                found[metadata.video_id] = metadata
+        return found
+    
+    def put_many(self, entries: Iterable[VideoMetadata], ttl: Dict[str, float]):
+        """
+        Store resolved metadata in one transaction.
+        
+        Args:
+            entries: Metadata to store
+            ttl: Seconds each status stays valid; statuses missing from it are not stored
+        """
+        rows = [(m.video_id, json.dumps(asdict(m)), m.fetched_at, m.fetched_at + ttl[m.status])
+                for m in entries if m.status in ttl]
+        if not rows:
+            return
+        
+        conn = self._connect()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO video_metadata (video_id, data, fetched_at, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                rows,
+            )
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """
+        Delete expired entries.
+        
+        Returns:
+            Number of entries deleted
+        """
+        now = time.time() if now is None else now
+        return self._connect().execute(
+            "DELETE FROM video_metadata WHERE expires_at <= ?", (now,)
+        ).rowcount
+
+
+class YouTubeMetadataResolver:
+    """
+    Resolves YouTube video IDs to titles, durations and availability.
+    
+    Videos are looked up in the cache first, in one query per batch; the
+    rest are fetched from the oEmbed endpoint concurrently over a pooled
+    session and written back in one transaction. Videos recur across many
+    decks, so most of them are answered from the cache. Videos that could
+    not be checked (network errors, rate limiting, server errors) are not
+    cached and are tried again next time.
+    
+    YouTube's oEmbed responses carry no duration; ``duration`` is only
+    filled in by endpoints that report one.
+    """
+    
+    def __init__(self, cache_path: Optional[str] = None, endpoint: str = OEMBED_ENDPOINT,
+                 workers: int = 8, timeout: float = 10.0, ttl: float = 7 * 86400,
+                 unavailable_ttl: float = 86400):
+        """
+        Initialize the resolver.
+        
+        Args:
+            cache_path: SQLite file caching metadata between runs (optional)
+            endpoint: oEmbed endpoint URL
+            workers: Requests in flight at once, and connections kept open
+            timeout: HTTP request timeout in seconds
+            ttl: Seconds metadata of available and restricted videos stays cached
+            unavailable_ttl: Seconds a missing or removed video stays cached
+        """
+        self.endpoint = endpoint
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self.ttl = {'available': ttl, 'restricted': ttl, 'unavailable': unavailable_ttl}
+        self.cache = MetadataCache(cache_path) if cache_path else None
+        self._session = None
+        self._session_lock = threading.Lock()
+        self.cache_hits = 0
+        self.fetched = 0
+    
+    @classmethod
+    def from_config(cls, config) -> 'YouTubeMetadataResolver':
+        """Create a resolver using the metadata settings of a ScraperConfig."""
+        cache_path = config.metadata_cache or str(Path(config.output_dir) / "youtube_metadata.db")
+        return cls(cache_path, workers=config.metadata_workers, ttl=config.metadata_ttl)
+    
+    @property
+    def session(self):
+        """Pooled HTTP session, created on first use."""
+        with self._session_lock:
+            if self._session is None:
+                import requests
+                from requests.adapters import HTTPAdapter
+                
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=2, pool_maxsize=self.workers)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._session = session
+            return self._session
+    
+    def resolve(self, video_id: str) -> VideoMetadata:
+        """Resolve a single video, see resolve_many()."""
+        return self.resolve_many([video_id])[video_id]
+    
+    def resolve_many(self, video_ids: Iterable[str]) -> Dict[str, VideoMetadata]:
+        """
+        Resolve a batch of videos.
+        
+        Args:
+            video_ids: YouTube video IDs; duplicates are resolved once
+        
+        Returns:
+            Metadata for every video, by video ID
+        """
+        ids = list(dict.fromkeys(video_ids))
+        results = self.cache.get_many(ids) if self.cache else {}
+        self.cache_hits += len(results)
+        
+        missing = [video_id for video_id in ids if video_id not in results]
+        if missing:
+            session = self.session
+            with ThreadPoolExecutor(max_workers=min(self.workers, len(missing)),
+                                    thread_name_prefix="oembed") as executor:
+                fetched = list(executor.map(lambda video_id: self._fetch(session, video_id), missing))
+            self.fetched += len(fetched)
+            if self.cache:
+                self.cache.put_many(fetched, self.ttl)
+            results.update((metadata.video_id, metadata) for metadata in fetched)
+        
+        return {video_id: results[video_id] for video_id in ids}
+    
+    def _fetch(self, session, video_id: str) -> VideoMetadata:
+        """Ask the oEmbed endpoint about one video."""
+        now = time.time()
+        params = {'url': WATCH_URL_PREFIX + video_id, 'format': 'json'}
+        try:
+            response = session.get(self.endpoint, params=params, timeout=self.timeout)
+        except Exception as e:
+            return VideoMetadata(video_id, "error", fetched_at=now, error=f"{type(e).__name__}: {e}")
+        
+        if response.status_code in RESTRICTED_STATUSES:
+            return VideoMetadata(video_id, "restricted", fetched_at=now)
+        if response.status_code in UNAVAILABLE_STATUSES:
+            return VideoMetadata(video_id, "unavailable", fetched_at=now)
+        if response.status_code != 200:
+            return VideoMetadata(video_id, "error", fetched_at=now, error=f"HTTP {response.status_code}")
+        
+        try:
+            data = response.json()
+        except ValueError:
+            return VideoMetadata(video_id, "error", fetched_at=now, error="Invalid oEmbed response")
+        
+        duration = data.get('duration')
+        return VideoMetadata(
+            video_id, "available",
+            title=data.get('title'),
+            author_name=data.get('author_name'),
+            thumbnail_url=data.get('thumbnail_url'),
+            duration=int(duration) if isinstance(duration, (int, float)) else None,
+            fetched_at=now,
+        )
+    
+    def close(self):
+        """Close the pooled HTTP session."""
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None